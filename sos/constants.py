@@ -29,6 +29,12 @@ DEGREES_PER_RA_HOUR = 15.0
 SPEED_OF_LIGHT_KM_S = 299792.458
 """Speed of light in km/s."""
 
+SPEED_OF_LIGHT_M_S = 299792458.0
+"""Speed of light in m/s (for converting baselines to wavelengths)."""
+
+EARTH_ROTATION_RATE_RAD_S = 7.2921150e-5
+"""Sidereal rotation rate of the Earth in rad/s."""
+
 # Planck 2015 ΛCDM parameters
 HUBBLE_CONSTANT = 67.8
 """Hubble constant H₀ in km/s/Mpc (Planck 2015 results)."""
@@ -36,6 +42,19 @@ HUBBLE_CONSTANT = 67.8
 MATTER_DENSITY_PARAMETER = 0.308
 """Matter density parameter Ω_m from Planck 2015 ΛCDM cosmology."""
 
+DARK_ENERGY_W0 = -1.0
+"""Dark energy equation of state w₀ (CPL parametrization; -1 is a cosmological
+constant)."""
+
+DARK_ENERGY_WA = 0.0
+"""Dark energy equation of state evolution w_a (CPL parametrization)."""
+
+DISTANCE_TABLE_POINTS = 20001
+"""Number of redshift samples in a numerically integrated distance table."""
+
+DISTANCE_TABLE_CACHE_DIR = "~/.cache/sos/distances"
+"""Default on-disk cache directory for distance tables."""
+
 # ============================================================================
 # Telescope & Observation Parameters
 # ============================================================================
@@ -44,7 +63,7 @@ TELESCOPE_ELEVATION_LIMIT = 17.0
 """Default elevation limit in degrees for telescope observations."""
 
 TELESCOPE_SHADOW_LIMIT = 0.001
-"""Default shadow limit (unit in image pixels) for antenna masking."""
+"""Default shadow limit (blocked fraction of a dish aperture) for antenna masking."""
 
 DEFAULT_NOISE_LEVEL = "0.0Jy"
 """Default noise level for visibility simulations (0 = no noise)."""
@@ -59,6 +78,9 @@ DEFAULT_MOUNT_TYPE = "alt-az"
 EQUATORIAL_MOUNT_TELESCOPES = ["DRAO", "WSRT", "ASKAP"]
 """Telescopes with equatorial mounts."""
 
+ANTENNA_CACHE_DIR = "~/.cache/sos/antennas"
+"""Default on-disk cache directory for compiled antenna tables."""
+
 # ============================================================================
 # Frequency & Channel Parameters
 # ============================================================================
@@ -69,6 +91,42 @@ DEFAULT_FREQUENCY_RESOLUTION_MHZ = 50.0
 DEFAULT_INTEGRATION_TIME = "1s"
 """Default integration time for visibility samples."""
 
+DEFAULT_CHUNK_SECONDS = 60.0
+"""Default length of a time chunk processed at once by the NumPy predict engine."""
+
+DEFAULT_PREDICT_MAX_ELEMENTS = 4_000_000
+"""Maximum number of (visibility x pixel) phase terms evaluated per predict block."""
+
+DEFAULT_DFT_BLOCK_BYTES = 4 * 1024 ** 2
+"""Memory ceiling in bytes of the antenna phasor block of the catalog DFT predict."""
+
+DEFAULT_DEGRID_PADDING = 2.0
+"""Zero-padding factor of the uv grid used by the FFT degridding predict."""
+
+DEFAULT_DEGRID_SUPPORT = 8
+"""Width in grid cells of the Kaiser-Bessel degridding kernel."""
+
+DEFAULT_SMEARING_TOLERANCE = 0.01
+"""Largest fractional amplitude loss allowed from time and frequency averaging."""
+
+DEFAULT_SMEARING_FIELD_RADIUS_ARCMIN = 5.0
+"""Radius in arcmin of the field within which averaging meets the smearing tolerance."""
+
+DEFAULT_MAX_TIME_FACTOR = 256
+"""Largest number of integrations averaged into one row."""
+
+DEFAULT_MAX_CHANNEL_FACTOR = 64
+"""Largest number of channels averaged into one output channel."""
+
+DEFAULT_IMAGE_WEIGHTING = "natural"
+"""Default visibility weighting of the dirty imager (natural, uniform or briggs)."""
+
+DEFAULT_BRIGGS_ROBUST = 0.0
+"""Default Briggs robustness: -2 is close to uniform, +2 close to natural weighting."""
+
+DIRTY_IMAGE_UNIT = "Jy/beam"
+"""Brightness unit of dirty images."""
+
 # ============================================================================
 # Image & Sky Model Parameters
 # ============================================================================
@@ -85,6 +143,9 @@ DEFAULT_BRIGHTNESS_UNIT = "Jy/pixel"
 DEFAULT_FREQUENCY_INCREMENT = "0.5GHz"
 """Default frequency increment in spectral coordinate system."""
 
+DEFAULT_CUBE_CACHE_PLANES = 0
+"""Default number of recently used channel planes a spectral cube keeps (opt-in)."""
+
 # ============================================================================
 # Source Model Parameters
 # ============================================================================
@@ -105,6 +166,22 @@ DEFAULT_POINT_SOURCE_SIZE_ARCSEC = 3.0
 DEFAULT_POSITION_ANGLE = "45.0deg"
 """Default position angle for Gaussian source components."""
 
+GAUSSIAN_FWHM_TO_SIGMA = 0.42466090014400953
+"""Ratio of Gaussian standard deviation to FWHM, 1 / (2 sqrt(2 ln 2))."""
+
+DEFAULT_RENDER_BLOCK_ROWS = 256
+"""Number of image rows evaluated at once by the NumPy rasterizer."""
+
+DEFAULT_TILE_SIZE = 1024
+"""Side length in pixels of the tiles rendered into memory-mapped model images."""
+
+DEFAULT_FOOTPRINT_NSIGMA = 6.0
+"""Half-size, in standard deviations, of the box a Gaussian component is
+evaluated in."""
+
+DEFAULT_STAMP_MAX_ELEMENTS = 4_000_000
+"""Maximum number of stamp pixels evaluated per batch of compact components."""
+
 # Random source parameters
 RANDOM_SOURCE_REGION_SIZE = 47
 """Region size for random point source placement (in units)."""
@@ -141,6 +218,21 @@ FITS_EXTENSION = ".fits"
 MS_EXTENSION = ".ms"
 """CASA Measurement Set extension."""
 
+NUMPY_IMAGE_EXTENSION = ".npz"
+"""NumPy model image extension (pixel data plus coordinate metadata)."""
+
+VISIBILITY_STORE_HEADER = "header.json"
+"""JSON header file of a native visibility store directory."""
+
+VISIBILITY_STORE_BASELINES = "baselines.npz"
+"""Baseline layout and index file of a native visibility store directory."""
+
+VISIBILITY_STORE_FORMAT = "sos-visibility-1"
+"""Format tag written in the visibility store header."""
+
+FITS_BLOCK_SIZE = 2880
+"""FITS logical record size in bytes (headers and data are padded to it)."""
+
 # ============================================================================
 # Error & Validation Parameters
 # ============================================================================
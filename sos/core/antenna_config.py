@@ -0,0 +1,373 @@
+"""
+Telescope antenna configuration module for SOS (SKA Observation Simulator).
+
+Reads CASA-style ``.cfg`` antenna tables (``# observatory=``/``# coordsys=``
+headers followed by ``X Y Z diam station`` rows) without requiring CASA.
+Parsed tables are compiled to structured ``.npy`` records cached by content
+hash, so later runs (and worker processes) memory-map them instead of
+re-parsing the text.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from sos.constants import ANTENNA_CACHE_DIR
+from sos.utils.logger import setup_logger
+from sos.utils.validators import validate_config_file
+
+logger = setup_logger(__name__)
+
+StationFilter = Union[
+    Sequence[str], Sequence[int], np.ndarray, Callable[[np.ndarray], np.ndarray]
+]
+"""Station names, antenna indices (as a sequence or integer array), a boolean
+mask with one value per antenna, or a predicate mapping the antenna records
+(see :meth:`AntennaConfig.to_records`) to such a mask."""
+
+
+class AntennaConfig:
+    """Antenna positions and metadata of one telescope array."""
+
+    def __init__(
+        self,
+        names: List[str],
+        xyz: np.ndarray,
+        diameters: np.ndarray,
+        observatory: str = "",
+        coordsys: str = "XYZ",
+        reference_xyz: Optional[np.ndarray] = None,
+    ):
+        """
+        Initialize antenna configuration.
+
+        Args:
+            names: Station names, one per antenna.
+            xyz: Geocentric ITRF positions in metres, shape (n_antennas, 3).
+            diameters: Dish diameters in metres, shape (n_antennas,).
+            observatory: Observatory name from the ``# observatory=`` header.
+            coordsys: Coordinate system from the ``# coordsys=`` header.
+            reference_xyz: Array reference position defining longitude and
+                latitude; defaults to the antenna centroid.
+
+        Raises:
+            ValueError: If array shapes are inconsistent.
+        """
+        xyz = np.asarray(xyz, dtype=np.float64)
+        diameters = np.asarray(diameters, dtype=np.float64)
+
+        if xyz.ndim != 2 or xyz.shape[1] != 3:
+            raise ValueError(
+                f"Antenna positions must have shape (N, 3), got {xyz.shape}"
+            )
+        if not (len(names) == xyz.shape[0] == diameters.shape[0]):
+            raise ValueError(
+                f"Inconsistent antenna table: {len(names)} names, "
+                f"{xyz.shape[0]} positions, {diameters.shape[0]} diameters"
+            )
+
+        self.names = list(names)
+        self.xyz = xyz
+        self.diameters = diameters
+        self.observatory = observatory
+        self.coordsys = coordsys
+        self.reference_xyz = (
+            xyz.mean(axis=0) if reference_xyz is None
+            else np.asarray(reference_xyz, dtype=np.float64)
+        )
+
+    @classmethod
+    def from_records(
+        cls,
+        records: np.ndarray,
+        observatory: str = "",
+        coordsys: str = "XYZ",
+        reference_xyz: Optional[np.ndarray] = None,
+    ) -> "AntennaConfig":
+        """
+        Build a configuration from a structured antenna record array.
+
+        Positions and diameters are views of ``records``, so a memory-mapped
+        record array is shared rather than copied.
+
+        Args:
+            records: Array with ``station``, ``xyz`` and ``diameter`` fields.
+            observatory: Observatory name.
+            coordsys: Coordinate system.
+            reference_xyz: Array reference position; defaults to the centroid.
+
+        Returns:
+            AntennaConfig over the records.
+        """
+        return cls(
+            names=records["station"].tolist(),
+            xyz=records["xyz"],
+            diameters=records["diameter"],
+            observatory=observatory,
+            coordsys=coordsys,
+            reference_xyz=reference_xyz,
+        )
+
+    def to_records(self) -> np.ndarray:
+        """
+        Return the antenna table as a structured record array.
+
+        Returns:
+            Array with fields ``station`` (str), ``xyz`` (3 x float64) and
+            ``diameter`` (float64), one record per antenna.
+        """
+        width = max([len(name) for name in self.names] + [1])
+        records = np.empty(
+            self.n_antennas,
+            dtype=[("station", f"U{width}"), ("xyz", "<f8", (3,)), ("diameter", "<f8")],
+        )
+        records["station"] = self.names
+        records["xyz"] = self.xyz
+        records["diameter"] = self.diameters
+        return records
+
+    def station_indices(self, stations: StationFilter) -> np.ndarray:
+        """
+        Resolve a station filter to sorted antenna indices.
+
+        Args:
+            stations: Station names, antenna indices, a boolean array with one
+                value per antenna, or a predicate over the antenna records,
+                e.g. ``lambda a: a["diameter"] == 13.5``.
+
+        Returns:
+            Sorted, unique antenna indices.
+
+        Raises:
+            ValueError: If a station is unknown, a mask does not have one value
+                per antenna, or fewer than two stations are selected.
+        """
+        if callable(stations):
+            stations = np.asarray(stations(self.to_records()), dtype=bool)
+        if isinstance(stations, np.ndarray) and stations.dtype == bool:
+            if stations.shape != (self.n_antennas,):
+                raise ValueError(
+                    f"Station mask has shape {stations.shape}, "
+                    f"expected ({self.n_antennas},)"
+                )
+            indices = np.flatnonzero(stations)
+        else:
+            lookup = {name: i for i, name in enumerate(self.names)}
+            selected: List[int] = []
+            for station in stations:
+                if isinstance(station, (bool, np.bool_)):
+                    raise ValueError("Boolean station masks must be a NumPy array")
+                if isinstance(station, str):
+                    if station not in lookup:
+                        raise ValueError(f"Unknown station '{station}'")
+                    station = lookup[station]
+                if not 0 <= station < self.n_antennas:
+                    raise ValueError(f"Antenna index {station} out of range")
+                selected.append(int(station))
+            indices = np.unique(np.asarray(selected, dtype=np.int64))
+
+        if indices.shape[0] < 2:
+            raise ValueError(
+                f"A sub-array needs at least 2 antennas, got {indices.shape[0]}"
+            )
+        return indices
+
+    def subset(self, stations: StationFilter) -> "AntennaConfig":
+        """
+        Derive a sub-array of selected stations.
+
+        The sub-array keeps the reference position of this array, so its
+        baselines have the same uvw tracks as in the full array.
+
+        Args:
+            stations: Station filter (see :meth:`station_indices`).
+
+        Returns:
+            AntennaConfig of the selected antennas, in table order.
+        """
+        indices = self.station_indices(stations)
+        return AntennaConfig(
+            names=[self.names[i] for i in indices],
+            xyz=self.xyz[indices],
+            diameters=self.diameters[indices],
+            observatory=self.observatory,
+            coordsys=self.coordsys,
+            reference_xyz=self.reference_xyz,
+        )
+
+    @property
+    def n_antennas(self) -> int:
+        """Number of antennas in the array."""
+        return len(self.names)
+
+    @property
+    def n_baselines(self) -> int:
+        """Number of cross-correlation baselines (no autocorrelations)."""
+        return self.n_antennas * (self.n_antennas - 1) // 2
+
+    @property
+    def longitude_rad(self) -> float:
+        """East longitude of the array reference position in radians."""
+        x, y, _ = self.reference_xyz
+        return float(np.arctan2(y, x))
+
+    @property
+    def latitude_rad(self) -> float:
+        """Geocentric latitude of the array reference position in radians."""
+        x, y, z = self.reference_xyz
+        return float(np.arctan2(z, np.hypot(x, y)))
+
+
+def _parse_header(line: str, header: Dict[str, str]) -> None:
+    """Store a ``# key=value`` comment line in the header dictionary."""
+    text = line.lstrip("#").strip()
+    if "=" not in text:
+        return
+    key, value = text.split("=", 1)
+    header[key.strip().lower()] = value.strip()
+
+
+def read_antenna_config(
+    config_file: Union[str, Path],
+    cache_dir: Optional[Union[str, Path]] = ANTENNA_CACHE_DIR,
+) -> AntennaConfig:
+    """
+    Load a telescope ``.cfg`` antenna table, using the compiled cache.
+
+    The file content is hashed; if a compiled table with that hash exists
+    in ``cache_dir`` it is memory-mapped read-only, otherwise the text is
+    parsed and the compiled table written for the next run. Editing the
+    ``.cfg`` file changes the hash, so stale tables are never used.
+
+    Args:
+        config_file: Path to configuration file.
+        cache_dir: Directory for compiled tables, or None to always parse.
+
+    Returns:
+        AntennaConfig with positions, diameters and station names.
+
+    Raises:
+        FileNotFoundError: If config file not found.
+        ValueError: If the file is malformed or uses an unsupported coordsys.
+    """
+    validate_config_file(config_file)
+    content = Path(config_file).read_bytes()
+
+    cache_path = None
+    if cache_dir is not None:
+        digest = hashlib.sha1(content).hexdigest()[:16]
+        cache_path = Path(cache_dir).expanduser() / f"antennas_{digest}.npy"
+        config = _load_compiled(cache_path)
+        if config is not None:
+            return config
+
+    config = parse_antenna_config(content.decode(), str(config_file))
+    if cache_path is not None:
+        _save_compiled(config, cache_path)
+
+    logger.debug(
+        f"Read {config.n_antennas} antennas from {Path(config_file).name} "
+        f"(observatory={config.observatory})"
+    )
+    return config
+
+
+def parse_antenna_config(text: str, source: str = "<string>") -> AntennaConfig:
+    """
+    Parse the text of a ``.cfg`` antenna table.
+
+    Args:
+        text: File content.
+        source: Name used in error messages.
+
+    Returns:
+        AntennaConfig with positions, diameters and station names.
+
+    Raises:
+        ValueError: If the table is malformed or uses an unsupported coordsys.
+    """
+    header: Dict[str, str] = {}
+    names: List[str] = []
+    rows: List[List[float]] = []
+
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            _parse_header(line, header)
+            continue
+
+        fields = line.split()
+        if len(fields) < 4:
+            raise ValueError(
+                f"{source}:{line_number}: expected 'X Y Z diam [station]', "
+                f"got {len(fields)} fields"
+            )
+        try:
+            rows.append([float(value) for value in fields[:4]])
+        except ValueError as e:
+            raise ValueError(f"{source}:{line_number}: {e}")
+        names.append(fields[4] if len(fields) > 4 else f"A{len(names):03d}")
+
+    if not rows:
+        raise ValueError(f"No antennas found in configuration file: {source}")
+
+    coordsys = header.get("coordsys", "XYZ").upper()
+    if coordsys != "XYZ":
+        raise ValueError(
+            f"Unsupported coordsys '{coordsys}' in {source}. Only XYZ is supported"
+        )
+
+    table = np.array(rows, dtype=np.float64)
+    return AntennaConfig(
+        names=names,
+        xyz=table[:, :3],
+        diameters=table[:, 3],
+        observatory=header.get("observatory", ""),
+        coordsys=coordsys,
+    )
+
+
+def _load_compiled(cache_path: Path) -> Optional[AntennaConfig]:
+    """Memory-map a compiled antenna table and its header if present."""
+    header_path = cache_path.with_suffix(".json")
+    if not cache_path.is_file() or not header_path.is_file():
+        return None
+    try:
+        header = json.loads(header_path.read_text())
+        records = np.load(cache_path, mmap_mode="r")
+        config = AntennaConfig.from_records(
+            records, header.get("observatory", ""), header.get("coordsys", "XYZ")
+        )
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable antenna table {cache_path}: {e}")
+        return None
+
+    logger.debug(f"Loaded compiled antenna table {cache_path}")
+    return config
+
+
+def _save_compiled(config: AntennaConfig, cache_path: Path) -> None:
+    """Write a compiled antenna table (header first, records last, atomically)."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        header = {"observatory": config.observatory, "coordsys": config.coordsys}
+        for path, write in (
+            (
+                cache_path.with_suffix(".json"),
+                lambda f: f.write(json.dumps(header).encode()),
+            ),
+            (cache_path, lambda f: np.save(f, config.to_records())),
+        ):
+            fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, suffix=path.suffix)
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_name, path)
+    except OSError as e:
+        logger.warning(f"Could not cache antenna table to {cache_path}: {e}")
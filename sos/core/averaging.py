@@ -0,0 +1,527 @@
+"""
+Baseline-dependent averaging for SOS (SKA Observation Simulator).
+
+Short baselines move slowly through the uv plane, so their visibilities can
+be averaged over many integrations and channels before a source at the edge
+of the field decorrelates. For a baseline of length B the fringe phase of a
+source at radius theta drifts at most 2 pi omega_E theta B / lambda per
+second and changes by 2 pi theta B dnu / c across dnu; averaging a phase
+that drifts linearly by dphi scales the amplitude by sinc(dphi / 2) ~
+1 - dphi^2 / 24. Each baseline is averaged over the longest power-of-two
+number of integrations and channels whose amplitude loss stays within the
+tolerance.
+
+Baselines sharing averaging factors form a group with a regular time-major
+row layout, written to its own :class:`sos.core.vis_store.VisibilityStore`
+(with ``weight`` and ``exposure`` columns) below the output directory.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sos.constants import (
+    DEFAULT_MAX_CHANNEL_FACTOR,
+    DEFAULT_MAX_TIME_FACTOR,
+    DEFAULT_SMEARING_FIELD_RADIUS_ARCMIN,
+    DEFAULT_SMEARING_TOLERANCE,
+    EARTH_ROTATION_RATE_RAD_S,
+    SPEED_OF_LIGHT_M_S,
+    VISIBILITY_STORE_HEADER,
+)
+from sos.core.baselines import BaselineIndex
+from sos.core.vis_store import VisibilityStore
+from sos.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Samples further apart than this many integrations start a new window
+_GAP_INTEGRATIONS = 1.5
+
+
+class AveragingSpec(NamedTuple):
+    """
+    Smearing tolerance from which averaging factors are chosen.
+
+    Attributes:
+        tolerance: Largest fractional amplitude loss of a source at
+            ``field_radius_arcmin``, for time and frequency averaging each.
+        field_radius_arcmin: Radius of the field of interest in arcmin.
+        max_time_factor: Largest number of integrations averaged per row.
+        max_channel_factor: Largest number of channels averaged per channel.
+    """
+
+    tolerance: float = DEFAULT_SMEARING_TOLERANCE
+    field_radius_arcmin: float = DEFAULT_SMEARING_FIELD_RADIUS_ARCMIN
+    max_time_factor: int = DEFAULT_MAX_TIME_FACTOR
+    max_channel_factor: int = DEFAULT_MAX_CHANNEL_FACTOR
+
+
+class AveragingGroup(NamedTuple):
+    """
+    Baselines averaged with the same factors.
+
+    Attributes:
+        time_factor: Integrations averaged per output row.
+        channel_factor: Channels averaged per output channel.
+        baselines: Indices of the group's baselines in the input row order.
+        channel_starts: First input channel of each output channel.
+        frequencies_hz: Centre frequency of each output channel.
+    """
+
+    time_factor: int
+    channel_factor: int
+    baselines: np.ndarray
+    channel_starts: np.ndarray
+    frequencies_hz: np.ndarray
+
+    @property
+    def name(self) -> str:
+        """Directory name of the group's store."""
+        return f"t{self.time_factor}_f{self.channel_factor}"
+
+
+class AveragedChunk(NamedTuple):
+    """
+    Averaged rows of one group, time-major over the group's baselines.
+
+    Attributes:
+        time: Mean time of the averaged integrations, shape (rows,).
+        baseline: Baseline index into the input row order, shape (rows,).
+        antenna1: First antenna of each row, shape (rows,).
+        antenna2: Second antenna of each row, shape (rows,).
+        uvw: Mean baseline coordinates in metres, shape (rows, 3).
+        vis: Weighted mean visibilities, shape (rows, nchan, npol), complex64.
+        flags: True where no unflagged sample was averaged.
+        weight: Number of unflagged samples averaged, shape (rows, nchan, npol).
+        exposure: Effective integration time in seconds, shape (rows,).
+    """
+
+    time: np.ndarray
+    baseline: np.ndarray
+    antenna1: np.ndarray
+    antenna2: np.ndarray
+    uvw: np.ndarray
+    vis: np.ndarray
+    flags: np.ndarray
+    weight: np.ndarray
+    exposure: np.ndarray
+
+
+def smearing_limits(
+    lengths_m: np.ndarray,
+    frequency_hz: float,
+    field_radius_rad: float,
+    tolerance: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Longest averaging time and bandwidth within a smearing tolerance.
+
+    Args:
+        lengths_m: Baseline lengths in metres.
+        frequency_hz: Highest observed frequency in Hz.
+        field_radius_rad: Radius of the field of interest in radians.
+        tolerance: Largest fractional amplitude loss.
+
+    Returns:
+        Tuple of (time in seconds, bandwidth in Hz) per baseline; infinite
+        for zero-length baselines.
+    """
+    max_phase = np.sqrt(24.0 * tolerance)
+    # Largest fringe phase change per Hz of bandwidth at the field edge
+    lengths_m = np.asarray(lengths_m, dtype=np.float64)
+    phase_per_hz = 2.0 * np.pi * field_radius_rad * lengths_m / SPEED_OF_LIGHT_M_S
+    with np.errstate(divide="ignore"):
+        bandwidth = max_phase / phase_per_hz
+        time = max_phase / (phase_per_hz * frequency_hz * EARTH_ROTATION_RATE_RAD_S)
+    return time, bandwidth
+
+
+def _power_of_two_factor(limit: np.ndarray, max_factor: int) -> np.ndarray:
+    """Largest power of two not above ``limit`` (at least 1, at most ``max_factor``)."""
+    limit = np.clip(np.nan_to_num(limit, posinf=max_factor), 1.0, max(max_factor, 1))
+    return (2 ** np.floor(np.log2(limit))).astype(np.int64)
+
+
+def _window_sums(values: np.ndarray, factor: int) -> np.ndarray:
+    """Sums over consecutive windows of ``factor`` integrations (axis 0)."""
+    if factor == 1:
+        return values
+    return values.reshape((-1, factor) + values.shape[1:]).sum(axis=1)
+
+
+class _Sums(NamedTuple):
+    """Sums over the integrations of one or more windows."""
+
+    n: np.ndarray
+    time: np.ndarray
+    uvw: np.ndarray
+    vis: np.ndarray
+    weight: np.ndarray
+    exposure: np.ndarray
+
+
+class _Window:
+    """Running sums of one group's current averaging window."""
+
+    def __init__(self, n_baselines: int, n_channels: int, n_pol: int):
+        self.n = 0
+        self.time = 0.0
+        self.last_time = -np.inf
+        self.uvw = np.zeros((n_baselines, 3))
+        self.vis = np.zeros((n_baselines, n_channels, n_pol), dtype=np.complex128)
+        self.weight = np.zeros((n_baselines, n_channels, n_pol))
+        self.exposure = np.zeros(n_baselines)
+
+
+class BaselineAverager:
+    """Stream time chunks through baseline-dependent time and frequency averaging."""
+
+    def __init__(
+        self,
+        baselines: BaselineIndex,
+        frequencies_hz: np.ndarray,
+        integration_seconds: float,
+        n_pol: int,
+        spec: AveragingSpec = AveragingSpec(),
+    ):
+        """
+        Choose averaging factors and group the baselines.
+
+        Args:
+            baselines: Input baselines in row order, with lengths.
+            frequencies_hz: Input channel frequencies in Hz.
+            integration_seconds: Input integration time in seconds.
+            n_pol: Number of correlation products.
+            spec: Smearing tolerance and factor limits.
+
+        Raises:
+            ValueError: If the baselines have no lengths.
+        """
+        if baselines.lengths_m is None:
+            raise ValueError("Baseline-dependent averaging needs baseline lengths")
+
+        frequencies_hz = np.atleast_1d(np.asarray(frequencies_hz, dtype=np.float64))
+        n_channels = frequencies_hz.shape[0]
+        channel_width = (
+            abs(frequencies_hz[1] - frequencies_hz[0]) if n_channels > 1 else np.inf
+        )
+        time_limit, bandwidth_limit = smearing_limits(
+            baselines.lengths_m, frequencies_hz.max(),
+            np.radians(spec.field_radius_arcmin / 60.0), spec.tolerance,
+        )
+
+        self.baselines = baselines
+        self.lengths_m: np.ndarray = baselines.lengths_m
+        self.integration_seconds = float(integration_seconds)
+        self.n_channels = n_channels
+        self.n_pol = n_pol
+        self.time_factors = _power_of_two_factor(
+            time_limit / self.integration_seconds, spec.max_time_factor
+        )
+        self.channel_factors = _power_of_two_factor(
+            bandwidth_limit / channel_width, min(spec.max_channel_factor, n_channels)
+        )
+
+        factors, group_of = np.unique(
+            np.stack([self.time_factors, self.channel_factors], axis=1),
+            axis=0, return_inverse=True,
+        )
+        self.groups: List[AveragingGroup] = []
+        for g, (time_factor, channel_factor) in enumerate(factors):
+            starts = np.arange(0, n_channels, channel_factor)
+            counts = np.diff(np.append(starts, n_channels))
+            self.groups.append(AveragingGroup(
+                time_factor=int(time_factor),
+                channel_factor=int(channel_factor),
+                baselines=np.flatnonzero(group_of.ravel() == g),
+                channel_starts=starts,
+                frequencies_hz=np.add.reduceat(frequencies_hz, starts) / counts,
+            ))
+        self._windows = [
+            _Window(group.baselines.shape[0], n_channels, n_pol)
+            for group in self.groups
+        ]
+
+        logger.debug(
+            f"Averaging {baselines.n_baselines} baselines in "
+            f"{len(self.groups)} groups, "
+            f"{self.compression:.1f}x fewer visibilities"
+        )
+
+    @property
+    def compression(self) -> float:
+        """Ratio of input to output visibilities (channels x rows)."""
+        output = np.sum(
+            1.0 / self.time_factors *
+            np.ceil(self.n_channels / self.channel_factors) / self.n_channels
+        )
+        return self.baselines.n_baselines / output
+
+    def process(
+        self,
+        time: np.ndarray,
+        uvw: np.ndarray,
+        vis: np.ndarray,
+        flags: np.ndarray,
+    ) -> List[Tuple[int, AveragedChunk]]:
+        """
+        Add one time chunk and return the windows it completes.
+
+        Windows continue across chunks and are closed early at gaps between
+        scans, so chunk boundaries do not change the result.
+
+        Args:
+            time: Row times in seconds, time-major over the input baselines.
+            uvw: Row coordinates in metres, shape (rows, 3).
+            vis: Visibilities, shape (rows, nchan, npol).
+            flags: Flags of ``vis``.
+
+        Returns:
+            List of (group index, averaged rows), in time order per group.
+        """
+        n_baselines = self.baselines.n_baselines
+        n_times = time.shape[0] // n_baselines
+        times = time[::n_baselines]
+        uvw = uvw.reshape(n_times, n_baselines, 3)
+        vis = vis.reshape(n_times, n_baselines, self.n_channels, self.n_pol)
+        weight = ~flags.reshape(vis.shape)
+
+        # Split the chunk into runs of contiguous integrations
+        gap = _GAP_INTEGRATIONS * self.integration_seconds
+        breaks = np.flatnonzero(np.diff(times) > gap) + 1
+        output = []
+        for start, stop in zip(np.append(0, breaks), np.append(breaks, n_times)):
+            run = slice(start, stop)
+            for g, group in enumerate(self.groups):
+                window = self._windows[g]
+                if window.n and times[start] - window.last_time > gap:
+                    output += self._emit(g)
+                rows = group.baselines
+                output += self._accumulate(
+                    g, times[run], uvw[run, rows], vis[run, rows], weight[run, rows]
+                )
+        return output
+
+    def flush(self) -> List[Tuple[int, AveragedChunk]]:
+        """Return the partially filled windows at the end of the stream."""
+        output = []
+        for g in range(len(self.groups)):
+            if self._windows[g].n:
+                output += self._emit(g)
+        return output
+
+    def _accumulate(
+        self,
+        g: int,
+        times: np.ndarray,
+        uvw: np.ndarray,
+        vis: np.ndarray,
+        weight: np.ndarray,
+    ) -> List[Tuple[int, AveragedChunk]]:
+        """Add contiguous integrations to group ``g``'s windows."""
+        factor = self.groups[g].time_factor
+        window = self._windows[g]
+        output = []
+
+        # Complete the open window first
+        if window.n:
+            take = min(factor - window.n, times.shape[0])
+            self._add(window, times[:take], uvw[:take], vis[:take], weight[:take])
+            times, uvw = times[take:], uvw[take:]
+            vis, weight = vis[take:], weight[take:]
+            if window.n == factor:
+                output += self._emit(g)
+                window = self._windows[g]
+
+        # Whole windows at once
+        n_full = times.shape[0] // factor
+        if n_full:
+            stop = n_full * factor
+            sums = _Sums(
+                n=np.full(n_full, factor),
+                time=_window_sums(times[:stop], factor),
+                uvw=_window_sums(uvw[:stop], factor),
+                vis=_window_sums(vis[:stop] * weight[:stop], factor),
+                weight=_window_sums(weight[:stop], factor),
+                exposure=_window_sums(
+                    np.asarray(weight[:stop].any(axis=(2, 3))), factor
+                ),
+            )
+            output.append((g, self._average(g, sums)))
+            times, uvw = times[stop:], uvw[stop:]
+            vis, weight = vis[stop:], weight[stop:]
+
+        if times.shape[0]:
+            self._add(window, times, uvw, vis, weight)
+        return output
+
+    def _add(
+        self,
+        window: _Window,
+        times: np.ndarray,
+        uvw: np.ndarray,
+        vis: np.ndarray,
+        weight: np.ndarray,
+    ) -> None:
+        """Add integrations to an open window."""
+        if times.shape[0] == 0:
+            return
+        window.n += times.shape[0]
+        window.time += times.sum()
+        window.last_time = times[-1]
+        window.uvw += uvw.sum(axis=0)
+        window.vis += (vis * weight).sum(axis=0)
+        window.weight += weight.sum(axis=0)
+        window.exposure += weight.any(axis=(2, 3)).sum(axis=0)
+
+    def _emit(self, g: int) -> List[Tuple[int, AveragedChunk]]:
+        """Close group ``g``'s open window."""
+        window = self._windows[g]
+        sums = _Sums(
+            n=np.array([window.n]),
+            time=np.array([window.time]),
+            uvw=window.uvw[np.newaxis],
+            vis=window.vis[np.newaxis],
+            weight=window.weight[np.newaxis],
+            exposure=window.exposure[np.newaxis],
+        )
+        group = self.groups[g]
+        self._windows[g] = _Window(
+            group.baselines.shape[0], self.n_channels, self.n_pol
+        )
+        return [(g, self._average(g, sums))]
+
+    def _average(self, g: int, sums: _Sums) -> AveragedChunk:
+        """Turn window sums of shape (n_windows, n_group, ...) into rows."""
+        group = self.groups[g]
+        n_windows, n_group = sums.uvw.shape[:2]
+        vis, weight = sums.vis, sums.weight
+        if group.channel_factor > 1:
+            vis = np.add.reduceat(vis, group.channel_starts, axis=2)
+            weight = np.add.reduceat(weight, group.channel_starts, axis=2)
+        weight = weight.astype(np.float32)
+        flags = weight == 0
+        mean = np.divide(
+            vis, weight, out=np.zeros(vis.shape, dtype=np.complex64), where=~flags
+        )
+
+        n_rows = n_windows * n_group
+        row_shape = (n_rows,) + mean.shape[2:]
+        return AveragedChunk(
+            time=np.repeat(sums.time / sums.n, n_group),
+            baseline=np.tile(group.baselines, n_windows).astype(np.int32),
+            antenna1=np.tile(self.baselines.antenna1[group.baselines], n_windows),
+            antenna2=np.tile(self.baselines.antenna2[group.baselines], n_windows),
+            uvw=(sums.uvw / sums.n[:, np.newaxis, np.newaxis]).reshape(n_rows, 3),
+            vis=mean.reshape(row_shape),
+            flags=flags.reshape(row_shape),
+            weight=weight.reshape(row_shape),
+            exposure=(sums.exposure * self.integration_seconds).reshape(n_rows),
+        )
+
+
+class AveragingWriter:
+    """Average visibility chunks and append them to one store per group."""
+
+    def __init__(
+        self,
+        path: str,
+        baselines: BaselineIndex,
+        frequencies_hz: np.ndarray,
+        stokes: Sequence[str],
+        integration_seconds: float,
+        spec: AveragingSpec = AveragingSpec(),
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Create the group stores below ``path``.
+
+        Args:
+            path: Output directory.
+            baselines: Input baselines in row order, with lengths.
+            frequencies_hz: Input channel frequencies in Hz.
+            stokes: Correlation products.
+            integration_seconds: Input integration time in seconds.
+            spec: Smearing tolerance and factor limits.
+            metadata: Observation metadata copied to every group store.
+        """
+        self.averager = BaselineAverager(
+            baselines, frequencies_hz, integration_seconds, len(stokes), spec
+        )
+        metadata = dict(metadata or {})
+        channel_width = float(metadata.get("channel_width_hz", 0.0))
+        self.stores = [
+            VisibilityStore.create(
+                str(Path(path) / group.name), group.frequencies_hz,
+                baselines.antenna1[group.baselines],
+                baselines.antenna2[group.baselines],
+                stokes,
+                {
+                    **metadata,
+                    "time_factor": group.time_factor,
+                    "channel_factor": group.channel_factor,
+                    "integration_seconds": integration_seconds * group.time_factor,
+                    "channel_width_hz": channel_width * group.channel_factor,
+                },
+                baseline_lengths_m=self.averager.lengths_m[group.baselines],
+                antenna_names=baselines.names,
+                averaged=True,
+            )
+            for group in self.averager.groups
+        ]
+        logger.info(
+            f"Averaging into {len(self.stores)} groups under {path} "
+            f"({self.averager.compression:.1f}x compression)"
+        )
+
+    def append(
+        self,
+        time: np.ndarray,
+        antenna1: np.ndarray,
+        antenna2: np.ndarray,
+        uvw: np.ndarray,
+        data: np.ndarray,
+        flag: np.ndarray,
+    ) -> None:
+        """
+        Average one full-rate time chunk.
+
+        Takes the same columns as :meth:`VisibilityStore.append`.
+
+        Completed windows are appended and committed to their group stores.
+        """
+        self._write(self.averager.process(time, uvw, data, flag))
+
+    def close(self) -> None:
+        """Write the partially filled windows at the end of the observation."""
+        self._write(self.averager.flush())
+
+    def _write(self, chunks: List[Tuple[int, AveragedChunk]]) -> None:
+        """Append averaged rows to their group stores."""
+        for g, chunk in chunks:
+            self.stores[g].append(
+                time=chunk.time, antenna1=chunk.antenna1, antenna2=chunk.antenna2,
+                uvw=chunk.uvw, data=chunk.vis, flag=chunk.flags,
+                weight=chunk.weight, exposure=chunk.exposure,
+            )
+
+
+def averaged_stores(path: str) -> List[VisibilityStore]:
+    """
+    Open the group stores written by :class:`AveragingWriter`.
+
+    Args:
+        path: Output directory.
+
+    Returns:
+        Stores ordered by time and channel averaging factor.
+    """
+    stores = [
+        VisibilityStore(str(header.parent))
+        for header in Path(path).glob(f"*/{VISIBILITY_STORE_HEADER}")
+    ]
+    return sorted(
+        stores, key=lambda s: (s.metadata["time_factor"], s.metadata["channel_factor"])
+    )
@@ -0,0 +1,231 @@
+"""
+Baseline index and selection for SOS (SKA Observation Simulator).
+
+Baselines of an array are indexed once by length and by antenna: the
+length index is a permutation sorting the baselines by length, and the
+antenna index lists, for every antenna, the baselines it belongs to.
+Queries such as "baselines shorter than 2 km" or "all baselines to SKA001"
+are then a binary search and a slice instead of a scan over all pairs.
+"""
+
+from typing import Dict, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from sos.core.uvw import baseline_vectors
+
+AntennaKey = Union[int, str]
+"""Antenna index or station name."""
+
+
+class BaselineSelection(NamedTuple):
+    """
+    Baselines to keep, by length and by antenna.
+
+    Attributes:
+        min_length_m: Shortest baseline kept, in metres.
+        max_length_m: Longest baseline kept, in metres (inclusive).
+        antennas: If given, keep only baselines to at least one of these
+            antennas (indices or station names).
+    """
+
+    min_length_m: float = 0.0
+    max_length_m: float = np.inf
+    antennas: Optional[Sequence[AntennaKey]] = None
+
+
+class BaselineIndex:
+    """Length-sorted and per-antenna index over a set of baselines."""
+
+    def __init__(
+        self,
+        antenna1: np.ndarray,
+        antenna2: np.ndarray,
+        lengths_m: Optional[np.ndarray] = None,
+        names: Optional[Sequence[str]] = None,
+    ):
+        """
+        Build the index.
+
+        Args:
+            antenna1: First antenna of each baseline, in row order.
+            antenna2: Second antenna of each baseline, in row order.
+            lengths_m: Baseline lengths in metres; length queries need them.
+            names: Station names by antenna index; name queries need them.
+        """
+        self.antenna1 = np.asarray(antenna1, dtype=np.int32)
+        self.antenna2 = np.asarray(antenna2, dtype=np.int32)
+        self.names = None if names is None else list(names)
+        n_antennas = max(
+            len(self.names or []),
+            int(max(self.antenna1.max(initial=-1), self.antenna2.max(initial=-1))) + 1,
+        )
+
+        self.lengths_m: Optional[np.ndarray] = None
+        if lengths_m is not None:
+            self.lengths_m = np.asarray(lengths_m, dtype=np.float64)
+            self.length_order = np.argsort(self.lengths_m, kind="stable")
+            self.sorted_lengths_m = self.lengths_m[self.length_order]
+
+        # Baselines of antenna a:
+        # antenna_order[antenna_offsets[a]:antenna_offsets[a + 1]]
+        rows = np.arange(self.antenna1.shape[0], dtype=np.int64)
+        rows = np.concatenate([rows, rows])
+        owners = np.concatenate([self.antenna1, self.antenna2])
+        order = np.lexsort((rows, owners))
+        self.antenna_order = rows[order]
+        self.antenna_offsets = np.searchsorted(owners[order], np.arange(n_antennas + 1))
+
+    @classmethod
+    def from_antennas(
+        cls,
+        xyz: np.ndarray,
+        antenna1: np.ndarray,
+        antenna2: np.ndarray,
+        names: Optional[Sequence[str]] = None,
+    ) -> "BaselineIndex":
+        """
+        Index baselines of an antenna table, with lengths from its positions.
+
+        Args:
+            xyz: Antenna positions in metres, shape (n_antennas, 3).
+            antenna1: First antenna index per baseline.
+            antenna2: Second antenna index per baseline.
+            names: Station names by antenna index.
+
+        Returns:
+            BaselineIndex over the given baselines.
+        """
+        lengths = np.linalg.norm(baseline_vectors(xyz, antenna1, antenna2), axis=1)
+        return cls(antenna1, antenna2, lengths, names)
+
+    @property
+    def n_baselines(self) -> int:
+        """Number of indexed baselines."""
+        return self.antenna1.shape[0]
+
+    def antenna_id(self, antenna: AntennaKey) -> int:
+        """
+        Antenna index of an index or station name.
+
+        Raises:
+            KeyError: If the station name is unknown.
+        """
+        if isinstance(antenna, str):
+            if self.names is None or antenna not in self.names:
+                raise KeyError(f"Unknown station '{antenna}'")
+            return self.names.index(antenna)
+        return int(antenna)
+
+    def by_length(
+        self, min_length_m: float = 0.0, max_length_m: float = np.inf
+    ) -> np.ndarray:
+        """
+        Baselines with min_length_m <= length <= max_length_m, shortest first.
+
+        Returns:
+            Baseline (row offset) indices; a slice of the length index.
+
+        Raises:
+            ValueError: If the index has no baseline lengths.
+        """
+        if self.lengths_m is None:
+            raise ValueError("Baseline lengths are not indexed")
+        start = np.searchsorted(self.sorted_lengths_m, min_length_m, side="left")
+        stop = np.searchsorted(self.sorted_lengths_m, max_length_m, side="right")
+        return self.length_order[start:stop]
+
+    def by_antenna(self, antenna: AntennaKey) -> np.ndarray:
+        """
+        Baselines to one antenna, in row order.
+
+        Returns:
+            Baseline (row offset) indices; a slice of the antenna index.
+        """
+        a = self.antenna_id(antenna)
+        if not 0 <= a < self.antenna_offsets.shape[0] - 1:
+            return np.zeros(0, dtype=np.int64)
+        return self.antenna_order[self.antenna_offsets[a]:self.antenna_offsets[a + 1]]
+
+    def pair(self, antenna1: AntennaKey, antenna2: AntennaKey) -> int:
+        """
+        Baseline index of an antenna pair, in either order.
+
+        Raises:
+            KeyError: If the pair is not indexed.
+        """
+        a1, a2 = sorted((self.antenna_id(antenna1), self.antenna_id(antenna2)))
+        candidates = self.by_antenna(a1)
+        match = candidates[self.antenna2[candidates] == a2]
+        if match.shape[0] == 0:
+            raise KeyError(f"Baseline ({antenna1}, {antenna2}) not indexed")
+        return int(match[0])
+
+    def select(self, selection: Optional[BaselineSelection]) -> np.ndarray:
+        """
+        Baselines matching a selection, in row order.
+
+        Args:
+            selection: Length and antenna criteria; None selects everything.
+
+        Returns:
+            Sorted baseline (row offset) indices.
+        """
+        keep = np.ones(self.n_baselines, dtype=bool)
+        if selection is None:
+            return np.flatnonzero(keep)
+        if selection.min_length_m > 0 or np.isfinite(selection.max_length_m):
+            keep[:] = False
+            keep[self.by_length(selection.min_length_m, selection.max_length_m)] = True
+        if selection.antennas is not None:
+            to_antennas = np.zeros(self.n_baselines, dtype=bool)
+            for antenna in selection.antennas:
+                to_antennas[self.by_antenna(antenna)] = True
+            keep &= to_antennas
+        return np.flatnonzero(keep)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Return the index as plain arrays, accepted by :meth:`from_arrays`.
+
+        Returns:
+            Dictionary with ``antenna1``, ``antenna2`` and, where known,
+            ``length_m``, ``length_order`` and ``names``, plus the antenna
+            index ``antenna_order`` and ``antenna_offsets``.
+        """
+        arrays: Dict[str, np.ndarray] = {
+            "antenna1": self.antenna1,
+            "antenna2": self.antenna2,
+            "antenna_order": self.antenna_order,
+            "antenna_offsets": self.antenna_offsets,
+        }
+        if self.lengths_m is not None:
+            arrays["length_m"] = self.lengths_m
+            arrays["length_order"] = self.length_order
+        if self.names is not None:
+            arrays["names"] = np.array(self.names)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "BaselineIndex":
+        """
+        Rebuild an index from :meth:`to_arrays` output without re-sorting.
+
+        Args:
+            arrays: Dictionary of index arrays.
+
+        Returns:
+            BaselineIndex over the stored arrays.
+        """
+        index = cls.__new__(cls)
+        index.antenna1 = np.asarray(arrays["antenna1"], dtype=np.int32)
+        index.antenna2 = np.asarray(arrays["antenna2"], dtype=np.int32)
+        index.antenna_order = np.asarray(arrays["antenna_order"])
+        index.antenna_offsets = np.asarray(arrays["antenna_offsets"])
+        index.names = arrays["names"].tolist() if "names" in arrays else None
+        index.lengths_m = None
+        if "length_m" in arrays:
+            index.lengths_m = np.asarray(arrays["length_m"], dtype=np.float64)
+            index.length_order = np.asarray(arrays["length_order"])
+            index.sorted_lengths_m = index.lengths_m[index.length_order]
+        return index
@@ -0,0 +1,217 @@
+"""
+Cosmological distance tables for SOS (SKA Observation Simulator).
+
+Numerically integrates the comoving distance for a general (H0, Ω_m, Ω_Λ,
+w0, wa) cosmology once, stores the cumulative integral on a dense redshift
+grid, and answers distance queries by interpolation. Tables are cached on
+disk keyed by the cosmological parameters so repeated jobs start instantly.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from sos.constants import (
+    SPEED_OF_LIGHT_KM_S,
+    HUBBLE_CONSTANT,
+    MATTER_DENSITY_PARAMETER,
+    DARK_ENERGY_W0,
+    DARK_ENERGY_WA,
+    MAX_REDSHIFT,
+    DISTANCE_TABLE_POINTS,
+    DISTANCE_TABLE_CACHE_DIR,
+)
+from sos.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class DistanceTable:
+    """Interpolated comoving and angular diameter distances for one cosmology."""
+
+    def __init__(
+        self,
+        h0: float = HUBBLE_CONSTANT,
+        omega_m: float = MATTER_DENSITY_PARAMETER,
+        omega_lambda: Optional[float] = None,
+        w0: float = DARK_ENERGY_W0,
+        wa: float = DARK_ENERGY_WA,
+        z_max: float = MAX_REDSHIFT,
+        n_points: int = DISTANCE_TABLE_POINTS,
+        cache_dir: Optional[Union[str, Path]] = DISTANCE_TABLE_CACHE_DIR,
+    ):
+        """
+        Build or load the distance table.
+
+        Args:
+            h0: Hubble constant in km/s/Mpc.
+            omega_m: Matter density parameter.
+            omega_lambda: Dark energy density parameter (default: 1 - Ω_m, flat).
+            w0: Dark energy equation of state today.
+            wa: Dark energy equation of state evolution (w = w0 + wa z/(1+z)).
+            z_max: Largest redshift covered by the table.
+            n_points: Number of redshift samples in the table.
+            cache_dir: Directory for cached tables, or None to disable caching.
+
+        Raises:
+            ValueError: If parameters are invalid.
+        """
+        if h0 <= 0:
+            raise ValueError(f"Hubble constant must be positive, got {h0}")
+        if z_max <= 0 or n_points < 2:
+            raise ValueError(f"Invalid table grid: z_max={z_max}, n_points={n_points}")
+
+        self.h0 = float(h0)
+        self.omega_m = float(omega_m)
+        self.omega_lambda = float(
+            1.0 - omega_m if omega_lambda is None else omega_lambda
+        )
+        self.omega_k = 1.0 - self.omega_m - self.omega_lambda
+        self.w0 = float(w0)
+        self.wa = float(wa)
+        self.z_max = float(z_max)
+        self.n_points = int(n_points)
+        self.hubble_distance = SPEED_OF_LIGHT_KM_S / self.h0
+
+        self.redshifts = np.linspace(0.0, self.z_max, self.n_points)
+        self.cache_path = (
+            Path(cache_dir).expanduser() / f"distances_{self.cache_key}.npy"
+            if cache_dir is not None else None
+        )
+
+        cached = self._load_cached()
+        self.comoving = self._integrate() if cached is None else cached
+        if cached is None:
+            self._save_cached()
+
+    @property
+    def cache_key(self) -> str:
+        """Hash identifying the cosmology and grid of this table."""
+        params = (
+            f"{self.h0!r},{self.omega_m!r},{self.omega_lambda!r},"
+            f"{self.w0!r},{self.wa!r},{self.z_max!r},{self.n_points}"
+        )
+        return hashlib.sha1(params.encode()).hexdigest()[:16]
+
+    def efunc(self, redshift: np.ndarray) -> np.ndarray:
+        """
+        Dimensionless Hubble parameter E(z) = H(z) / H0.
+
+        Args:
+            redshift: Redshift z.
+
+        Returns:
+            E(z) for each redshift.
+        """
+        zp1 = 1.0 + np.asarray(redshift, dtype=np.float64)
+        dark_energy = zp1 ** (3.0 * (1.0 + self.w0 + self.wa)) * np.exp(
+            -3.0 * self.wa * (zp1 - 1.0) / zp1
+        )
+        return np.sqrt(
+            self.omega_m * zp1 ** 3 +
+            self.omega_k * zp1 ** 2 +
+            self.omega_lambda * dark_energy
+        )
+
+    def _integrate(self) -> np.ndarray:
+        """Cumulative trapezoidal integral of c/H(z) on the redshift grid."""
+        integrand = 1.0 / self.efunc(self.redshifts)
+        steps = 0.5 * (integrand[1:] + integrand[:-1]) * np.diff(self.redshifts)
+        comoving = np.empty_like(self.redshifts)
+        comoving[0] = 0.0
+        np.cumsum(steps, out=comoving[1:])
+
+        logger.debug(
+            f"Integrated distance table: H0={self.h0}, Ω_m={self.omega_m}, "
+            f"Ω_Λ={self.omega_lambda}, w0={self.w0}, wa={self.wa}"
+        )
+        return comoving * self.hubble_distance
+
+    def _load_cached(self) -> Optional[np.ndarray]:
+        """Load the table from the cache directory if present and valid."""
+        if self.cache_path is None or not self.cache_path.is_file():
+            return None
+        try:
+            comoving = np.load(self.cache_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable distance table {self.cache_path}: {e}")
+            return None
+        if comoving.shape != self.redshifts.shape:
+            return None
+
+        logger.debug(f"Loaded distance table from {self.cache_path}")
+        return comoving
+
+    def _save_cached(self) -> None:
+        """Write the table to the cache directory (atomically)."""
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".npy")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, self.comoving)
+            os.replace(tmp_name, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache distance table to {self.cache_path}: {e}")
+
+    def _check_range(self, z: np.ndarray) -> None:
+        """Raise ValueError if any redshift lies outside the table."""
+        if z.size and (np.min(z) < 0.0 or np.max(z) > self.z_max):
+            raise ValueError(
+                f"Redshift out of table range [0, {self.z_max}]: "
+                f"[{np.min(z)}, {np.max(z)}]"
+            )
+
+    def comoving_distance(self, redshift: np.ndarray) -> np.ndarray:
+        """
+        Line-of-sight comoving distance in Mpc.
+
+        Args:
+            redshift: Redshift z (scalar or array).
+
+        Returns:
+            Comoving distance in Mpc.
+
+        Raises:
+            ValueError: If redshift outside the table.
+        """
+        z = np.asarray(redshift, dtype=np.float64)
+        self._check_range(z)
+        return np.interp(z, self.redshifts, self.comoving)
+
+    def transverse_comoving_distance(self, redshift: np.ndarray) -> np.ndarray:
+        """
+        Transverse comoving distance in Mpc, including spatial curvature.
+
+        Args:
+            redshift: Redshift z (scalar or array).
+
+        Returns:
+            Transverse comoving distance in Mpc.
+        """
+        d_c = self.comoving_distance(redshift)
+        if self.omega_k == 0:
+            return d_c
+
+        sqrt_ok = np.sqrt(abs(self.omega_k))
+        x = sqrt_ok * d_c / self.hubble_distance
+        curved = np.sinh(x) if self.omega_k > 0 else np.sin(x)
+        return self.hubble_distance / sqrt_ok * curved
+
+    def angular_diameter_distance(self, redshift: np.ndarray) -> np.ndarray:
+        """
+        Angular diameter distance in Mpc.
+
+        Args:
+            redshift: Redshift z (scalar or array).
+
+        Returns:
+            Angular diameter distance in Mpc.
+        """
+        z = np.asarray(redshift, dtype=np.float64)
+        return self.transverse_comoving_distance(z) / (1.0 + z)
@@ -5,21 +5,57 @@ Creates synthetic radio sky models based on cosmological parameters
 and source properties.
 """
 
-from typing import List, Tuple, Optional
+import re
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, NamedTuple, Tuple, Optional, Sequence, Union
 from pathlib import Path
 
+import numpy as np
+
 from sos.constants import (
     SPEED_OF_LIGHT_KM_S,
     HUBBLE_CONSTANT,
     MATTER_DENSITY_PARAMETER,
+    DARK_ENERGY_W0,
+    DARK_ENERGY_WA,
+    DISTANCE_TABLE_CACHE_DIR,
     ARCMIN_PER_RADIAN,
+    ARCSEC_PER_RADIAN,
+    DEGREES_PER_RA_HOUR,
+    RA_ARCSEC_PER_SECOND,
+    SOURCE_TYPE_EXTENDED,
+    SOURCE_TYPE_POINT,
+    SOURCE_TYPE_MIXED,
+    DEFAULT_POINT_SOURCE_SIZE_ARCSEC,
+    DEFAULT_POSITION_ANGLE,
+    RANDOM_SOURCE_REGION_SIZE,
+    NUM_RANDOM_POINT_SOURCES,
+    NUMPY_IMAGE_EXTENSION,
+    FITS_EXTENSION,
+    DEFAULT_TILE_SIZE,
+)
+from sos.core.distances import DistanceTable
+from sos.core.rasterize import render_components, render_tiled
+from sos.core.sky_model import (
+    ComponentList,
+    GaussianComponent,
+    ModelImage,
+    create_model_image_file,
 )
 from sos.utils.logger import setup_logger
-from sos.utils.coordinates import ra_arcsec_to_hms, dec_arcsec_to_dms
+from sos.utils.coordinates import (
+    ra_arcsec_to_hms,
+    dec_arcsec_to_dms,
+    parse_ra_hms,
+    parse_dec_dms,
+    radec_to_lm,
+)
 from sos.utils.validators import validate_redshifts, validate_image_parameters
 
 logger = setup_logger(__name__)
 
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
 
 class CosmologyCalculator:
     """Calculate cosmological distances and source properties."""
@@ -27,7 +63,12 @@ class CosmologyCalculator:
     def __init__(
         self,
         h0: float = HUBBLE_CONSTANT,
-        omega_m: float = MATTER_DENSITY_PARAMETER
+        omega_m: float = MATTER_DENSITY_PARAMETER,
+        omega_lambda: Optional[float] = None,
+        w0: float = DARK_ENERGY_W0,
+        wa: float = DARK_ENERGY_WA,
+        distance_method: str = "closed_form",
+        cache_dir: Optional[str] = DISTANCE_TABLE_CACHE_DIR,
     ):
         """
         Initialize cosmology calculator.
@@ -35,40 +76,146 @@ class CosmologyCalculator:
         Args:
             h0: Hubble constant in km/s/Mpc (default: Planck 2015).
             omega_m: Matter density parameter (default: Planck 2015).
+            omega_lambda: Dark energy density parameter (default: 1 - Ω_m).
+            w0: Dark energy equation of state today (integrated method only).
+            wa: Dark energy equation of state evolution (integrated method only).
+            distance_method: "closed_form" (Schneider 2006 approximation) or
+                "integrated" (interpolated numerical integration, see
+                :class:`sos.core.distances.DistanceTable`).
+            cache_dir: Cache directory for integrated distance tables
+                (None disables the on-disk cache).
+
+        Raises:
+            ValueError: If the distance method is unknown, or dark energy
+                parameters are given for the closed-form method.
         """
+        if distance_method not in ("closed_form", "integrated"):
+            raise ValueError(
+                f"Unknown distance method '{distance_method}'. "
+                f"Use 'closed_form' or 'integrated'"
+            )
+        if distance_method == "closed_form" and (
+            omega_lambda is not None or w0 != DARK_ENERGY_W0 or wa != DARK_ENERGY_WA
+        ):
+            raise ValueError(
+                "omega_lambda, w0 and wa require distance_method='integrated'"
+            )
+
         self.h0 = h0
         self.omega_m = omega_m
-        logger.info(f"Initialized cosmology with H0={h0}, Ω_m={omega_m}")
+        self.distance_method = distance_method
+        self.distance_table = None
+        if distance_method == "integrated":
+            self.distance_table = DistanceTable(
+                h0, omega_m, omega_lambda, w0, wa, cache_dir=cache_dir
+            )
+        logger.info(
+            f"Initialized cosmology with H0={h0}, Ω_m={omega_m} ({distance_method})"
+        )
 
-    def angular_diameter_distance(self, redshift: float) -> float:
+    def angular_diameter_distance_array(self, redshift: ArrayLike) -> np.ndarray:
         """
-        Calculate angular diameter distance using ΛCDM cosmology.
+        Calculate angular diameter distances for an array of redshifts.
 
         Uses closed-form approximation from Schneider (2006) 'Extragalactic Astronomy
-        and Cosmology', Section 4.3.3.
+        and Cosmology', Section 4.3.3, evaluated in a single NumPy pass, or
+        interpolates the integrated distance table for ``distance_method="integrated"``.
 
         Args:
-            redshift: Redshift z.
+            redshift: Redshift z (scalar or array).
 
         Returns:
-            Angular diameter distance in Mpc.
+            Angular diameter distance in Mpc, same shape as ``redshift``.
         """
-        if redshift == 0:
-            return 0.0
+        z = np.asarray(redshift, dtype=np.float64)
+        if self.distance_table is not None:
+            return self.distance_table.angular_diameter_distance(z)
 
-        omega_l = 1.0 - self.omega_m
         numerator = (
             SPEED_OF_LIGHT_KM_S * 2.0 *
-            (self.omega_m * redshift +
-             (self.omega_l - 2.0) * (((1.0 + self.omega_m * redshift) ** 0.5) - 1.0))
-        )
-        denominator = (
-            self.h0 *
-            (self.omega_m * (1.0 + redshift)) ** 2
+            (self.omega_m * z +
+             (self.omega_m - 2.0) * (np.sqrt(1.0 + self.omega_m * z) - 1.0))
         )
+        denominator = self.h0 * (self.omega_m * (1.0 + z)) ** 2
 
         return numerator / denominator
 
+    def flux_density_array(
+        self,
+        flux_ref: ArrayLike,
+        z_ref: ArrayLike,
+        z_target: ArrayLike,
+        spectral_index: ArrayLike = -1.6
+    ) -> np.ndarray:
+        """
+        Calculate flux densities at target redshifts using k-correction.
+
+        All arguments broadcast against each other; the reference distance is
+        evaluated once per call.
+
+        Args:
+            flux_ref: Reference flux density in Jy.
+            z_ref: Reference redshift.
+            z_target: Target redshift(s).
+            spectral_index: Spectral index (default: -1.6 for radio halos).
+
+        Returns:
+            Flux density at target redshift in Jy (broadcast shape of inputs).
+        """
+        flux_ref = np.asarray(flux_ref, dtype=np.float64)
+        z_ref = np.asarray(z_ref, dtype=np.float64)
+        z_target = np.asarray(z_target, dtype=np.float64)
+
+        d_ref = self.angular_diameter_distance_array(z_ref)
+        d_target = self.angular_diameter_distance_array(z_target)
+
+        k_correction = ((1.0 + z_target) / (1.0 + z_ref)) ** spectral_index
+        with np.errstate(divide="ignore", invalid="ignore"):
+            flux = flux_ref * (d_ref / d_target) ** 2 * k_correction
+
+        # Distances of zero (z = 0) leave the reference flux unchanged
+        return np.where((d_ref == 0) | (d_target == 0), flux_ref, flux)
+
+    def angular_size_array(
+        self,
+        linear_size_mpc: ArrayLike,
+        redshift: ArrayLike
+    ) -> np.ndarray:
+        """
+        Calculate angular sizes of sources for arrays of sizes and redshifts.
+
+        θ = L / D_A where L is linear size and D_A is angular diameter distance.
+
+        Args:
+            linear_size_mpc: Linear size in Mpc (broadcasts against ``redshift``).
+            redshift: Redshift z.
+
+        Returns:
+            Angular size in arcminutes (broadcast shape of inputs).
+        """
+        linear_size_mpc = np.asarray(linear_size_mpc, dtype=np.float64)
+        d_a = self.angular_diameter_distance_array(redshift)
+
+        # Convert from radians to arcminutes
+        with np.errstate(divide="ignore", invalid="ignore"):
+            angular_size_arcmin = linear_size_mpc / d_a * ARCMIN_PER_RADIAN
+
+        return np.where(d_a == 0, 0.0, angular_size_arcmin)
+
+    def angular_diameter_distance(self, redshift: float) -> float:
+        """
+        Calculate angular diameter distance using ΛCDM cosmology.
+
+        Scalar wrapper around :meth:`angular_diameter_distance_array`.
+
+        Args:
+            redshift: Redshift z.
+
+        Returns:
+            Angular diameter distance in Mpc.
+        """
+        return float(self.angular_diameter_distance_array(redshift))
+
     def calculate_flux_density(
         self,
         flux_ref: float,
@@ -79,6 +226,8 @@ class CosmologyCalculator:
         """
         Calculate flux density at target redshift using k-correction.
 
+        Scalar wrapper around :meth:`flux_density_array`.
+
         Args:
             flux_ref: Reference flux density in Jy.
             z_ref: Reference redshift.
@@ -88,16 +237,9 @@ class CosmologyCalculator:
         Returns:
             Flux density at target redshift in Jy.
         """
-        d_ref = self.angular_diameter_distance(z_ref)
-        d_target = self.angular_diameter_distance(z_target)
-
-        if d_ref == 0 or d_target == 0:
-            return flux_ref
-
-        k_correction = ((1.0 + z_target) / (1.0 + z_ref)) ** spectral_index
-        flux = flux_ref * (d_ref / d_target) ** 2 * k_correction
-
-        return flux
+        return float(
+            self.flux_density_array(flux_ref, z_ref, z_target, spectral_index)
+        )
 
     def calculate_angular_size(
         self,
@@ -107,7 +249,7 @@ class CosmologyCalculator:
         """
         Calculate angular size of a source at given redshift.
 
-        θ = L / D_A where L is linear size and D_A is angular diameter distance.
+        Scalar wrapper around :meth:`angular_size_array`.
 
         Args:
             linear_size_mpc: Linear size in Mpc.
@@ -116,16 +258,54 @@ class CosmologyCalculator:
         Returns:
             Angular size in arcminutes.
         """
-        d_a = self.angular_diameter_distance(redshift)
+        return float(self.angular_size_array(linear_size_mpc, redshift))
+
+
+def random_point_source_offsets(
+    rng: np.random.Generator,
+    n_sources: int = NUM_RANDOM_POINT_SOURCES,
+) -> List[Tuple[float, float]]:
+    """
+    Draw random point source offsets around the halo, as in ``make_img.py``.
+
+    Offsets are drawn so that |dRA| (in RA seconds) plus |dDEC| (in units of
+    15 arcsec) equals ``RANDOM_SOURCE_REGION_SIZE``, mirrored into all four
+    quadrants, and ``n_sources`` of the candidates are kept.
+
+    Args:
+        rng: Random number generator.
+        n_sources: Number of point sources to return.
+
+    Returns:
+        List of (RA offset, DEC offset) pairs in arcsec.
+    """
+    d_ra = rng.integers(1, RANDOM_SOURCE_REGION_SIZE, size=n_sources)
+    d_dec = RA_ARCSEC_PER_SECOND * (RANDOM_SOURCE_REGION_SIZE - d_ra)
+
+    candidates = []
+    for sign_ra, sign_dec in ((1, 1), (1, -1), (-1, -1), (-1, 1)):
+        for a, b in zip(d_ra, d_dec):
+            candidates.append(
+                (sign_ra * float(a) * RA_ARCSEC_PER_SECOND, sign_dec * float(b))
+            )
 
-        if d_a == 0:
-            return 0.0
+    chosen = rng.choice(len(candidates), size=n_sources, replace=False)
+    return [candidates[i] for i in chosen]
 
-        # Convert from radians to arcminutes
-        angular_size_rad = linear_size_mpc / d_a
-        angular_size_arcmin = angular_size_rad * ARCMIN_PER_RADIAN
 
-        return angular_size_arcmin
+class ModelSkyJob(NamedTuple):
+    """
+    Outcome of rendering the model image of one redshift.
+
+    Attributes:
+        redshift: Source redshift.
+        path: Path of the written image, or None if rendering failed.
+        error: Error message if rendering failed, else None.
+    """
+
+    redshift: float
+    path: Optional[str]
+    error: Optional[str]
 
 
 class ImageMaker:
@@ -136,6 +316,10 @@ class ImageMaker:
         cell_size: str = "0.01arcsec",
         image_size: int = 7200,
         reference_frequency: str = "9.2GHz",
+        reference_ra: str = "04h00m00.0s",
+        reference_dec: str = "-20d00m00.0s",
+        tile_size: Union[int, Tuple[int, int]] = DEFAULT_TILE_SIZE,
+        threads: int = 1,
     ):
         """
         Initialize image maker.
@@ -144,19 +328,243 @@ class ImageMaker:
             cell_size: Pixel size (e.g., "0.01arcsec").
             image_size: Number of pixels per side.
             reference_frequency: Reference frequency for image.
+            reference_ra: Right Ascension of the image centre (e.g., "04h00m00.0s").
+            reference_dec: Declination of the image centre (e.g., "-20d00m00.0s").
+            tile_size: Side of the square tiles rendered into FITS output, or
+                their (rows, columns) shape.
+            threads: Number of threads rendering tiles (FITS output) or row
+                blocks (in-memory images) of one image concurrently. The
+                result is bit-identical for any thread count.
+
+        Raises:
+            ValueError: If tile size, thread count or image parameters invalid.
         """
+        tile_shape = (
+            (tile_size, tile_size) if isinstance(tile_size, int) else tuple(tile_size)
+        )
+        if len(tile_shape) != 2 or not all(
+            isinstance(side, int) and side > 0 for side in tile_shape
+        ):
+            raise ValueError(
+                f"Tile size must be a positive integer or (rows, columns) pair, "
+                f"got {tile_size}"
+            )
+        if threads < 1:
+            raise ValueError(f"threads must be at least 1, got {threads}")
+
         validate_image_parameters(cell_size, image_size, reference_frequency)
 
         self.cell_size = cell_size
         self.image_size = image_size
         self.reference_frequency = reference_frequency
+        self.reference_ra = reference_ra
+        self.reference_dec = reference_dec
+        self.tile_size = tile_size
+        self.tile_shape = tile_shape
+        self.threads = threads
         self.cosmology = CosmologyCalculator()
 
+        self.cell_rad = _parse_quantity(cell_size, "arcsec") / ARCSEC_PER_RADIAN
+        self.reference_frequency_hz = _parse_quantity(reference_frequency, "GHz") * 1e9
+        self.ref_ra_rad = float(
+            np.radians(parse_ra_hms(reference_ra) * DEGREES_PER_RA_HOUR)
+        )
+        self.ref_dec_rad = float(np.radians(parse_dec_dms(reference_dec)))
+
         logger.info(
             f"Initialized ImageMaker: {image_size}x{image_size} pixels, "
             f"{cell_size} resolution, {reference_frequency}"
         )
 
+    def model_components(
+        self,
+        flux_jy: float,
+        angular_size_arcmin: float,
+        source_type: int = SOURCE_TYPE_EXTENDED,
+        point_source_offsets: Optional[List[Tuple[float, float]]] = None,
+    ) -> List[GaussianComponent]:
+        """
+        Build the Gaussian components of one model sky, as ``mkmodelsky`` does.
+
+        Extended sources are a halo of FWHM ``angular_size_arcmin``; mixed
+        sources add halos of half and a third that size with two and three
+        times the flux, plus the point sources. Point source ``i`` has flux
+        0.1 + 0.1 i Jy and FWHM ``DEFAULT_POINT_SOURCE_SIZE_ARCSEC``.
+
+        Args:
+            flux_jy: Halo flux density in Jy.
+            angular_size_arcmin: Halo FWHM in arcminutes.
+            source_type: SOURCE_TYPE_EXTENDED, SOURCE_TYPE_POINT or SOURCE_TYPE_MIXED.
+            point_source_offsets: (RA, DEC) offsets in arcsec from the image centre.
+
+        Returns:
+            List of Gaussian components.
+
+        Raises:
+            ValueError: If source type is unknown.
+        """
+        if source_type not in (
+            SOURCE_TYPE_EXTENDED, SOURCE_TYPE_POINT, SOURCE_TYPE_MIXED
+        ):
+            raise ValueError(f"Unknown source type: {source_type}")
+
+        position_angle = float(np.radians(float(DEFAULT_POSITION_ANGLE[:-len("deg")])))
+        components = []
+
+        if source_type in (SOURCE_TYPE_EXTENDED, SOURCE_TYPE_MIXED):
+            halo_fwhm = angular_size_arcmin * 60.0 / ARCSEC_PER_RADIAN
+            scales = (1,) if source_type == SOURCE_TYPE_EXTENDED else (1, 2, 3)
+            for scale in scales:
+                components.append(GaussianComponent(
+                    scale * flux_jy, 0.0, 0.0, halo_fwhm / scale,
+                    position_angle_rad=position_angle,
+                ))
+
+        if source_type in (SOURCE_TYPE_POINT, SOURCE_TYPE_MIXED):
+            offsets = np.asarray(
+                point_source_offsets or [], dtype=np.float64
+            ).reshape(-1, 2)
+            l, m = radec_to_lm(
+                self.ref_ra_rad + offsets[:, 0] / ARCSEC_PER_RADIAN,
+                self.ref_dec_rad + offsets[:, 1] / ARCSEC_PER_RADIAN,
+                self.ref_ra_rad,
+                self.ref_dec_rad,
+            )
+            point_fwhm = DEFAULT_POINT_SOURCE_SIZE_ARCSEC / ARCSEC_PER_RADIAN
+            for i in range(offsets.shape[0]):
+                components.append(GaussianComponent(
+                    0.1 + 0.1 * i, l[i], m[i], point_fwhm,
+                    position_angle_rad=position_angle,
+                ))
+
+        return components
+
+    def component_list(self, components: List[GaussianComponent]) -> ComponentList:
+        """
+        Wrap components with this maker's phase centre and reference frequency.
+
+        The result can be passed to
+        :meth:`VisibilitySimulator.simulate_components` to predict
+        visibilities without rendering an image.
+
+        Args:
+            components: Components, e.g. from :meth:`model_components`.
+
+        Returns:
+            ComponentList referenced to the image centre.
+        """
+        return ComponentList(
+            components, self.ref_ra_rad, self.ref_dec_rad, self.reference_frequency_hz
+        )
+
+    def sweep_components(
+        self,
+        redshifts: List[float],
+        linear_size_mpc: float = 0.5,
+        reference_flux_jy: float = 0.6,
+        spectral_index: float = -1.6,
+        source_type: int = SOURCE_TYPE_EXTENDED,
+        seed: Optional[int] = None,
+    ) -> List[ComponentList]:
+        """
+        Build the component list of the model sky at each redshift.
+
+        Halo fluxes and sizes for all redshifts come from one vectorized
+        cosmology pass; point sources (if any) are drawn once and shared, as
+        in ``make_img.py``. The result feeds
+        :meth:`VisibilitySimulator.simulate_sweep`.
+
+        Args:
+            redshifts: List of redshifts.
+            linear_size_mpc: Linear size of source in Mpc.
+            reference_flux_jy: Flux density in Jy at the first redshift.
+            spectral_index: Spectral index.
+            source_type: SOURCE_TYPE_EXTENDED, SOURCE_TYPE_POINT or SOURCE_TYPE_MIXED.
+            seed: Seed for the random point source positions.
+
+        Returns:
+            One ComponentList per redshift.
+
+        Raises:
+            ValueError: If parameters invalid.
+        """
+        validate_redshifts(redshifts)
+
+        point_source_offsets = None
+        if source_type in (SOURCE_TYPE_POINT, SOURCE_TYPE_MIXED):
+            point_source_offsets = random_point_source_offsets(
+                np.random.default_rng(seed)
+            )
+
+        fluxes = self.cosmology.flux_density_array(
+            reference_flux_jy, redshifts[0], redshifts, spectral_index
+        )
+        angular_sizes = self.cosmology.angular_size_array(linear_size_mpc, redshifts)
+
+        sky_models = []
+        for z, flux, angular_size in zip(redshifts, fluxes, angular_sizes):
+            logger.debug(
+                f"z={z}: flux={flux:.3f}Jy, angular_size={angular_size:.3f}arcmin"
+            )
+            sky_models.append(self.component_list(self.model_components(
+                flux, angular_size, source_type, point_source_offsets
+            )))
+        return sky_models
+
+    def render_model(
+        self,
+        components: List[GaussianComponent],
+        out: Optional[np.ndarray] = None,
+    ) -> ModelImage:
+        """
+        Rasterize components onto this image grid.
+
+        Args:
+            components: Components to render.
+            out: Optional float32 array of shape (image_size, image_size) to
+                accumulate into in place.
+
+        Returns:
+            ModelImage in Jy/pixel.
+        """
+        data = render_components(
+            components, (self.image_size, self.image_size), self.cell_rad, out=out,
+            threads=self.threads,
+        )
+        return ModelImage(
+            data, self.cell_rad, self.ref_ra_rad, self.ref_dec_rad,
+            self.reference_frequency_hz,
+        )
+
+    def render_model_to_file(
+        self,
+        components: List[GaussianComponent],
+        path: str,
+    ) -> ModelImage:
+        """
+        Rasterize components tile by tile into a memory-mapped FITS image.
+
+        Peak memory is one float32 tile of ``tile_shape`` (two per thread
+        with ``threads > 1``), so 7200² and larger grids never need the
+        full plane in RAM.
+
+        Args:
+            components: Components to render.
+            path: Output ``.fits`` path.
+
+        Returns:
+            ModelImage backed by the writable FITS memmap.
+        """
+        image = create_model_image_file(
+            path, (self.image_size, self.image_size), self.cell_rad,
+            self.ref_ra_rad, self.ref_dec_rad, self.reference_frequency_hz,
+        )
+        render_tiled(
+            components, image.data, self.cell_rad, image.ref_pixel,
+            self.tile_shape, threads=self.threads,
+        )
+        return image
+
     def create_model_sky(
         self,
         redshifts: List[float],
@@ -164,53 +572,184 @@ class ImageMaker:
         reference_flux_jy: float = 0.6,
         spectral_index: float = -1.6,
         output_dir: Optional[str] = None,
+        source_type: int = SOURCE_TYPE_EXTENDED,
+        seed: Optional[int] = None,
+        image_format: str = "fits",
+        workers: int = 1,
     ) -> List[str]:
         """
         Create model sky images for each redshift.
 
+        Images are rendered with the NumPy rasterizer (no CASA required).
+        With ``image_format="fits"`` each image is written tile by tile into
+        a memory-mapped ``modelsky_<z>.fits`` file; ``"npz"`` renders the full
+        plane in memory and saves ``modelsky_<z>.npz``. With ``workers > 1``
+        the redshifts are rendered concurrently (see :meth:`create_model_sky_jobs`).
+
         Args:
             redshifts: List of redshifts.
             linear_size_mpc: Linear size of source in Mpc.
             reference_flux_jy: Reference flux density in Jy.
             spectral_index: Spectral index.
-            output_dir: Output directory for images (optional).
+            output_dir: Output directory for images (default: current directory).
+            source_type: SOURCE_TYPE_EXTENDED, SOURCE_TYPE_POINT or SOURCE_TYPE_MIXED.
+            seed: Seed for the random point source positions.
+            image_format: Output format, "fits" or "npz".
+            workers: Number of processes rendering redshifts in parallel.
 
         Returns:
-            List of created image file paths.
+            List of created image file paths, in redshift order.
 
         Raises:
-            ImportError: If CASA toolkit not available.
             ValueError: If parameters invalid.
+            RuntimeError: If any redshift failed to render; the message lists
+                every failed job.
         """
-        validate_redshifts(redshifts)
+        jobs = self.create_model_sky_jobs(
+            redshifts, linear_size_mpc, reference_flux_jy, spectral_index,
+            output_dir, source_type, seed, image_format, workers,
+        )
+        failed = [job for job in jobs if job.error is not None]
+        if failed:
+            report = "; ".join(f"z={job.redshift}: {job.error}" for job in failed)
+            raise RuntimeError(
+                f"{len(failed)} of {len(jobs)} model images failed: {report}"
+            )
+        # Every job without an error has a path
+        return [job.path for job in jobs if job.path is not None]
 
-        logger.info(f"Creating model sky images for {len(redshifts)} redshifts")
+    def create_model_sky_jobs(
+        self,
+        redshifts: List[float],
+        linear_size_mpc: float = 0.5,
+        reference_flux_jy: float = 0.6,
+        spectral_index: float = -1.6,
+        output_dir: Optional[str] = None,
+        source_type: int = SOURCE_TYPE_EXTENDED,
+        seed: Optional[int] = None,
+        image_format: str = "fits",
+        workers: int = 1,
+    ) -> List[ModelSkyJob]:
+        """
+        Render model sky images per redshift and report each job's outcome.
 
-        try:
-            # CASA imports - will fail if not in CASA environment
-            from casac import casatools  # type: ignore
-        except ImportError:
-            logger.error("CASA toolkit not available. Run this within CASA.")
-            raise ImportError("This function must be run within CASA environment")
+        Component lists are built once for the whole sweep (so random point
+        sources are shared). Each redshift is an independent job writing its
+        own image file; with ``workers > 1`` jobs run in a process pool, so a
+        batch takes about as long as its slowest member. A failing job does
+        not stop the others.
 
-        images = []
+        Args:
+            redshifts: List of redshifts.
+            linear_size_mpc: Linear size of source in Mpc.
+            reference_flux_jy: Reference flux density in Jy.
+            spectral_index: Spectral index.
+            output_dir: Output directory for images (default: current directory).
+            source_type: SOURCE_TYPE_EXTENDED, SOURCE_TYPE_POINT or SOURCE_TYPE_MIXED.
+            seed: Seed for the random point source positions.
+            image_format: Output format, "fits" or "npz".
+            workers: Number of processes rendering redshifts in parallel.
 
-        for z in redshifts:
-            # Calculate properties at this redshift
-            flux = self.cosmology.calculate_flux_density(
-                reference_flux_jy, redshifts[0], z, spectral_index
+        Returns:
+            One :class:`ModelSkyJob` per redshift, in the order of ``redshifts``.
+
+        Raises:
+            ValueError: If parameters invalid.
+        """
+        validate_redshifts(redshifts)
+        if image_format not in ("fits", "npz"):
+            raise ValueError(
+                f"Unknown image format '{image_format}'. Use 'fits' or 'npz'"
             )
-            angular_size = self.cosmology.calculate_angular_size(linear_size_mpc, z)
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
 
-            logger.debug(
-                f"z={z}: flux={flux:.3f}Jy, angular_size={angular_size:.3f}arcmin"
+        logger.info(
+            f"Creating model sky images for {len(redshifts)} redshifts "
+            f"on {workers} process(es)"
+        )
+
+        out_dir = Path(output_dir) if output_dir else Path(".")
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        sky_models = self.sweep_components(
+            redshifts, linear_size_mpc, reference_flux_jy, spectral_index,
+            source_type, seed,
+        )
+        arguments = [
+            (self, z, sky.components, str(out_dir), image_format)
+            for z, sky in zip(redshifts, sky_models)
+        ]
+
+        if workers == 1:
+            jobs = [_render_sky_job(*args) for args in arguments]
+        else:
+            n_workers = min(workers, len(arguments))
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = [
+                    executor.submit(_render_sky_job, *args) for args in arguments
+                ]
+                jobs = [
+                    _collect_sky_job(z, future)
+                    for z, future in zip(redshifts, futures)
+                ]
+
+        for job in jobs:
+            if job.error is None:
+                logger.debug(f"Created image: {job.path}")
+            else:
+                logger.error(f"Model image for z={job.redshift} failed: {job.error}")
+
+        logger.info(
+            f"Successfully created {sum(job.error is None for job in jobs)} "
+            f"of {len(jobs)} model images"
+        )
+        return jobs
+
+
+def _parse_quantity(value: str, unit: str) -> float:
+    """
+    Parse a quantity string in ``unit`` (e.g., "0.01arcsec") into a number.
+
+    Raises:
+        ValueError: If the value is not a number followed by ``unit``.
+    """
+    match = re.match(rf"^\s*(\d+(?:\.\d+)?)\s*{re.escape(unit)}\s*$", str(value))
+    if not match:
+        raise ValueError(f"Invalid quantity: {value}. Expected e.g. '1{unit}'")
+    return float(match.group(1))
+
+
+def _render_sky_job(
+    maker: ImageMaker,
+    redshift: float,
+    components: List[GaussianComponent],
+    output_dir: str,
+    image_format: str,
+) -> ModelSkyJob:
+    """
+    Render and save the model image of one redshift.
+
+    Runs in the calling process or a pool worker; errors are reported in
+    the returned job rather than raised.
+    """
+    try:
+        if image_format == "fits":
+            path = str(Path(output_dir) / f"modelsky_{redshift}{FITS_EXTENSION}")
+            maker.render_model_to_file(components, path)
+        else:
+            image = maker.render_model(components)
+            path = image.save(
+                Path(output_dir) / f"modelsky_{redshift}{NUMPY_IMAGE_EXTENSION}"
             )
+    except Exception as error:
+        return ModelSkyJob(redshift, None, f"{type(error).__name__}: {error}")
+    return ModelSkyJob(redshift, path, None)
 
-            # TODO: Implement actual CASA image creation here
-            # For now, just return template names
-            image_name = f"modelsky_{z}.im"
-            images.append(image_name)
-            logger.debug(f"Created image: {image_name}")
 
-        logger.info(f"Successfully created {len(images)} model images")
-        return images
+def _collect_sky_job(redshift: float, future: Future) -> ModelSkyJob:
+    """Wait for a pool job, reporting workers that died before returning."""
+    error = future.exception()
+    if error is not None:
+        return ModelSkyJob(redshift, None, f"{type(error).__name__}: {error}")
+    return future.result()
@@ -0,0 +1,83 @@
+"""
+Shared-memory helpers for parallel simulation in SOS (SKA Observation Simulator).
+
+Read-only inputs (antenna table, sky model arrays) are copied once into
+``multiprocessing.shared_memory`` blocks. Worker processes receive only the
+block names, shapes and dtypes and attach zero-copy views, so no large array
+is pickled per task.
+"""
+
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+ArraySpec = Tuple[str, Tuple[int, ...], np.dtype]
+"""Shared block name, shape and dtype of one shared array."""
+
+
+class SharedArrays:
+    """Named arrays copied into shared-memory blocks owned by this process."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        Copy arrays into new shared-memory blocks.
+
+        Args:
+            arrays: Arrays to share, by name.
+        """
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.spec: Dict[str, ArraySpec] = {}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                # Zero-size blocks are not allowed
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(array.nbytes, 1)
+                )
+                self._blocks.append(block)
+                shape, dtype = array.shape, array.dtype
+                np.ndarray(shape, dtype=dtype, buffer=block.buf)[...] = array
+                self.spec[name] = (block.name, shape, dtype)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Release and unlink all blocks."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def attach_shared_arrays(
+    spec: Dict[str, ArraySpec],
+) -> Tuple[Dict[str, np.ndarray], List[shared_memory.SharedMemory]]:
+    """
+    Attach read-only views of arrays shared by :class:`SharedArrays`.
+
+    The blocks stay owned by the creating process, which unlinks them;
+    pool workers share its resource tracker, so attaching adds no cleanup.
+
+    Args:
+        spec: ``SharedArrays.spec`` of the owning process.
+
+    Returns:
+        Tuple of (arrays by name, attached blocks to close when done).
+    """
+    arrays = {}
+    blocks = []
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array.flags.writeable = False
+        arrays[name] = array
+    return arrays, blocks
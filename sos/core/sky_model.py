@@ -0,0 +1,574 @@
+"""
+Sky model containers for SOS (SKA Observation Simulator).
+
+Holds model images together with the coordinate information CASA keeps in
+an image's coordinate system (cell size, reference direction and frequency),
+so the NumPy predict engine can run without CASA images.
+"""
+
+from collections import Counter, OrderedDict
+from functools import reduce
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from sos.constants import (
+    NUMPY_IMAGE_EXTENSION,
+    FITS_EXTENSION,
+    GAUSSIAN_FWHM_TO_SIGMA,
+    DEFAULT_BRIGHTNESS_UNIT,
+    DEFAULT_FREQUENCY_INCREMENT,
+    DEFAULT_CUBE_CACHE_PLANES,
+)
+from sos.utils.fits_io import create_fits_memmap, open_fits_memmap
+from sos.utils.logger import setup_logger
+from sos.utils.validators import validate_file_exists
+
+logger = setup_logger(__name__)
+
+
+class GaussianComponent:
+    """
+    An elliptical Gaussian sky component, as given to CASA ``cl.addcomponent``.
+
+    A component with zero-size axes is a point source.
+    """
+
+    def __init__(
+        self,
+        flux_jy: float,
+        l_rad: float,
+        m_rad: float,
+        major_fwhm_rad: float,
+        minor_fwhm_rad: Optional[float] = None,
+        position_angle_rad: float = 0.0,
+    ):
+        """
+        Initialize Gaussian component.
+
+        Args:
+            flux_jy: Integrated flux density in Jy.
+            l_rad: Direction cosine of the centre along RA (East positive).
+            m_rad: Direction cosine of the centre along DEC (North positive).
+            major_fwhm_rad: Major axis FWHM in radians (0 for a point source).
+            minor_fwhm_rad: Minor axis FWHM in radians (default: circular).
+            position_angle_rad: Major axis angle from North through East in radians.
+
+        Raises:
+            ValueError: If axis sizes are invalid.
+        """
+        minor_fwhm_rad = major_fwhm_rad if minor_fwhm_rad is None else minor_fwhm_rad
+        if major_fwhm_rad < 0 or minor_fwhm_rad < 0 or (
+            (major_fwhm_rad == 0) != (minor_fwhm_rad == 0)
+        ):
+            raise ValueError(
+                f"Gaussian axes must be positive (or both zero for a point source), "
+                f"got {major_fwhm_rad}, {minor_fwhm_rad}"
+            )
+
+        self.flux_jy = float(flux_jy)
+        self.l_rad = float(l_rad)
+        self.m_rad = float(m_rad)
+        self.major_fwhm_rad = float(major_fwhm_rad)
+        self.minor_fwhm_rad = float(minor_fwhm_rad)
+        self.position_angle_rad = float(position_angle_rad)
+
+    @property
+    def is_point(self) -> bool:
+        """Whether the component is a point source."""
+        return self.major_fwhm_rad == 0
+
+    @property
+    def sigma_major(self) -> float:
+        """Standard deviation along the major axis in radians."""
+        return self.major_fwhm_rad * GAUSSIAN_FWHM_TO_SIGMA
+
+    @property
+    def sigma_minor(self) -> float:
+        """Standard deviation along the minor axis in radians."""
+        return self.minor_fwhm_rad * GAUSSIAN_FWHM_TO_SIGMA
+
+
+class ComponentList:
+    """A list of sky components with the phase centre and frequency they refer to."""
+
+    def __init__(
+        self,
+        components: List[GaussianComponent],
+        ref_ra_rad: float,
+        ref_dec_rad: float,
+        ref_freq_hz: float,
+    ):
+        """
+        Initialize component list.
+
+        Args:
+            components: Gaussian and point components; their (l, m) are
+                relative to the reference direction.
+            ref_ra_rad: Right Ascension of the reference direction in radians.
+            ref_dec_rad: Declination of the reference direction in radians.
+            ref_freq_hz: Frequency at which component fluxes are given, in Hz.
+        """
+        self.components = list(components)
+        self.ref_ra_rad = float(ref_ra_rad)
+        self.ref_dec_rad = float(ref_dec_rad)
+        self.ref_freq_hz = float(ref_freq_hz)
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def as_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Return component parameters as columns for the vectorized predict.
+
+        Returns:
+            Dictionary with ``flux``, ``l_rad``, ``m_rad``, ``sigma_major``,
+            ``sigma_minor`` and ``position_angle`` arrays.
+        """
+        return {
+            "flux": np.array([c.flux_jy for c in self.components], dtype=np.float64),
+            "l_rad": np.array([c.l_rad for c in self.components], dtype=np.float64),
+            "m_rad": np.array([c.m_rad for c in self.components], dtype=np.float64),
+            "sigma_major": np.array(
+                [c.sigma_major for c in self.components], dtype=np.float64
+            ),
+            "sigma_minor": np.array(
+                [c.sigma_minor for c in self.components], dtype=np.float64
+            ),
+            "position_angle": np.array(
+                [c.position_angle_rad for c in self.components], dtype=np.float64
+            ),
+        }
+
+
+def split_common_components(
+    models: Sequence[Sequence[GaussianComponent]],
+) -> Tuple[List[GaussianComponent], List[List[GaussianComponent]]]:
+    """
+    Separate components shared by every model from per-model components.
+
+    Args:
+        models: Component lists, one per sky model.
+
+    Returns:
+        Tuple of (components present in every model, remaining components
+        of each model).
+    """
+    counts = [Counter(_component_key(c) for c in components) for components in models]
+    shared = reduce(lambda a, b: a & b, counts) if counts else Counter()
+
+    common = []
+    seen: Counter = Counter()
+    for c in models[0] if models else []:
+        key = _component_key(c)
+        if seen[key] < shared[key]:
+            common.append(c)
+            seen[key] += 1
+
+    varying = []
+    for components in models:
+        remaining = Counter(shared)
+        own = []
+        for c in components:
+            key = _component_key(c)
+            if remaining[key] > 0:
+                remaining[key] -= 1
+            else:
+                own.append(c)
+        varying.append(own)
+
+    return common, varying
+
+
+def _component_key(component: GaussianComponent) -> Tuple[float, ...]:
+    """Parameters identifying a component."""
+    return (
+        component.flux_jy, component.l_rad, component.m_rad, component.major_fwhm_rad,
+        component.minor_fwhm_rad, component.position_angle_rad,
+    )
+
+
+class ModelImage:
+    """A single-plane model sky image in Jy/pixel with its coordinate system."""
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        cell_rad: float,
+        ref_ra_rad: float,
+        ref_dec_rad: float,
+        ref_freq_hz: float,
+        ref_pixel: Optional[Tuple[float, float]] = None,
+    ):
+        """
+        Initialize model image.
+
+        Pixel ``data[iy, ix]`` lies at direction cosines
+        ``l = -(ix - ref_x) * cell_rad`` and ``m = (iy - ref_y) * cell_rad``,
+        matching a CASA image with increments ``[-cell, +cell]``.
+
+        Args:
+            data: Pixel values in Jy/pixel, shape (ny, nx).
+            cell_rad: Pixel size in radians.
+            ref_ra_rad: Right Ascension of the reference pixel in radians.
+            ref_dec_rad: Declination of the reference pixel in radians.
+            ref_freq_hz: Reference frequency in Hz.
+            ref_pixel: Reference pixel (x, y); defaults to (nx // 2, ny // 2)
+                like ``ia.fromshape``.
+
+        Raises:
+            ValueError: If data is not two-dimensional or cell size invalid.
+        """
+        if data.ndim != 2:
+            raise ValueError(f"Model image must be 2-D, got shape {data.shape}")
+        if cell_rad <= 0:
+            raise ValueError(f"Cell size must be positive, got {cell_rad}")
+
+        ny, nx = data.shape
+        self.data = data
+        self.cell_rad = float(cell_rad)
+        self.ref_ra_rad = float(ref_ra_rad)
+        self.ref_dec_rad = float(ref_dec_rad)
+        self.ref_freq_hz = float(ref_freq_hz)
+        self.ref_pixel = ref_pixel if ref_pixel is not None else (nx // 2, ny // 2)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Image shape (ny, nx)."""
+        return self.data.shape
+
+    def pixel_direction_cosines(
+        self,
+        ix: np.ndarray,
+        iy: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convert pixel indices into direction cosines relative to the phase centre.
+
+        Args:
+            ix: Pixel column indices.
+            iy: Pixel row indices.
+
+        Returns:
+            Tuple of (l, m) direction cosines.
+        """
+        ref_x, ref_y = self.ref_pixel
+        l_rad = -(np.asarray(ix, dtype=np.float64) - ref_x) * self.cell_rad
+        m_rad = (np.asarray(iy, dtype=np.float64) - ref_y) * self.cell_rad
+        return l_rad, m_rad
+
+    def nonzero_components(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return direction cosines and fluxes of all non-zero pixels.
+
+        Returns:
+            Tuple of (l, m, flux) arrays.
+        """
+        iy, ix = np.nonzero(self.data)
+        l_rad, m_rad = self.pixel_direction_cosines(ix, iy)
+        return l_rad, m_rad, np.asarray(self.data[iy, ix], dtype=np.float64)
+
+    def fits_keywords(self) -> Dict[str, Any]:
+        """
+        Return FITS WCS keywords describing this image.
+
+        Axes follow ``make_img.py`` images: RA, DEC, Stokes, frequency.
+
+        Returns:
+            Dictionary of FITS keywords.
+        """
+        return image_fits_keywords(
+            self.cell_rad, self.ref_ra_rad, self.ref_dec_rad,
+            self.ref_freq_hz, self.ref_pixel,
+        )
+
+    def save(self, path: Union[str, Path]) -> str:
+        """
+        Save image data and coordinates to a ``.npz`` or ``.fits`` file.
+
+        Args:
+            path: Output file path; ``.fits`` writes FITS, anything else ``.npz``.
+
+        Returns:
+            Path of the written file.
+        """
+        path = Path(path)
+        if path.suffix == FITS_EXTENSION:
+            ny, nx = self.shape
+            data = create_fits_memmap(path, (1, 1, ny, nx), self.fits_keywords())
+            data[0, 0] = self.data
+            data.flush()
+            logger.debug(f"Saved model image {self.shape} to {path}")
+            return str(path)
+
+        if path.suffix != NUMPY_IMAGE_EXTENSION:
+            path = path.with_name(path.name + NUMPY_IMAGE_EXTENSION)
+
+        np.savez(
+            path,
+            data=self.data,
+            cell_rad=self.cell_rad,
+            ref_ra_rad=self.ref_ra_rad,
+            ref_dec_rad=self.ref_dec_rad,
+            ref_freq_hz=self.ref_freq_hz,
+            ref_pixel=np.asarray(self.ref_pixel, dtype=np.float64),
+        )
+        logger.debug(f"Saved model image {self.shape} to {path}")
+        return str(path)
+
+
+class SpectralCube:
+    """
+    Lazy spectral cube: one reference plane plus a power-law spectrum.
+
+    Channel planes S(nu) = S(nu0) (nu / nu0)^alpha are produced on demand
+    instead of materializing a scaled image per channel. Caching is opt-in:
+    at most ``cache_planes`` recently used planes are kept (LRU), so memory
+    for any number of channels stays at a few image planes.
+    """
+
+    def __init__(
+        self,
+        image: ModelImage,
+        frequencies_hz: np.ndarray,
+        spectral_index: float,
+        cache_planes: int = DEFAULT_CUBE_CACHE_PLANES,
+    ):
+        """
+        Initialize spectral cube.
+
+        Args:
+            image: Reference plane; its ``ref_freq_hz`` is nu0.
+            frequencies_hz: Channel frequencies in Hz.
+            spectral_index: Spectral index alpha.
+            cache_planes: Maximum number of scaled planes kept (0 disables caching).
+
+        Raises:
+            ValueError: If frequencies are not positive or cache size negative.
+        """
+        frequencies_hz = np.atleast_1d(np.asarray(frequencies_hz, dtype=np.float64))
+        if frequencies_hz.ndim != 1 or np.any(frequencies_hz <= 0):
+            raise ValueError(
+                f"Channel frequencies must be positive, got {frequencies_hz}"
+            )
+        if cache_planes < 0:
+            raise ValueError(f"cache_planes must be non-negative, got {cache_planes}")
+
+        self.image = image
+        self.frequencies_hz = frequencies_hz
+        self.spectral_index = float(spectral_index)
+        self.cache_planes = int(cache_planes)
+        self._cache: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.frequencies_hz.shape[0]
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        """Cube shape (n_channels, ny, nx)."""
+        return (len(self),) + self.image.shape
+
+    def channel_scale(self, channel: int) -> float:
+        """
+        Flux scale factor (nu / nu0)^alpha of a channel.
+
+        Args:
+            channel: Channel index.
+
+        Returns:
+            Scale factor relative to the reference plane.
+        """
+        return float(
+            (self.frequencies_hz[channel] / self.image.ref_freq_hz) **
+            self.spectral_index
+        )
+
+    def plane(self, channel: int) -> np.ndarray:
+        """
+        Pixel values of one channel in Jy/pixel.
+
+        A channel at the reference frequency returns a view of the reference
+        data; other planes are computed (or taken from the LRU cache). Every
+        plane is returned read-only.
+
+        Args:
+            channel: Channel index.
+
+        Returns:
+            Array of shape (ny, nx).
+
+        Raises:
+            IndexError: If channel out of range.
+        """
+        if not -len(self) <= channel < len(self):
+            raise IndexError(f"Channel {channel} out of range for {len(self)} channels")
+        channel %= len(self)
+
+        scale = self.channel_scale(channel)
+        if scale == 1.0:
+            view = self.image.data.view()
+            view.flags.writeable = False
+            return view
+
+        if channel in self._cache:
+            self._cache.move_to_end(channel)
+            return self._cache[channel]
+
+        data = np.multiply(self.image.data, self.image.data.dtype.type(scale))
+        data.flags.writeable = False
+        if self.cache_planes > 0:
+            self._cache[channel] = data
+            if len(self._cache) > self.cache_planes:
+                self._cache.popitem(last=False)
+        return data
+
+    def __getitem__(self, channel: int) -> ModelImage:
+        """Channel ``channel`` as a ModelImage at its own frequency."""
+        return ModelImage(
+            self.plane(channel), self.image.cell_rad, self.image.ref_ra_rad,
+            self.image.ref_dec_rad, float(self.frequencies_hz[channel]),
+            self.image.ref_pixel,
+        )
+
+    def __iter__(self) -> Iterator[ModelImage]:
+        for channel in range(len(self)):
+            yield self[channel]
+
+
+def image_fits_keywords(
+    cell_rad: float,
+    ref_ra_rad: float,
+    ref_dec_rad: float,
+    ref_freq_hz: float,
+    ref_pixel: Tuple[float, float],
+) -> Dict[str, Any]:
+    """
+    Build FITS WCS keywords for a (RA, DEC, Stokes, frequency) model image.
+
+    Args:
+        cell_rad: Pixel size in radians.
+        ref_ra_rad: Reference Right Ascension in radians.
+        ref_dec_rad: Reference Declination in radians.
+        ref_freq_hz: Reference frequency in Hz.
+        ref_pixel: Reference pixel (x, y), zero-based.
+
+    Returns:
+        Dictionary of FITS keywords.
+    """
+    cell_deg = float(np.degrees(cell_rad))
+    freq_increment_hz = float(DEFAULT_FREQUENCY_INCREMENT[:-len("GHz")]) * 1e9
+    return {
+        "BUNIT": DEFAULT_BRIGHTNESS_UNIT,
+        "EQUINOX": 2000.0,
+        "CTYPE1": "RA---SIN",
+        "CRVAL1": float(np.degrees(ref_ra_rad)),
+        "CDELT1": -cell_deg,
+        "CRPIX1": float(ref_pixel[0]) + 1.0,
+        "CUNIT1": "deg",
+        "CTYPE2": "DEC--SIN",
+        "CRVAL2": float(np.degrees(ref_dec_rad)),
+        "CDELT2": cell_deg,
+        "CRPIX2": float(ref_pixel[1]) + 1.0,
+        "CUNIT2": "deg",
+        "CTYPE3": "STOKES",
+        "CRVAL3": 1.0,
+        "CDELT3": 1.0,
+        "CRPIX3": 1.0,
+        "CTYPE4": "FREQ",
+        "CRVAL4": float(ref_freq_hz),
+        "CDELT4": freq_increment_hz,
+        "CRPIX4": 1.0,
+        "CUNIT4": "Hz",
+        "RESTFRQ": float(ref_freq_hz),
+    }
+
+
+def create_model_image_file(
+    path: Union[str, Path],
+    shape: Tuple[int, int],
+    cell_rad: float,
+    ref_ra_rad: float,
+    ref_dec_rad: float,
+    ref_freq_hz: float,
+    ref_pixel: Optional[Tuple[float, float]] = None,
+) -> ModelImage:
+    """
+    Create a zero-filled, memory-mapped FITS model image for tiled writing.
+
+    Args:
+        path: Output ``.fits`` path.
+        shape: Image shape (ny, nx).
+        cell_rad: Pixel size in radians.
+        ref_ra_rad: Reference Right Ascension in radians.
+        ref_dec_rad: Reference Declination in radians.
+        ref_freq_hz: Reference frequency in Hz.
+        ref_pixel: Reference pixel (x, y); defaults to (nx // 2, ny // 2).
+
+    Returns:
+        ModelImage whose data is a writable memmap of the file.
+    """
+    ny, nx = shape
+    ref_pixel = ref_pixel if ref_pixel is not None else (nx // 2, ny // 2)
+    keywords = image_fits_keywords(
+        cell_rad, ref_ra_rad, ref_dec_rad, ref_freq_hz, ref_pixel
+    )
+    data = create_fits_memmap(path, (1, 1, ny, nx), keywords)
+    return ModelImage(
+        data[0, 0], cell_rad, ref_ra_rad, ref_dec_rad, ref_freq_hz, ref_pixel
+    )
+
+
+def _load_fits_model_image(path: Path) -> ModelImage:
+    """Map a FITS model image read-only (zero-copy)."""
+    data, header = open_fits_memmap(path, mode="r")
+    if data.ndim < 2 or any(n != 1 for n in data.shape[:-2]):
+        raise ValueError(f"Model image must be a single plane, got shape {data.shape}")
+
+    return ModelImage(
+        data=data.reshape(data.shape[-2:]),
+        cell_rad=float(np.radians(abs(header["CDELT1"]))),
+        ref_ra_rad=float(np.radians(header["CRVAL1"])),
+        ref_dec_rad=float(np.radians(header["CRVAL2"])),
+        ref_freq_hz=float(header.get("CRVAL4", header.get("RESTFRQ", 0.0))),
+        ref_pixel=(header["CRPIX1"] - 1.0, header["CRPIX2"] - 1.0),
+    )
+
+
+def load_model_image(path: Union[str, Path]) -> ModelImage:
+    """
+    Load a model image written by :meth:`ModelImage.save`.
+
+    FITS images are memory-mapped read-only, so pixels are only read from
+    disk when accessed.
+
+    Args:
+        path: Path to ``.npz`` or ``.fits`` model image.
+
+    Returns:
+        ModelImage instance.
+
+    Raises:
+        FileNotFoundError: If file not found.
+        ValueError: If file format is not supported.
+    """
+    validate_file_exists(path)
+
+    path = Path(path)
+    if path.suffix == FITS_EXTENSION:
+        return _load_fits_model_image(path)
+    if path.suffix != NUMPY_IMAGE_EXTENSION:
+        raise ValueError(
+            f"Unsupported model image format '{path.suffix}'. "
+            f"Expected {NUMPY_IMAGE_EXTENSION} or {FITS_EXTENSION}"
+        )
+
+    with np.load(path) as f:
+        return ModelImage(
+            data=f["data"],
+            cell_rad=float(f["cell_rad"]),
+            ref_ra_rad=float(f["ref_ra_rad"]),
+            ref_dec_rad=float(f["ref_dec_rad"]),
+            ref_freq_hz=float(f["ref_freq_hz"]),
+            ref_pixel=tuple(f["ref_pixel"]),
+        )
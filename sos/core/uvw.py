@@ -0,0 +1,161 @@
+"""
+Baseline geometry module for SOS (SKA Observation Simulator).
+
+Computes baseline (u, v, w) coordinates from ITRF antenna positions as the
+Earth rotates, replacing the CASA ``sm`` coordinate machinery.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from sos.constants import EARTH_ROTATION_RATE_RAD_S
+
+
+def baseline_pairs(n_antennas: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return antenna index pairs for all cross-correlation baselines.
+
+    Baselines are ordered as in a Measurement Set row block:
+    (0, 1), (0, 2), ..., (0, N-1), (1, 2), ...
+
+    Args:
+        n_antennas: Number of antennas.
+
+    Returns:
+        Tuple of (antenna1, antenna2) index arrays, each of length N(N-1)/2.
+    """
+    antenna1, antenna2 = np.triu_indices(n_antennas, k=1)
+    return antenna1.astype(np.int32), antenna2.astype(np.int32)
+
+
+def hour_angles(times_sec: np.ndarray) -> np.ndarray:
+    """
+    Convert times relative to source transit into hour angles.
+
+    Matches CASA ``sm.settimes(usehourangle=True)``, where observation start
+    and stop times are offsets from transit.
+
+    Args:
+        times_sec: Sample times in seconds from transit.
+
+    Returns:
+        Local hour angles in radians.
+    """
+    return np.asarray(times_sec, dtype=np.float64) * EARTH_ROTATION_RATE_RAD_S
+
+
+def baseline_vectors(
+    xyz: np.ndarray,
+    antenna1: np.ndarray,
+    antenna2: np.ndarray,
+) -> np.ndarray:
+    """
+    Return ITRF baseline vectors ``xyz[antenna2] - xyz[antenna1]``.
+
+    Args:
+        xyz: ITRF antenna positions in metres, shape (n_antennas, 3).
+        antenna1: First antenna index per baseline.
+        antenna2: Second antenna index per baseline.
+
+    Returns:
+        Baseline vectors in metres, shape (n_baselines, 3).
+    """
+    xyz = np.asarray(xyz, dtype=np.float64)
+    return xyz[antenna2] - xyz[antenna1]
+
+
+def uvw_rotation_matrices(
+    hour_angle: np.ndarray,
+    declination_rad: float,
+    longitude_rad: float = 0.0,
+) -> np.ndarray:
+    """
+    Rotation matrices from ITRF baselines to (u, v, w), one per time sample.
+
+    Thompson, Moran & Swenson, eq. 4.1, using Greenwich hour angle
+    H = h - longitude.
+
+    Args:
+        hour_angle: Local hour angles of the phase centre in radians, shape (T,).
+        declination_rad: Declination of the phase centre in radians.
+        longitude_rad: East longitude of the array in radians.
+
+    Returns:
+        Matrices of shape (T, 3, 3) with uvw = R @ baseline.
+    """
+    greenwich_ha = np.asarray(hour_angle, dtype=np.float64) - longitude_rad
+    sin_h = np.sin(greenwich_ha)
+    cos_h = np.cos(greenwich_ha)
+    sin_d = np.sin(declination_rad)
+    cos_d = np.cos(declination_rad)
+
+    rotation = np.empty((greenwich_ha.shape[0], 3, 3), dtype=np.float64)
+    rotation[:, 0, 0] = sin_h
+    rotation[:, 0, 1] = cos_h
+    rotation[:, 0, 2] = 0.0
+    rotation[:, 1, 0] = -sin_d * cos_h
+    rotation[:, 1, 1] = sin_d * sin_h
+    rotation[:, 1, 2] = cos_d
+    rotation[:, 2, 0] = cos_d * cos_h
+    rotation[:, 2, 1] = -cos_d * sin_h
+    rotation[:, 2, 2] = sin_d
+    return rotation
+
+
+def rotate_baselines(
+    baselines: np.ndarray,
+    hour_angle: np.ndarray,
+    declination_rad: float,
+    longitude_rad: float = 0.0,
+) -> np.ndarray:
+    """
+    Compute uvw for precomputed baseline vectors over a block of time samples.
+
+    All samples are produced by one batched matrix product of the baselines
+    with the per-sample rotation matrices.
+
+    Args:
+        baselines: ITRF baseline vectors in metres, shape (n_baselines, 3).
+        hour_angle: Local hour angles of the phase centre in radians, shape (T,).
+        declination_rad: Declination of the phase centre in radians.
+        longitude_rad: East longitude of the array in radians.
+
+    Returns:
+        uvw in metres, shape (T, n_baselines, 3).
+    """
+    rotation = uvw_rotation_matrices(hour_angle, declination_rad, longitude_rad)
+    return np.matmul(baselines, rotation.transpose(0, 2, 1))
+
+
+def compute_uvw(
+    xyz: np.ndarray,
+    antenna1: np.ndarray,
+    antenna2: np.ndarray,
+    hour_angle: np.ndarray,
+    declination_rad: float,
+    longitude_rad: float = 0.0,
+) -> np.ndarray:
+    """
+    Compute baseline uvw coordinates for a block of time samples.
+
+    Baselines are ITRF difference vectors ``xyz[antenna2] - xyz[antenna1]``
+    projected onto the (u, v, w) frame of the phase centre. When uvw is
+    needed for many blocks, compute :func:`baseline_vectors` once and call
+    :func:`rotate_baselines` per block instead.
+
+    Args:
+        xyz: ITRF antenna positions in metres, shape (n_antennas, 3).
+        antenna1: First antenna index per baseline.
+        antenna2: Second antenna index per baseline.
+        hour_angle: Local hour angles of the phase centre in radians, shape (T,).
+        declination_rad: Declination of the phase centre in radians.
+        longitude_rad: East longitude of the array in radians.
+
+    Returns:
+        uvw in metres, shape (T, n_baselines, 3).
+    """
+    return rotate_baselines(
+        baseline_vectors(xyz, antenna1, antenna2),
+        hour_angle, declination_rad, longitude_rad,
+    )
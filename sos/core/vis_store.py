@@ -0,0 +1,642 @@
+"""
+Native visibility store for SOS (SKA Observation Simulator).
+
+A visibility dataset is a directory of memory-mappable ``.npy`` columns
+(``time``, ``antenna1``, ``antenna2``, ``uvw``, ``data``, ``flag``) plus a
+small JSON header with the spectral setup, metadata and the row ranges of
+the time chunks written so far. The baseline layout and its length and
+antenna index (:class:`sos.core.baselines.BaselineIndex`) are written once
+at creation.
+
+Rows are time-major: every integration holds the same baselines in the
+same order, so one baseline's time series is a strided view of each column
+and a baseline selection is read without touching other rows.
+Columns grow in place as chunks are appended (the ``.npy`` header, padded
+for growth at creation, is rewritten with the new length); the JSON header
+is replaced atomically after the column data, so a reader never sees
+uncommitted rows.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sos.constants import (
+    DEFAULT_MOUNT_TYPE,
+    VISIBILITY_STORE_BASELINES,
+    VISIBILITY_STORE_FORMAT,
+    VISIBILITY_STORE_HEADER,
+)
+from sos.core.baselines import BaselineIndex, BaselineSelection
+from sos.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _column_layout(
+    n_channels: int,
+    n_pol: int,
+    averaged: bool = False,
+) -> Dict[str, Tuple[np.dtype, Tuple[int, ...]]]:
+    """Dtype and per-row shape of every column."""
+    layout: Dict[str, Tuple[np.dtype, Tuple[int, ...]]] = {
+        "time": (np.dtype(np.float64), ()),
+        "antenna1": (np.dtype(np.int32), ()),
+        "antenna2": (np.dtype(np.int32), ()),
+        "uvw": (np.dtype(np.float64), (3,)),
+        "data": (np.dtype(np.complex64), (n_channels, n_pol)),
+        "flag": (np.dtype(np.bool_), (n_channels, n_pol)),
+    }
+    if averaged:
+        layout["weight"] = (np.dtype(np.float32), (n_channels, n_pol))
+        layout["exposure"] = (np.dtype(np.float64), ())
+    return layout
+
+
+def _data_offset(path: Path) -> int:
+    """Byte offset of the array data in a ``.npy`` file."""
+    with open(path, "rb") as handle:
+        version = np.lib.format.read_magic(handle)
+        if version == (1, 0):
+            np.lib.format.read_array_header_1_0(handle)
+        else:
+            np.lib.format.read_array_header_2_0(handle)
+        return handle.tell()
+
+
+# Decimal digits reserved for the row count in column headers
+_GROWTH_DIGITS = 21
+
+# Columns read by default (averaged stores add weight and exposure)
+_DEFAULT_COLUMNS = ("time", "antenna1", "antenna2", "uvw", "data", "flag")
+
+
+def _column_header(dtype: np.dtype, row_shape: Tuple[int, ...], n_rows: int) -> bytes:
+    """
+    Version 1.0 ``.npy`` header of a column, padded to a fixed length.
+
+    The padding leaves room for a row count of ``_GROWTH_DIGITS`` digits, so
+    rewriting the header with any new length never moves the data.
+    """
+    def describe(rows: int) -> str:
+        return repr({
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (rows,) + row_shape,
+        })
+
+    # Magic, version and length field take 10 bytes; align the data to 64
+    length = len(describe(10 ** _GROWTH_DIGITS - 1)) + 1
+    length += -(10 + length) % 64
+    text = describe(n_rows).ljust(length - 1) + "\n"
+    return (
+        np.lib.format.magic(1, 0) + length.to_bytes(2, "little") + text.encode("latin1")
+    )
+
+
+def _resize_column(
+    path: Path,
+    dtype: np.dtype,
+    row_shape: Tuple[int, ...],
+    n_rows: int,
+) -> None:
+    """
+    Set the length of a ``.npy`` column in place.
+
+    Columns are created with headers padded for growth (see
+    :func:`_column_header`), so the header is rewritten without moving the
+    data; new rows are zero-filled by extending the file.
+    """
+    offset = _data_offset(path)
+    header = _column_header(dtype, row_shape, n_rows)
+    if len(header) != offset:
+        raise ValueError(f"Cannot grow {path.name} in place: header size changed")
+    row_bytes = dtype.itemsize * int(np.prod(row_shape, dtype=np.int64))
+    with open(path, "r+b") as handle:
+        handle.write(header)
+        handle.truncate(offset + n_rows * row_bytes)
+
+
+class VisibilityStore:
+    """A columnar, memory-mapped visibility dataset on disk."""
+
+    def __init__(self, path: str):
+        """
+        Open an existing visibility store.
+
+        Args:
+            path: Store directory.
+
+        Raises:
+            FileNotFoundError: If the directory has no store header.
+            ValueError: If the header is not a visibility store header.
+        """
+        self.path = Path(path)
+        header_path = self.path / VISIBILITY_STORE_HEADER
+        if not header_path.exists():
+            raise FileNotFoundError(f"No visibility store header in {path}")
+        self.header = json.loads(header_path.read_text())
+        if self.header.get("format") != VISIBILITY_STORE_FORMAT:
+            raise ValueError(f"{header_path} is not a visibility store header")
+        self._layout = _column_layout(self.n_channels, self.n_pol, self.averaged)
+        self._baselines: Optional[BaselineIndex] = None
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        frequencies_hz: np.ndarray,
+        antenna1: np.ndarray,
+        antenna2: np.ndarray,
+        stokes: Sequence[str],
+        metadata: Optional[Dict[str, Any]] = None,
+        baseline_lengths_m: Optional[np.ndarray] = None,
+        antenna_names: Optional[Sequence[str]] = None,
+        averaged: bool = False,
+    ) -> "VisibilityStore":
+        """
+        Create an empty store, replacing any store at ``path``.
+
+        Args:
+            path: Store directory (created if missing).
+            frequencies_hz: Channel frequencies in Hz.
+            antenna1: First antenna of each baseline, in row order.
+            antenna2: Second antenna of each baseline, in row order.
+            stokes: Correlation products (e.g. ["RR", "LL"]).
+            metadata: JSON-serializable observation metadata (phase centre,
+                antenna configuration, integration time, ...).
+            baseline_lengths_m: Length of each baseline in metres, indexed
+                for length selections.
+            antenna_names: Station names by antenna index, for selections
+                by name.
+            averaged: Add the ``weight`` (per channel and correlation) and
+                ``exposure`` (effective integration time in seconds) columns
+                of averaged data.
+
+        Returns:
+            The new, empty store.
+        """
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        frequencies_hz = np.atleast_1d(np.asarray(frequencies_hz, dtype=np.float64))
+
+        layout = _column_layout(frequencies_hz.shape[0], len(stokes), averaged)
+        for name, (dtype, row_shape) in layout.items():
+            (directory / f"{name}.npy").write_bytes(_column_header(dtype, row_shape, 0))
+
+        baselines = BaselineIndex(antenna1, antenna2, baseline_lengths_m, antenna_names)
+        # Typed loosely: numpy's stubs reserve the allow_pickle keyword of savez
+        arrays: Dict[str, Any] = baselines.to_arrays()
+        np.savez(directory / VISIBILITY_STORE_BASELINES, **arrays)
+
+        store = cls.__new__(cls)
+        store.path = directory
+        store.header = {
+            "format": VISIBILITY_STORE_FORMAT,
+            "n_rows": 0,
+            "n_baselines": baselines.n_baselines,
+            "frequencies_hz": frequencies_hz.tolist(),
+            "stokes": list(stokes),
+            "averaged": bool(averaged),
+            "chunks": [],
+            "metadata": dict(metadata or {}),
+        }
+        store._layout = layout
+        store._baselines = baselines
+        store._write_header()
+        return store
+
+    @property
+    def n_rows(self) -> int:
+        """Number of committed rows."""
+        return int(self.header["n_rows"])
+
+    @property
+    def n_baselines(self) -> int:
+        """Rows per integration."""
+        return int(self.header["n_baselines"])
+
+    @property
+    def n_channels(self) -> int:
+        """Number of frequency channels."""
+        return len(self.header["frequencies_hz"])
+
+    @property
+    def n_pol(self) -> int:
+        """Number of correlation products."""
+        return len(self.header["stokes"])
+
+    @property
+    def averaged(self) -> bool:
+        """Whether rows carry ``weight`` and ``exposure`` columns."""
+        return bool(self.header.get("averaged", False))
+
+    @property
+    def frequencies(self) -> np.ndarray:
+        """Channel frequencies in Hz."""
+        return np.asarray(self.header["frequencies_hz"], dtype=np.float64)
+
+    @property
+    def baselines(self) -> BaselineIndex:
+        """Baseline layout with its length and antenna index."""
+        if self._baselines is None:
+            with np.load(self.path / VISIBILITY_STORE_BASELINES) as arrays:
+                self._baselines = BaselineIndex.from_arrays(dict(arrays))
+        return self._baselines
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Observation metadata."""
+        return self.header["metadata"]
+
+    @property
+    def chunks(self) -> List[Tuple[int, int]]:
+        """Row ranges [start, stop) of the committed time chunks."""
+        return [tuple(chunk) for chunk in self.header["chunks"]]
+
+    def column(self, name: str, mode: Literal["r", "r+"] = "r") -> np.ndarray:
+        """
+        Memory-map one column.
+
+        Args:
+            name: Column name (``time``, ``antenna1``, ``antenna2``, ``uvw``,
+                ``data``, ``flag``, and ``weight`` and ``exposure`` in
+                averaged stores).
+            mode: ``"r"`` maps the committed rows read-only; ``"r+"`` maps
+                every allocated row (including reserved ones) writable.
+
+        Returns:
+            Zero-copy view of the column.
+
+        Raises:
+            KeyError: If the column name is unknown.
+        """
+        dtype, row_shape = self._layout[name]
+        path = self.path / f"{name}.npy"
+        if mode == "r" and self.n_rows == 0:
+            return np.empty((0,) + row_shape, dtype=dtype)
+        array = np.load(path, mmap_mode=mode)
+        return array[:self.n_rows] if mode == "r" else array
+
+    def columns(self, mode: Literal["r", "r+"] = "r") -> Dict[str, np.ndarray]:
+        """Memory-map every column (see :meth:`column`)."""
+        return {name: self.column(name, mode) for name in self._layout}
+
+    def append(self, **columns: np.ndarray) -> slice:
+        """
+        Append one time chunk and commit it.
+
+        Args:
+            **columns: One array per column, all with the same number of
+                rows, which must be whole integrations.
+
+        Returns:
+            The rows written.
+
+        Raises:
+            ValueError: If columns are missing or inconsistent.
+        """
+        if set(columns) != set(self._layout):
+            raise ValueError(
+                f"append needs columns {sorted(self._layout)}, got {sorted(columns)}"
+            )
+        n_new = np.shape(columns["time"])[0]
+        rows = self.reserve(n_new)
+        for name, (dtype, row_shape) in self._layout.items():
+            values = np.asarray(columns[name], dtype=dtype)
+            if values.shape != (n_new,) + row_shape:
+                raise ValueError(
+                    f"Column {name} has shape {values.shape}, "
+                    f"expected {(n_new,) + row_shape}"
+                )
+            path = self.path / f"{name}.npy"
+            with open(path, "r+b") as handle:
+                row_bytes = dtype.itemsize * int(np.prod(row_shape, dtype=np.int64))
+                handle.seek(_data_offset(path) + rows.start * row_bytes)
+                handle.write(np.ascontiguousarray(values).tobytes())
+        self.commit(rows)
+        return rows
+
+    def reserve(self, n_rows: int) -> slice:
+        """
+        Allocate zero-filled rows after all existing rows, without committing.
+
+        Writers fill reserved rows through ``column(name, "r+")`` (e.g. from
+        several processes) and then :meth:`commit` them.
+
+        Args:
+            n_rows: Number of rows to allocate; whole integrations.
+
+        Returns:
+            The reserved rows.
+
+        Raises:
+            ValueError: If ``n_rows`` is not a whole number of integrations.
+        """
+        if n_rows % self.n_baselines:
+            raise ValueError(
+                f"Rows must be whole integrations of {self.n_baselines} baselines, "
+                f"got {n_rows}"
+            )
+        start = self._allocated_rows()
+        for name, (dtype, row_shape) in self._layout.items():
+            _resize_column(self.path / f"{name}.npy", dtype, row_shape, start + n_rows)
+        return slice(start, start + n_rows)
+
+    def commit(self, rows: slice) -> None:
+        """
+        Make written rows visible to readers as one time chunk.
+
+        Args:
+            rows: Rows directly following the committed ones.
+
+        Raises:
+            ValueError: If the rows leave a gap or exceed the allocation.
+        """
+        if rows.start != self.n_rows or rows.stop > self._allocated_rows():
+            raise ValueError(
+                f"Cannot commit rows {rows.start}:{rows.stop} after {self.n_rows} "
+                f"committed rows"
+            )
+        self.header["n_rows"] = rows.stop
+        self.header["chunks"].append([rows.start, rows.stop])
+        self._write_header()
+
+    def iter_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Iterate over the committed time chunks as zero-copy column views.
+
+        Yields:
+            Dictionary of column views for each chunk, in time order.
+        """
+        columns = self.columns()
+        for start, stop in self.chunks:
+            yield {name: values[start:stop] for name, values in columns.items()}
+
+    def baseline_index(self, antenna1: int, antenna2: int) -> int:
+        """
+        Row offset of a baseline within each integration.
+
+        Raises:
+            KeyError: If the antenna pair is not in the store.
+        """
+        return self.baselines.pair(antenna1, antenna2)
+
+    def read_baseline(
+        self,
+        antenna1: int,
+        antenna2: int,
+        columns: Sequence[str] = ("time", "uvw", "data", "flag"),
+    ) -> Dict[str, np.ndarray]:
+        """
+        Read the time series of one baseline.
+
+        Rows of a baseline are one per integration at a fixed stride, so only
+        those rows are paged in from each column.
+
+        Args:
+            antenna1: First antenna index or station name.
+            antenna2: Second antenna index or station name.
+            columns: Columns to read.
+
+        Returns:
+            Dictionary of arrays, one row per integration.
+        """
+        offset = self.baseline_index(antenna1, antenna2)
+        return {
+            name: np.array(self.column(name)[offset::self.n_baselines])
+            for name in columns
+        }
+
+    def read_baselines(
+        self,
+        baselines: np.ndarray,
+        columns: Sequence[str] = _DEFAULT_COLUMNS,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Read the rows of several baselines.
+
+        Args:
+            baselines: Baseline (row offset) indices, e.g. from
+                :meth:`BaselineIndex.select`.
+            columns: Columns to read.
+
+        Returns:
+            Dictionary of arrays of shape (n_integrations, len(baselines), ...).
+        """
+        baselines = np.asarray(baselines, dtype=np.int64)
+        n_integrations = self.n_rows // self.n_baselines
+        result = {}
+        for name in columns:
+            values = self.column(name)
+            per_integration = values.reshape(
+                (n_integrations, self.n_baselines) + values.shape[1:]
+            )
+            result[name] = per_integration[:, baselines]
+        return result
+
+    def select(
+        self,
+        selection: BaselineSelection,
+        columns: Sequence[str] = _DEFAULT_COLUMNS,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Read the baselines matching a length and antenna selection.
+
+        The selection is resolved on the baseline index (binary search over
+        lengths, slices per antenna), so no column is scanned to find rows.
+
+        Args:
+            selection: Baselines to read.
+            columns: Columns to read.
+
+        Returns:
+            Dictionary of arrays of shape (n_integrations, n_selected, ...).
+        """
+        return self.read_baselines(self.baselines.select(selection), columns)
+
+    def export_ms(self, ms_path: str) -> str:
+        """
+        Write the dataset as a CASA Measurement Set.
+
+        The MS skeleton (antennas, spectral window, field, integrations) is
+        created with the CASA ``sm`` tool from the store metadata, with one
+        ``observe`` per scan (runs of integrations without a gap). Its UVW,
+        DATA and FLAG columns are then filled by matching each MS row to the
+        store row of the same integration and antenna pair; MS rows of
+        baselines the store does not hold (e.g. outside a baseline
+        selection) are flagged.
+
+        Args:
+            ms_path: Output Measurement Set path.
+
+        Returns:
+            Path to the Measurement Set.
+
+        Raises:
+            ImportError: If the CASA toolkit is not available.
+            KeyError: If metadata needed by the MS is missing.
+            ValueError: If the store is averaged (it has no common
+                integration grid) or its rows do not match the MS.
+        """
+        if self.averaged:
+            raise ValueError(
+                f"Cannot export averaged store {self.path} to an MS: averaged rows "
+                f"have no common integration grid; export the full-rate store"
+            )
+        try:
+            from casac import casatools  # type: ignore
+        except ImportError:
+            logger.error("CASA toolkit not available. Run this within CASA.")
+            raise ImportError("MS export must be run within CASA environment")
+
+        from sos.core.antenna_config import read_antenna_config
+        from sos.utils.coordinates import dec_arcsec_to_dms, ra_arcsec_to_hms
+
+        metadata = self.metadata
+        antennas = read_antenna_config(metadata["config_file"])
+        if "stations" in metadata:
+            antennas = antennas.subset(metadata["stations"])
+        frequencies = self.frequencies
+        integration = float(metadata["integration_seconds"])
+        times = self.column("time")[::self.n_baselines]
+
+        sm = casatools.simulator()
+        sm.open(ms_path)
+        sm.setconfig(
+            telescopename=antennas.observatory or "SKA1-MID",
+            x=antennas.xyz[:, 0].tolist(), y=antennas.xyz[:, 1].tolist(),
+            z=antennas.xyz[:, 2].tolist(), dishdiameter=antennas.diameters.tolist(),
+            mount=[metadata.get("mount", DEFAULT_MOUNT_TYPE).upper()],
+            antname=antennas.names, coordsystem="global",
+        )
+        sm.setspwindow(
+            spwname="SOS", freq=f"{frequencies[0]}Hz",
+            deltafreq=f"{metadata['channel_width_hz']}Hz",
+            freqresolution=f"{metadata['channel_width_hz']}Hz",
+            nchannels=self.n_channels, stokes=" ".join(self.header["stokes"]),
+        )
+        ra_arcsec = np.degrees(metadata["ref_ra_rad"]) * 3600.0
+        dec_arcsec = np.degrees(metadata["ref_dec_rad"]) * 3600.0
+        sm.setfield(
+            sourcename="SOS",
+            sourcedirection=[
+                "J2000", ra_arcsec_to_hms(ra_arcsec), dec_arcsec_to_dms(dec_arcsec)
+            ],
+        )
+        sm.setauto(autocorrwt=0.0)
+        sm.settimes(integrationtime=f"{integration}s", usehourangle=True)
+        for first, last in _scans(times, integration):
+            sm.observe(
+                "SOS", "SOS", starttime=f"{first - integration / 2}s",
+                stoptime=f"{last + integration / 2}s",
+            )
+        sm.close()
+
+        tb = casatools.table()
+        tb.open(ms_path, nomodify=False)
+        try:
+            rows = self._ms_rows(
+                tb.getcol("TIME"), tb.getcol("ANTENNA1"), tb.getcol("ANTENNA2"),
+                times.shape[0],
+            )
+            columns = self.columns()
+            # Write in blocks of about one store chunk; CASA columns are
+            # (pol, chan, row) / (3, row)
+            block = max([stop - start for start, stop in self.chunks] + [1])
+            for r0 in range(0, rows.shape[0], block):
+                store_rows = rows[r0:r0 + block]
+                matched = store_rows >= 0
+                n = store_rows.shape[0]
+                uvw = np.zeros((n, 3))
+                data = np.zeros((n, self.n_channels, self.n_pol), dtype=np.complex64)
+                flag = np.ones(data.shape, dtype=bool)
+                uvw[matched] = columns["uvw"][store_rows[matched]]
+                data[matched] = columns["data"][store_rows[matched]]
+                flag[matched] = columns["flag"][store_rows[matched]]
+                tb.putcol("UVW", np.ascontiguousarray(uvw.T), r0, n)
+                tb.putcol("DATA", np.ascontiguousarray(data.transpose(2, 1, 0)), r0, n)
+                tb.putcol("FLAG", np.ascontiguousarray(flag.transpose(2, 1, 0)), r0, n)
+        finally:
+            tb.close()
+
+        logger.info(
+            f"Exported {self.n_rows} rows to {ms_path} ({rows.shape[0]} MS rows)"
+        )
+        return ms_path
+
+    def _ms_rows(
+        self,
+        ms_time: np.ndarray,
+        ms_antenna1: np.ndarray,
+        ms_antenna2: np.ndarray,
+        n_integrations: int,
+    ) -> np.ndarray:
+        """
+        Store row of every MS row, or -1 where the store has no such baseline.
+
+        MS times are absolute and store times are relative to transit, so
+        rows are matched on the integration index (the rank of their time)
+        and the antenna pair.
+
+        Raises:
+            ValueError: If the integrations differ or a store row has no MS row.
+        """
+        ms_times, integration = np.unique(ms_time, return_inverse=True)
+        if ms_times.shape[0] != n_integrations:
+            raise ValueError(
+                f"MS has {ms_times.shape[0]} integrations, store has {n_integrations}"
+            )
+
+        baselines = self.baselines
+        n_antennas = int(max(
+            baselines.antenna1.max(initial=-1), baselines.antenna2.max(initial=-1),
+            np.max(ms_antenna1, initial=-1), np.max(ms_antenna2, initial=-1),
+        )) + 1
+        offsets = np.full((n_antennas, n_antennas), -1, dtype=np.int64)
+        offsets[baselines.antenna1, baselines.antenna2] = np.arange(
+            baselines.n_baselines
+        )
+
+        offset = offsets[ms_antenna1, ms_antenna2]
+        rows = np.where(
+            offset >= 0, integration.ravel() * self.n_baselines + offset, -1
+        )
+        n_matched = np.unique(rows[rows >= 0]).shape[0]
+        if n_matched != self.n_rows:
+            raise ValueError(
+                f"Only {n_matched} of {self.n_rows} store rows have a matching MS row"
+            )
+        return rows
+
+    def _allocated_rows(self) -> int:
+        """Rows allocated in the column files (committed plus reserved)."""
+        path = self.path / "time.npy"
+        n_bytes = path.stat().st_size - _data_offset(path)
+        return n_bytes // np.dtype(np.float64).itemsize
+
+    def _write_header(self) -> None:
+        """Replace the JSON header atomically."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".json.tmp")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(self.header, handle, indent=1)
+        os.replace(tmp_path, self.path / VISIBILITY_STORE_HEADER)
+
+
+def _scans(times: np.ndarray, integration: float) -> List[Tuple[float, float]]:
+    """
+    First and last integration time of each scan.
+
+    A scan ends where consecutive integrations are more than one
+    integration apart.
+    """
+    if times.shape[0] == 0:
+        return []
+    gaps = np.flatnonzero(np.diff(times) > 1.5 * integration)
+    firsts = np.concatenate([[0], gaps + 1])
+    lasts = np.concatenate([gaps, [times.shape[0] - 1]])
+    return [(float(times[i]), float(times[j])) for i, j in zip(firsts, lasts)]
@@ -1,25 +1,244 @@
 """
 Visibility simulation module for SOS (SKA Observation Simulator).
 
-Simulates interferometric visibility from model sky images using CASA toolkit.
+Simulates interferometric visibility from model sky images or directly from
+sky-component lists. The default backend is a pure-NumPy predict engine; the
+CASA toolkit is optional.
 """
 
-from typing import List, Optional, Tuple
+import re
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 from pathlib import Path
 
+import numpy as np
+
 from sos.constants import (
     DEFAULT_NOISE_LEVEL,
     DEFAULT_STOKES,
     DEFAULT_MOUNT_TYPE,
+    DEFAULT_CHUNK_SECONDS,
+    DEFAULT_CUBE_CACHE_PLANES,
     EQUATORIAL_MOUNT_TELESCOPES,
+    SPEED_OF_LIGHT_M_S,
+    TELESCOPE_ELEVATION_LIMIT,
+    TELESCOPE_SHADOW_LIMIT,
+)
+from sos.core.antenna_config import AntennaConfig, StationFilter, read_antenna_config
+from sos.core.averaging import AveragingSpec, AveragingWriter
+from sos.core.baselines import BaselineIndex, BaselineSelection
+from sos.core.degrid import FFTDegridder
+from sos.core.flagging import sample_flags
+from sos.core.parallel import ArraySpec, SharedArrays, attach_shared_arrays
+from sos.core.predict import (
+    predict_centred_gaussians,
+    predict_components,
+    predict_dft_antennas,
 )
+from sos.core.sky_model import (
+    ComponentList,
+    GaussianComponent,
+    ModelImage,
+    SpectralCube,
+    load_model_image,
+    split_common_components,
+)
+from sos.core.uvw import baseline_pairs, baseline_vectors, hour_angles, rotate_baselines
+from sos.core.vis_store import VisibilityStore
 from sos.utils.logger import setup_logger
-from sos.utils.coordinates import ra_arcsec_to_hms, dec_arcsec_to_dms
 from sos.utils.validators import validate_config_file, validate_file_exists
 
 logger = setup_logger(__name__)
 
 
+class VisibilityChunk(NamedTuple):
+    """
+    One time chunk of simulated visibilities.
+
+    Attributes:
+        time: Sample times in seconds from transit, shape (rows,).
+        baseline: Baseline index within each integration, into the selected
+            baselines in :func:`baseline_pairs` order, shape (rows,).
+        antenna1: First antenna of each row, shape (rows,).
+        antenna2: Second antenna of each row, shape (rows,).
+        uvw: Baseline coordinates in metres, shape (rows, 3).
+        vis: Visibilities in Jy, shape (rows, nchan, npol), complex64.
+        flags: True where a sample is flagged, shape (rows, nchan, npol).
+    """
+
+    time: np.ndarray
+    baseline: np.ndarray
+    antenna1: np.ndarray
+    antenna2: np.ndarray
+    uvw: np.ndarray
+    vis: np.ndarray
+    flags: np.ndarray
+
+
+class ChunkGeometry(NamedTuple):
+    """
+    Geometry of one time chunk, as passed to predict functions.
+
+    Attributes:
+        uvw: Baseline coordinates in metres of the unflagged rows, shape (n, 3).
+        antenna_uvw: Antenna positions projected on the uvw frame in metres
+            at the T integrations with an unflagged row, shape
+            (T, n_antennas, 3).
+        antenna1: First antenna index per baseline.
+        antenna2: Second antenna index per baseline.
+        rows: Indices of the unflagged rows in the time-major T x n_baselines
+            rows of those integrations.
+    """
+
+    uvw: np.ndarray
+    antenna_uvw: np.ndarray
+    antenna1: np.ndarray
+    antenna2: np.ndarray
+    rows: np.ndarray
+
+
+PredictFunction = Callable[[ChunkGeometry, np.ndarray], np.ndarray]
+"""Maps chunk geometry and channel scales (frequency / c) to visibilities."""
+
+
+def _catalog_predictor(
+    l_rad: np.ndarray, m_rad: np.ndarray, flux: np.ndarray
+) -> PredictFunction:
+    """
+    Predict function of a point catalog, shape (n, n_chan).
+
+    Uses the antenna-factorized DFT (:func:`predict_dft_antennas`) over the
+    integrations with an unflagged row and keeps the unflagged rows.
+    """
+    def predict(geometry: ChunkGeometry, scales: np.ndarray) -> np.ndarray:
+        vis = predict_dft_antennas(
+            geometry.antenna_uvw, geometry.antenna1, geometry.antenna2,
+            l_rad, m_rad, flux, channel_scales=scales,
+        )
+        return vis.reshape(-1, scales.shape[0])[geometry.rows]
+
+    return predict
+
+
+def _component_predictor(columns: Dict[str, np.ndarray]) -> PredictFunction:
+    """
+    Predict function of component columns, shape (n, n_chan).
+
+    Point components go through the catalog DFT, Gaussians through the
+    analytic :func:`predict_components`.
+    """
+    point = columns["sigma_major"] == 0.0
+    points = _catalog_predictor(
+        columns["l_rad"][point], columns["m_rad"][point], columns["flux"][point]
+    )
+    extended = {key: values[~point] for key, values in columns.items()}
+
+    def predict(geometry: ChunkGeometry, scales: np.ndarray) -> np.ndarray:
+        vis = np.zeros((geometry.uvw.shape[0], scales.shape[0]), dtype=np.complex128)
+        if np.any(point):
+            vis += points(geometry, scales)
+        if extended["flux"].size:
+            vis += predict_components(geometry.uvw, **extended, channel_scales=scales)
+        return vis
+
+    return predict
+
+
+ModelFactory = Callable[[Dict[str, np.ndarray]], PredictFunction]
+"""
+Builds the predict function of a sky model from its arrays, shape
+(n_models, n, n_chan). Factories are module-level functions so worker
+processes can rebuild the predict from shared arrays.
+"""
+
+
+def _prefixed(columns: Dict[str, np.ndarray], prefix: str) -> Dict[str, np.ndarray]:
+    """Prepend ``prefix`` to every key."""
+    return {prefix + key: values for key, values in columns.items()}
+
+
+def _unprefixed(arrays: Dict[str, np.ndarray], prefix: str) -> Dict[str, np.ndarray]:
+    """Select the keys starting with ``prefix`` and strip it."""
+    return {
+        key[len(prefix):]: values
+        for key, values in arrays.items() if key.startswith(prefix)
+    }
+
+
+def _component_model(arrays: Dict[str, np.ndarray]) -> PredictFunction:
+    """Predict function of one component list from :meth:`ComponentList.as_arrays`."""
+    predict = _component_predictor(arrays)
+    return lambda geometry, scales: predict(geometry, scales)[np.newaxis]
+
+
+def _pixel_model(arrays: Dict[str, np.ndarray]) -> PredictFunction:
+    """Catalog DFT predict function of the non-zero model image pixels."""
+    predict = _catalog_predictor(arrays["l_rad"], arrays["m_rad"], arrays["flux"])
+    return lambda geometry, scales: predict(geometry, scales)[np.newaxis]
+
+
+def _degrid_model(arrays: Dict[str, np.ndarray]) -> PredictFunction:
+    """Predict function of a model image from :meth:`FFTDegridder.to_arrays`."""
+    degridder = FFTDegridder.from_arrays(arrays)
+    return lambda geometry, scales: degridder.predict(
+        geometry.uvw, channel_scales=scales
+    )[np.newaxis]
+
+
+def _sweep_model(arrays: Dict[str, np.ndarray]) -> PredictFunction:
+    """
+    Predict function of a sweep of sky models.
+
+    ``arrays`` holds the zero-padded (model, component) tables ``halo_flux``
+    and ``halo_sigma`` of centred circular halos, the shared component
+    columns prefixed ``common_`` and the remaining per-model components
+    prefixed ``other_``, with their model index in ``other_model``.
+    """
+    halo_flux = arrays["halo_flux"]
+    halo_sigma = arrays["halo_sigma"]
+    common = _component_predictor(_unprefixed(arrays, "common_"))
+    other_columns = _unprefixed(arrays, "other_")
+    model = other_columns.pop("model")
+    others = [
+        (i, _component_predictor(
+            {key: values[model == i] for key, values in other_columns.items()}
+        ))
+        for i in np.unique(model)
+    ]
+
+    def predict(geometry: ChunkGeometry, scales: np.ndarray) -> np.ndarray:
+        uv_squared = geometry.uvw[:, 0] ** 2 + geometry.uvw[:, 1] ** 2
+        vis = predict_centred_gaussians(
+            uv_squared, halo_flux, halo_sigma, channel_scales=scales
+        )
+        vis += common(geometry, scales)
+        for i, other in others:
+            vis[i] += other(geometry, scales)
+        return vis
+
+    return predict
+
+
+def _is_centred_circular(component: GaussianComponent) -> bool:
+    """Whether a component is a circular Gaussian at the phase centre."""
+    return (
+        component.l_rad == 0.0 and component.m_rad == 0.0 and
+        component.major_fwhm_rad == component.minor_fwhm_rad
+    )
+
+
 class VisibilitySimulator:
     """Simulate visibility measurements from model sky images."""
 
@@ -30,6 +249,13 @@ class VisibilitySimulator:
         channels: int = 1,
         frequency_resolution_mhz: float = 50.0,
         integration_time: str = "1s",
+        elevation_limit_deg: float = TELESCOPE_ELEVATION_LIMIT,
+        shadow_limit: float = TELESCOPE_SHADOW_LIMIT,
+        workers: int = 1,
+        baselines: Optional[BaselineSelection] = None,
+        stations: Optional[StationFilter] = None,
+        averaging: Optional[AveragingSpec] = None,
+        seed: Optional[int] = None,
     ):
         """
         Initialize visibility simulator.
@@ -40,17 +266,51 @@ class VisibilitySimulator:
             channels: Number of frequency channels.
             frequency_resolution_mhz: Frequency resolution per channel in MHz.
             integration_time: Integration time for samples.
+            elevation_limit_deg: Samples with the source below this elevation
+                are flagged (``sm.setlimits`` ``elevationlimit``).
+            shadow_limit: Baselines with a dish blocked by more than this
+                aperture fraction are flagged (``sm.setlimits`` ``shadowlimit``).
+            workers: Processes predicting time chunks in parallel when writing
+                outputs; 1 predicts in this process.
+            baselines: Baselines to simulate (e.g. only those shorter than
+                2 km); others are never predicted or written. None keeps all.
+            stations: Simulate a sub-array of these stations (names, indices
+                or a predicate over the antenna records, see
+                :meth:`AntennaConfig.subset`) instead of the whole array.
+            averaging: Average written outputs per baseline within this
+                smearing tolerance (see :mod:`sos.core.averaging`); None
+                writes every integration and channel.
+            seed: Seed for the visibility noise; None draws fresh noise on
+                every run. Each integration has its own noise stream, so a
+                seeded run does not depend on ``workers`` or ``chunk_seconds``.
 
         Raises:
             FileNotFoundError: If config file not found.
+            ValueError: If workers is not positive, a station is unknown, or
+                averaging is combined with several workers.
         """
         validate_config_file(config_file)
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if averaging is not None and workers > 1:
+            raise ValueError("Averaging runs in the writing process; use workers=1")
 
         self.config_file = config_file
         self.spectral_index = spectral_index
         self.channels = channels
         self.frequency_resolution_mhz = frequency_resolution_mhz
         self.integration_time = integration_time
+        self.elevation_limit_deg = elevation_limit_deg
+        self.shadow_limit = shadow_limit
+        self.workers = workers
+        self.baselines = baselines
+        self.averaging = averaging
+        self.seed = seed
+        # Resolved to indices, so the simulator stays picklable for workers
+        self.stations = (
+            None if stations is None
+            else read_antenna_config(config_file).station_indices(stations)
+        )
 
         logger.info(
             f"Initialized VisibilitySimulator with {channels} channels, "
@@ -67,48 +327,934 @@ class VisibilitySimulator:
         scan_duration_sec: float = 900.0,
         scan_gap_sec: float = 0.0,
         noise_level: str = DEFAULT_NOISE_LEVEL,
+        backend: str = "numpy",
+        chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+        image_predict: str = "fft",
     ) -> str:
         """
-        Simulate visibility measurement set from model image.
+        Simulate visibilities from a model image into a visibility store.
+
+        With ``backend="numpy"`` (default) the antenna table is read directly,
+        uvw is generated for every integration and visibilities are predicted
+        in time chunks of ``chunk_seconds``, so peak memory is independent of
+        the scan length. The output is a :class:`sos.core.vis_store.VisibilityStore`
+        directory of memory-mapped ``.npy`` columns (``time``, ``antenna1``,
+        ``antenna2``, ``uvw``, ``data``, ``flag``) with a JSON header, which
+        :meth:`~sos.core.vis_store.VisibilityStore.export_ms` converts to an
+        MS where CASA is available.
+        ``backend="casa"`` is reserved and raises NotImplementedError.
+
+        The model image is predicted with ``image_predict="fft"`` (default)
+        by one FFT and Kaiser-Bessel degridding (see
+        :class:`sos.core.degrid.FFTDegridder`), or with ``"dft"`` by a direct
+        Fourier sum over the nonzero pixels, which is exact but costs
+        O(pixels x visibilities).
+
+        Times follow ``sm.settimes(usehourangle=True)``: scan start and stop
+        are seconds from source transit.
 
         Args:
             image_path: Path to model image.
-            output_ms_path: Path for output Measurement Set.
-            rise_time: Source rise time in CASA format (e.g., "56839.0d").
+            output_ms_path: Path for the output
+                :class:`~sos.core.vis_store.VisibilityStore` directory.
+            rise_time: Unused; times are relative to transit. Kept so calls
+                written for the CASA simulator still work.
             num_scans: Number of observation scans.
             start_time_sec: Start time of first scan in seconds.
             scan_duration_sec: Duration of each scan in seconds.
             scan_gap_sec: Gap between consecutive scans in seconds.
             noise_level: Noise level to add (e.g., "0.0Jy" for no noise).
+            backend: Simulation backend, "numpy"; "casa" raises
+                NotImplementedError.
+            chunk_seconds: Length of the time chunks predicted at once.
+            image_predict: Image predict method, "fft" or "dft".
 
         Returns:
-            Path to output Measurement Set.
+            Path to output visibility directory.
 
         Raises:
-            ImportError: If CASA toolkit not available.
+            NotImplementedError: If the CASA backend is requested.
             FileNotFoundError: If model image not found.
+            ValueError: If backend, predict method or observation parameters invalid.
         """
         validate_file_exists(image_path)
 
         logger.info(f"Starting visibility simulation for {Path(image_path).name}")
         logger.debug(
-            f"Output MS: {output_ms_path}, "
-            f"Scans: {num_scans}, Duration: {scan_duration_sec}s"
+            f"Output: {output_ms_path}, "
+            f"Scans: {num_scans}, Duration: {scan_duration_sec}s, backend: {backend}"
+        )
+
+        if backend == "casa":
+            raise NotImplementedError(
+                "The CASA backend is not implemented; simulate with backend='numpy' "
+                "and convert with VisibilityStore.export_ms"
+            )
+        if backend != "numpy":
+            raise ValueError(f"Unknown backend '{backend}'. Use 'numpy' or 'casa'")
+        if chunk_seconds <= 0:
+            raise ValueError(f"chunk_seconds must be positive, got {chunk_seconds}")
+
+        factory, arrays, ref_ra_rad, ref_dec_rad, ref_freq_hz = self._sky_model(
+            image_path, image_predict
         )
+        self._simulate_numpy(
+            factory, arrays, ref_ra_rad, ref_dec_rad, ref_freq_hz, [output_ms_path],
+            num_scans, start_time_sec, scan_duration_sec, scan_gap_sec,
+            noise_level, chunk_seconds,
+        )
+
+        logger.info(f"Visibility simulation complete: {output_ms_path}")
+        return output_ms_path
+
+    def simulate_components(
+        self,
+        sky_model: ComponentList,
+        output_ms_path: str,
+        num_scans: int = 1,
+        start_time_sec: float = 1.0,
+        scan_duration_sec: float = 900.0,
+        scan_gap_sec: float = 0.0,
+        noise_level: str = DEFAULT_NOISE_LEVEL,
+        chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    ) -> str:
+        """
+        Simulate visibilities analytically from a sky-component list.
+
+        Every Gaussian (or point) component has a closed-form Fourier
+        transform, so visibilities are evaluated directly in the uv domain
+        (see :func:`sos.core.predict.predict_components`) without rendering
+        or transforming a model image. The result is exact and the cost
+        scales with components rather than image pixels. Output layout and
+        time handling match :meth:`simulate_visibility`.
+
+        Args:
+            sky_model: Components with their reference direction and frequency.
+            output_ms_path: Path for output visibility directory.
+            num_scans: Number of observation scans.
+            start_time_sec: Start time of first scan in seconds.
+            scan_duration_sec: Duration of each scan in seconds.
+            scan_gap_sec: Gap between consecutive scans in seconds.
+            noise_level: Noise level to add (e.g., "0.0Jy" for no noise).
+            chunk_seconds: Length of the time chunks predicted at once.
+
+        Returns:
+            Path to output visibility directory.
 
-        try:
-            # CASA imports - will fail if not in CASA environment
-            from casac import casatools  # type: ignore
-        except ImportError:
-            logger.error("CASA toolkit not available. Run this within CASA.")
-            raise ImportError("This function must be run within CASA environment")
+        Raises:
+            ValueError: If observation parameters invalid.
+        """
+        if chunk_seconds <= 0:
+            raise ValueError(f"chunk_seconds must be positive, got {chunk_seconds}")
 
-        # TODO: Implement actual CASA simulation here
-        # This would use sm (simobserve manager) tools
+        logger.info(
+            f"Starting component-list simulation with {len(sky_model)} components"
+        )
+        factory, arrays, ref_ra_rad, ref_dec_rad, ref_freq_hz = self._sky_model(
+            sky_model
+        )
+        self._simulate_numpy(
+            factory, arrays, ref_ra_rad, ref_dec_rad, ref_freq_hz, [output_ms_path],
+            num_scans, start_time_sec, scan_duration_sec, scan_gap_sec,
+            noise_level, chunk_seconds,
+        )
 
         logger.info(f"Visibility simulation complete: {output_ms_path}")
         return output_ms_path
 
+    def simulate_sweep(
+        self,
+        sky_models: Sequence[ComponentList],
+        output_paths: Sequence[str],
+        num_scans: int = 1,
+        start_time_sec: float = 1.0,
+        scan_duration_sec: float = 900.0,
+        scan_gap_sec: float = 0.0,
+        noise_level: str = DEFAULT_NOISE_LEVEL,
+        chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    ) -> List[str]:
+        """
+        Simulate a family of component lists (e.g. a redshift sweep) in one pass.
+
+        The uv coverage is the same for every model, so uvw and |u|^2 are
+        computed once per time chunk and channel and shared. Components
+        present in every model (the point sources) are predicted once;
+        halos at the phase centre, which only change flux and size with
+        redshift, are evaluated for all models with one broadcast over
+        |u|^2. Any other component is predicted per model.
+
+        Args:
+            sky_models: Component lists sharing phase centre and frequency.
+            output_paths: One output visibility directory per model.
+            num_scans: Number of observation scans.
+            start_time_sec: Start time of first scan in seconds.
+            scan_duration_sec: Duration of each scan in seconds.
+            scan_gap_sec: Gap between consecutive scans in seconds.
+            noise_level: Noise level to add (e.g., "0.0Jy" for no noise).
+            chunk_seconds: Length of the time chunks predicted at once.
+
+        Returns:
+            List of output visibility directories.
+
+        Raises:
+            ValueError: If models and outputs do not match, models do not
+                share a phase centre and frequency, or parameters invalid.
+        """
+        if len(sky_models) == 0 or len(sky_models) != len(output_paths):
+            raise ValueError(
+                f"Need one output path per sky model, got {len(sky_models)} models "
+                f"and {len(output_paths)} paths"
+            )
+        if chunk_seconds <= 0:
+            raise ValueError(f"chunk_seconds must be positive, got {chunk_seconds}")
+        reference = sky_models[0]
+        if any(
+            (sky.ref_ra_rad, sky.ref_dec_rad, sky.ref_freq_hz) !=
+            (reference.ref_ra_rad, reference.ref_dec_rad, reference.ref_freq_hz)
+            for sky in sky_models
+        ):
+            raise ValueError(
+                "Sweep models must share phase centre and reference frequency"
+            )
+
+        logger.info(f"Starting sweep simulation of {len(sky_models)} sky models")
+
+        common, varying = split_common_components(
+            [sky.components for sky in sky_models]
+        )
+        centred = [[c for c in comps if _is_centred_circular(c)] for comps in varying]
+        others = [
+            ComponentList(
+                [c for c in comps if not _is_centred_circular(c)],
+                reference.ref_ra_rad, reference.ref_dec_rad, reference.ref_freq_hz,
+            ).as_arrays()
+            for comps in varying
+        ]
+        common_columns = ComponentList(
+            common, reference.ref_ra_rad, reference.ref_dec_rad, reference.ref_freq_hz
+        ).as_arrays()
+
+        # (model, component) tables of the centred halos, zero-padded
+        n_centred = max(len(comps) for comps in centred)
+        halo_flux = np.zeros((len(sky_models), n_centred))
+        halo_sigma = np.zeros((len(sky_models), n_centred))
+        for i, comps in enumerate(centred):
+            halo_flux[i, :len(comps)] = [c.flux_jy for c in comps]
+            halo_sigma[i, :len(comps)] = [c.sigma_major for c in comps]
+
+        other_model = np.repeat(
+            np.arange(len(others)), [columns["flux"].shape[0] for columns in others]
+        )
+        arrays = {
+            "halo_flux": halo_flux,
+            "halo_sigma": halo_sigma,
+            **_prefixed(common_columns, "common_"),
+            **_prefixed(
+                {
+                    key: np.concatenate([columns[key] for columns in others])
+                    for key in common_columns
+                },
+                "other_",
+            ),
+            "other_model": other_model,
+        }
+
+        logger.debug(
+            f"Sweep: {len(common)} shared components, {n_centred} centred halos per "
+            f"model, {other_model.shape[0]} other components"
+        )
+
+        self._simulate_numpy(
+            _sweep_model, arrays, reference.ref_ra_rad, reference.ref_dec_rad,
+            reference.ref_freq_hz,
+            list(output_paths), num_scans, start_time_sec, scan_duration_sec,
+            scan_gap_sec, noise_level, chunk_seconds,
+        )
+
+        logger.info(f"Sweep simulation complete: {len(output_paths)} outputs")
+        return list(output_paths)
+
+    def simulate_subarrays(
+        self,
+        sky_model: Union[str, ComponentList],
+        subarrays: Sequence[StationFilter],
+        output_paths: Sequence[str],
+        num_scans: int = 1,
+        start_time_sec: float = 1.0,
+        scan_duration_sec: float = 900.0,
+        scan_gap_sec: float = 0.0,
+        noise_level: str = DEFAULT_NOISE_LEVEL,
+        chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+        image_predict: str = "fft",
+    ) -> List[str]:
+        """
+        Simulate several sub-arrays of the configured array in one pass.
+
+        Sub-arrays (e.g. the core, or only the 13.5 m dishes) are derived from
+        the antenna table in memory (see :meth:`AntennaConfig.subset`), so no
+        ``.cfg`` file is written. A sub-array baseline is a parent baseline
+        with the same uvw track, so uvw and the predict of each time chunk are
+        computed once for the union of the sub-array baselines and sliced
+        per sub-array; only shadowing, which depends on which dishes are
+        present, is flagged per sub-array. Each output matches a separate run
+        with ``stations`` set to its sub-array, except that with noise a
+        baseline shared by several sub-arrays gets the same noise in each.
+
+        Chunks are predicted in this process, whatever ``workers`` is.
+
+        Args:
+            sky_model: Path to a model image, or a component list.
+            subarrays: One station filter per sub-array (station names,
+                antenna indices or a predicate over the antenna records).
+            output_paths: One output visibility directory per sub-array.
+            num_scans: Number of observation scans.
+            start_time_sec: Start time of first scan in seconds.
+            scan_duration_sec: Duration of each scan in seconds.
+            scan_gap_sec: Gap between consecutive scans in seconds.
+            noise_level: Noise level to add (e.g., "0.0Jy" for no noise).
+            chunk_seconds: Length of the time chunks predicted at once.
+            image_predict: Image predict method, "fft" or "dft".
+
+        Returns:
+            List of output visibility directories.
+
+        Raises:
+            FileNotFoundError: If a model image path does not exist.
+            ValueError: If sub-arrays and outputs do not match, a sub-array
+                has no selected baseline, or parameters invalid.
+        """
+        if len(subarrays) == 0 or len(subarrays) != len(output_paths):
+            raise ValueError(
+                f"Need one output path per sub-array, got {len(subarrays)} sub-arrays "
+                f"and {len(output_paths)} paths"
+            )
+        if chunk_seconds <= 0:
+            raise ValueError(f"chunk_seconds must be positive, got {chunk_seconds}")
+
+        factory, arrays, ref_ra_rad, ref_dec_rad, ref_freq_hz = self._sky_model(
+            sky_model, image_predict
+        )
+        times = self._observation_times(
+            num_scans, start_time_sec, scan_duration_sec, scan_gap_sec
+        )
+        parent = self._read_antennas()
+        members = [parent.station_indices(stations) for stations in subarrays]
+        union_members = np.unique(np.concatenate(members))
+        union = parent.subset(union_members)
+        union_baselines = self._baseline_index(union)
+
+        layouts = []
+        for indices, path in zip(members, output_paths):
+            antennas = parent.subset(indices)
+            # Union antenna index -> sub-array antenna index, -1 if absent
+            mapping = np.full(union.n_antennas, -1, dtype=np.int32)
+            mapping[np.searchsorted(union_members, indices)] = np.arange(
+                indices.shape[0]
+            )
+            antenna1 = mapping[union_baselines.antenna1]
+            antenna2 = mapping[union_baselines.antenna2]
+            rows = np.flatnonzero((antenna1 >= 0) & (antenna2 >= 0))
+            if rows.shape[0] == 0:
+                raise ValueError(f"Sub-array for {path} has no selected baselines")
+            lengths_m = union_baselines.lengths_m
+            baselines = BaselineIndex(
+                antenna1[rows], antenna2[rows],
+                None if lengths_m is None else lengths_m[rows], antennas.names,
+            )
+            store = self._create_stores(
+                [path], antennas, baselines, ref_ra_rad, ref_dec_rad, ref_freq_hz
+            )[0]
+            layouts.append((antennas, baselines, rows, store))
+
+        logger.info(
+            f"Simulating {len(subarrays)} sub-arrays over {union.n_antennas} antennas, "
+            f"{union_baselines.n_baselines} baselines"
+        )
+
+        # Shadowing is left to each sub-array; the union only drops low elevations
+        chunks = self._iter_chunks(
+            factory(arrays), ref_dec_rad, ref_freq_hz, times,
+            self._parse_noise_level(noise_level), chunk_seconds,
+            antennas=union, shadow_limit=1.0,
+        )
+        n_union = union_baselines.n_baselines
+        for chunk in chunks:
+            chunk_times = chunk.time[::n_union]
+            n_times = chunk_times.shape[0]
+            vis = chunk.vis[0].reshape((n_times, n_union) + chunk.vis.shape[2:])
+            uvw = chunk.uvw.reshape(n_times, n_union, 3)
+            chunk_hour_angles = hour_angles(chunk_times)
+
+            for antennas, baselines, rows, store in layouts:
+                flags = sample_flags(
+                    antennas.xyz, antennas.diameters,
+                    baselines.antenna1, baselines.antenna2,
+                    chunk_hour_angles, ref_dec_rad, antennas.longitude_rad,
+                    antennas.latitude_rad, np.radians(self.elevation_limit_deg),
+                    self.shadow_limit,
+                )
+                data = vis[:, rows]
+                data[flags] = 0.0
+                store.append(
+                    time=np.repeat(chunk_times, rows.shape[0]),
+                    antenna1=np.tile(baselines.antenna1, n_times),
+                    antenna2=np.tile(baselines.antenna2, n_times),
+                    uvw=uvw[:, rows].reshape(-1, 3),
+                    data=data.reshape((-1,) + data.shape[2:]),
+                    flag=np.broadcast_to(
+                        flags.reshape(-1, 1, 1), (flags.size,) + data.shape[2:]
+                    ),
+                )
+        self._close_outputs([layout[3] for layout in layouts])
+
+        logger.info(f"Sub-array simulation complete: {len(output_paths)} outputs")
+        return list(output_paths)
+
+    def iter_visibilities(
+        self,
+        sky_model: Union[str, ComponentList],
+        num_scans: int = 1,
+        start_time_sec: float = 1.0,
+        scan_duration_sec: float = 900.0,
+        scan_gap_sec: float = 0.0,
+        noise_level: str = DEFAULT_NOISE_LEVEL,
+        chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+        image_predict: str = "fft",
+    ) -> Iterator[VisibilityChunk]:
+        """
+        Stream simulated visibilities in time chunks.
+
+        Nothing is written to disk and only one chunk of ``chunk_seconds``
+        is held in memory at a time, so writers, gridders, averagers or
+        noise injectors can consume tracks of any length. Rows within a
+        chunk are time-major with baselines in :func:`baseline_pairs` order.
+
+        Args:
+            sky_model: Path to a model image, or a component list.
+            num_scans: Number of observation scans.
+            start_time_sec: Start time of first scan in seconds.
+            scan_duration_sec: Duration of each scan in seconds.
+            scan_gap_sec: Gap between consecutive scans in seconds.
+            noise_level: Noise level to add (e.g., "0.0Jy" for no noise).
+            chunk_seconds: Length of the time chunks yielded.
+            image_predict: Image predict method, "fft" or "dft" (see
+                :meth:`simulate_visibility`).
+
+        Returns:
+            Iterator over :class:`VisibilityChunk` blocks.
+
+        Raises:
+            FileNotFoundError: If a model image path does not exist.
+            ValueError: If observation parameters invalid.
+        """
+        if chunk_seconds <= 0:
+            raise ValueError(f"chunk_seconds must be positive, got {chunk_seconds}")
+
+        factory, arrays, _, ref_dec_rad, ref_freq_hz = self._sky_model(
+            sky_model, image_predict
+        )
+        times = self._observation_times(
+            num_scans, start_time_sec, scan_duration_sec, scan_gap_sec
+        )
+        chunks = self._iter_chunks(
+            factory(arrays), ref_dec_rad, ref_freq_hz, times,
+            self._parse_noise_level(noise_level), chunk_seconds,
+        )
+        return (chunk._replace(vis=chunk.vis[0]) for chunk in chunks)
+
+    def _sky_model(
+        self,
+        sky_model: Union[str, ComponentList],
+        image_predict: str = "fft",
+    ) -> Tuple[ModelFactory, Dict[str, np.ndarray], float, float, float]:
+        """
+        Prepare the predict of a model image path or component list.
+
+        Args:
+            sky_model: Path to a model image, or a component list.
+            image_predict: Image predict method, "fft" or "dft".
+
+        Returns:
+            Tuple of (predict factory, the arrays it is built from, phase
+            centre right ascension and declination in radians, reference
+            frequency in Hz).
+
+        Raises:
+            ValueError: If the image predict method is unknown.
+        """
+        if image_predict not in ("fft", "dft"):
+            raise ValueError(
+                f"Unknown image predict '{image_predict}'. Use 'fft' or 'dft'"
+            )
+
+        if isinstance(sky_model, ComponentList):
+            return (
+                _component_model, sky_model.as_arrays(),
+                sky_model.ref_ra_rad, sky_model.ref_dec_rad, sky_model.ref_freq_hz,
+            )
+
+        validate_file_exists(sky_model)
+        image = load_model_image(sky_model)
+        if image_predict == "fft":
+            return (
+                _degrid_model, FFTDegridder(image).to_arrays(),
+                image.ref_ra_rad, image.ref_dec_rad, image.ref_freq_hz,
+            )
+
+        l_rad, m_rad, flux = image.nonzero_components()
+        return (
+            _pixel_model, {"l_rad": l_rad, "m_rad": m_rad, "flux": flux},
+            image.ref_ra_rad, image.ref_dec_rad, image.ref_freq_hz,
+        )
+
+    def _iter_chunks(
+        self,
+        predict: PredictFunction,
+        ref_dec_rad: float,
+        ref_freq_hz: float,
+        times: np.ndarray,
+        noise_jy: float,
+        chunk_seconds: float,
+        antennas: Optional[AntennaConfig] = None,
+        shadow_limit: Optional[float] = None,
+        noise_seeds: Optional[Sequence[np.random.SeedSequence]] = None,
+    ) -> Iterator[VisibilityChunk]:
+        """
+        Generate visibility chunks for one or more sky models.
+
+        Geometry (uvw, times, baselines) is computed once per chunk and
+        shared by all models; only the visibilities differ. Samples below
+        the elevation limit or on shadowed baselines are flagged first and
+        their visibilities are zero; only the catalog DFT, which works per
+        antenna, evaluates flagged rows of partly flagged integrations.
+
+        All channels are predicted in one call: ``predict`` receives the
+        chunk geometry in metres with the per-channel scales frequency / c,
+        and the spectral law (nu / nu0)^alpha is applied by broadcasting over
+        the channel axis.
+
+        Args:
+            predict: Maps a :class:`ChunkGeometry` and channel scales (n_chan,)
+                to visibilities in Jy at the reference flux of the unflagged
+                rows, shape (n_models, n, n_chan).
+            ref_dec_rad: Phase centre declination in radians.
+            ref_freq_hz: Reference frequency of the sky model in Hz.
+            times: Integration timestamps in seconds from transit.
+            noise_jy: Noise per real and imaginary part in Jy.
+            chunk_seconds: Length of the time chunks.
+            antennas: Antenna table; the configured (sub-)array if None.
+            shadow_limit: Shadowing limit overriding :attr:`shadow_limit`.
+            noise_seeds: One noise seed per integration in ``times``; spawned
+                from :attr:`seed` if None.
+
+        Yields:
+            VisibilityChunk with ``vis`` of shape (n_models, rows, nchan, npol).
+        """
+        if antennas is None:
+            antennas = self._read_antennas()
+        if shadow_limit is None:
+            shadow_limit = self.shadow_limit
+        selected = self._baseline_index(antennas)
+        antenna1, antenna2 = selected.antenna1, selected.antenna2
+        baselines = baseline_vectors(antennas.xyz, antenna1, antenna2)
+        centred_xyz = antennas.xyz - antennas.xyz.mean(axis=0)
+        n_baselines = antenna1.shape[0]
+        frequencies = self._channel_frequencies(ref_freq_hz)
+        channel_scales = frequencies / SPEED_OF_LIGHT_M_S
+        spectral_weights = (frequencies / ref_freq_hz) ** self.spectral_index
+        n_pol = len(DEFAULT_STOKES.split())
+        if noise_seeds is None:
+            noise_seeds = self._noise_seeds(times)
+
+        samples_per_chunk = max(1, int(chunk_seconds / self._integration_seconds()))
+        logger.debug(
+            f"Predicting {times.shape[0]} samples x {n_baselines} baselines x "
+            f"{frequencies.shape[0]} channels"
+        )
+
+        for t0 in range(0, times.shape[0], samples_per_chunk):
+            chunk_times = times[t0:t0 + samples_per_chunk]
+            n_times = chunk_times.shape[0]
+
+            chunk_hour_angles = hour_angles(chunk_times)
+            uvw = rotate_baselines(
+                baselines, chunk_hour_angles, ref_dec_rad, antennas.longitude_rad
+            ).reshape(-1, 3)
+
+            flagged = sample_flags(
+                antennas.xyz, antennas.diameters, antenna1, antenna2, chunk_hour_angles,
+                ref_dec_rad, antennas.longitude_rad, antennas.latitude_rad,
+                np.radians(self.elevation_limit_deg), shadow_limit,
+            ).ravel()
+            keep = np.flatnonzero(~flagged)
+            if keep.shape[0] < flagged.shape[0]:
+                logger.debug(
+                    f"Culled {flagged.shape[0] - keep.shape[0]} of {flagged.shape[0]} "
+                    f"samples at t={chunk_times[0]}s before predict"
+                )
+
+            # Integrations with an unflagged row; fully flagged ones cost nothing
+            live, live_rows = np.unique(keep // n_baselines, return_inverse=True)
+            geometry = ChunkGeometry(
+                uvw=uvw[keep],
+                antenna_uvw=rotate_baselines(
+                    centred_xyz, chunk_hour_angles[live], ref_dec_rad,
+                    antennas.longitude_rad,
+                ),
+                antenna1=antenna1,
+                antenna2=antenna2,
+                rows=live_rows * n_baselines + keep % n_baselines,
+            )
+            model_vis = predict(geometry, channel_scales) * spectral_weights
+            vis = np.zeros(
+                (model_vis.shape[0], uvw.shape[0], frequencies.shape[0], n_pol),
+                dtype=np.complex64,
+            )
+            vis[:, keep] = model_vis[..., np.newaxis]
+            if noise_jy > 0:
+                # Independent noise per correlation, drawn after the broadcast
+                # from the stream of each integration
+                bounds = np.searchsorted(keep, np.arange(n_times + 1) * n_baselines)
+                noise = np.empty(
+                    (model_vis.shape[0], keep.shape[0], frequencies.shape[0], n_pol),
+                    dtype=np.complex64,
+                )
+                for i in range(n_times):
+                    rng = np.random.default_rng(noise_seeds[t0 + i])
+                    rows = slice(bounds[i], bounds[i + 1])
+                    shape = (noise.shape[0], rows.stop - rows.start) + noise.shape[2:]
+                    noise[:, rows] = (
+                        rng.standard_normal(shape, dtype=np.float32) +
+                        1j * rng.standard_normal(shape, dtype=np.float32)
+                    )
+                vis[:, keep] += noise_jy * noise
+
+            yield VisibilityChunk(
+                time=np.repeat(chunk_times, n_baselines),
+                baseline=np.tile(np.arange(n_baselines, dtype=np.int32), n_times),
+                antenna1=np.tile(antenna1, n_times),
+                antenna2=np.tile(antenna2, n_times),
+                uvw=uvw,
+                vis=vis,
+                flags=np.broadcast_to(
+                    flagged[:, np.newaxis, np.newaxis], vis.shape[1:]
+                ).copy(),
+            )
+
+    def _simulate_numpy(
+        self,
+        factory: ModelFactory,
+        arrays: Dict[str, np.ndarray],
+        ref_ra_rad: float,
+        ref_dec_rad: float,
+        ref_freq_hz: float,
+        output_paths: List[str],
+        num_scans: int,
+        start_time_sec: float,
+        scan_duration_sec: float,
+        scan_gap_sec: float,
+        noise_level: str,
+        chunk_seconds: float,
+    ) -> None:
+        """
+        Stream visibility chunks into :class:`VisibilityStore` directories.
+
+        Each chunk is appended and committed as soon as it is predicted, so
+        a partially simulated store is readable while the simulation runs.
+        With ``workers > 1`` the time chunks are spread over a process pool
+        (see :meth:`_simulate_parallel`).
+
+        Args:
+            factory: Builds the predict function from ``arrays``; it maps a
+                :class:`ChunkGeometry` and channel scales (n_chan,) to
+                visibilities in Jy, shape (len(output_paths), n, n_chan).
+            arrays: Sky model arrays passed to ``factory``.
+            ref_ra_rad: Phase centre right ascension in radians.
+            ref_dec_rad: Phase centre declination in radians.
+            ref_freq_hz: Reference frequency of the sky model in Hz.
+            output_paths: Output visibility store directories.
+            num_scans: Number of observation scans.
+            start_time_sec: Start time of first scan in seconds.
+            scan_duration_sec: Duration of each scan in seconds.
+            scan_gap_sec: Gap between consecutive scans in seconds.
+            noise_level: Noise level string (e.g., "0.0Jy").
+            chunk_seconds: Length of the time chunks predicted at once.
+        """
+        times = self._observation_times(
+            num_scans, start_time_sec, scan_duration_sec, scan_gap_sec
+        )
+        antennas = self._read_antennas()
+        noise_jy = self._parse_noise_level(noise_level)
+
+        stores = self._create_stores(
+            output_paths, antennas, self._baseline_index(antennas),
+            ref_ra_rad, ref_dec_rad, ref_freq_hz,
+        )
+
+        if self.workers > 1:
+            # Averaging is only allowed with one worker, so these are plain stores
+            self._simulate_parallel(
+                factory, arrays, antennas, ref_dec_rad, ref_freq_hz,
+                cast(List[VisibilityStore], stores), times, noise_jy, chunk_seconds,
+            )
+            return
+
+        chunks = self._iter_chunks(
+            factory(arrays), ref_dec_rad, ref_freq_hz, times, noise_jy, chunk_seconds,
+            antennas=antennas,
+        )
+        for chunk in chunks:
+            for store, model_vis in zip(stores, chunk.vis):
+                store.append(
+                    time=chunk.time, antenna1=chunk.antenna1, antenna2=chunk.antenna2,
+                    uvw=chunk.uvw, data=model_vis, flag=chunk.flags,
+                )
+        self._close_outputs(stores)
+
+    def _simulate_parallel(
+        self,
+        factory: ModelFactory,
+        arrays: Dict[str, np.ndarray],
+        antennas: AntennaConfig,
+        ref_dec_rad: float,
+        ref_freq_hz: float,
+        stores: List[VisibilityStore],
+        times: np.ndarray,
+        noise_jy: float,
+        chunk_seconds: float,
+    ) -> None:
+        """
+        Predict time blocks in a process pool, writing outputs in place.
+
+        The antenna table and sky model arrays are copied once into shared
+        memory; each task carries only their block names and its time block.
+        Workers attach to the shared inputs, build the predict once per
+        process and write their rows straight into rows reserved in the
+        memory-mapped store columns, which are shared file mappings, so no
+        visibility data is pickled or gathered. Blocks are committed in time
+        order as they complete.
+
+        Args:
+            factory: Module-level predict factory (see :data:`ModelFactory`).
+            arrays: Sky model arrays passed to ``factory``.
+            antennas: Antenna table.
+            ref_dec_rad: Phase centre declination in radians.
+            ref_freq_hz: Reference frequency of the sky model in Hz.
+            stores: Empty output stores.
+            times: Integration timestamps in seconds from transit.
+            noise_jy: Noise per real and imaginary part in Jy.
+            chunk_seconds: Length of the time chunks predicted at once.
+        """
+        samples_per_chunk = max(1, int(chunk_seconds / self._integration_seconds()))
+        # At most one chunk per task, and enough tasks to keep every worker busy
+        block = max(1, min(samples_per_chunk, -(-times.shape[0] // self.workers)))
+        n_baselines = stores[0].n_baselines
+        noise_seeds = self._noise_seeds(times)
+        for store in stores:
+            store.reserve(times.shape[0] * n_baselines)
+
+        with SharedArrays(arrays) as shared_sky, \
+                SharedArrays({"antennas": antennas.to_records()}) as shared_antennas:
+            tasks = [
+                _ChunkTask(
+                    simulator=self,
+                    factory=factory,
+                    sky_spec=shared_sky.spec,
+                    antenna_spec=shared_antennas.spec,
+                    observatory=antennas.observatory,
+                    coordsys=antennas.coordsys,
+                    reference_xyz=antennas.reference_xyz,
+                    ref_dec_rad=ref_dec_rad,
+                    ref_freq_hz=ref_freq_hz,
+                    times=times[t0:t0 + block],
+                    row_start=t0 * n_baselines,
+                    output_paths=[str(store.path) for store in stores],
+                    noise_jy=noise_jy,
+                    noise_seeds=noise_seeds[t0:t0 + block],
+                    chunk_seconds=chunk_seconds,
+                )
+                for t0 in range(0, times.shape[0], block)
+            ]
+            logger.info(
+                f"Predicting {len(tasks)} time blocks on {self.workers} processes"
+            )
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                # map yields in task order, so every commit directly follows the last
+                for task, _ in zip(tasks, executor.map(_simulate_task, tasks)):
+                    n_rows = task.times.shape[0] * n_baselines
+                    rows = slice(task.row_start, task.row_start + n_rows)
+                    for store in stores:
+                        store.commit(rows)
+
+    def _integration_seconds(self) -> float:
+        """
+        Parse the integration time (e.g., "1s") into seconds.
+
+        Raises:
+            ValueError: If the integration time cannot be parsed.
+        """
+        match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*s\s*$", str(self.integration_time))
+        if not match or float(match.group(1)) <= 0:
+            raise ValueError(
+                f"Invalid integration time: {self.integration_time}. Expected e.g. '1s'"
+            )
+        return float(match.group(1))
+
+    @staticmethod
+    def _parse_noise_level(noise_level: str) -> float:
+        """
+        Parse a noise level string (e.g., "0.01Jy") into Jy.
+
+        Raises:
+            ValueError: If the noise level cannot be parsed.
+        """
+        match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*Jy\s*$", str(noise_level))
+        if not match:
+            raise ValueError(
+                f"Invalid noise level: {noise_level}. Expected e.g. '0.0Jy'"
+            )
+        return float(match.group(1))
+
+    def _observation_times(
+        self,
+        num_scans: int,
+        start_time_sec: float,
+        scan_duration_sec: float,
+        scan_gap_sec: float,
+    ) -> np.ndarray:
+        """
+        Build integration timestamps (seconds from transit) for all scans.
+
+        Follows the scan loop of ``SOS.py``: each scan lasts
+        ``scan_duration_sec`` and the next one starts after ``scan_gap_sec``.
+
+        Raises:
+            ValueError: If scan parameters are invalid.
+        """
+        if num_scans < 1 or scan_duration_sec <= 0 or scan_gap_sec < 0:
+            raise ValueError(
+                f"Invalid scan setup: num_scans={num_scans}, "
+                f"duration={scan_duration_sec}s, gap={scan_gap_sec}s"
+            )
+
+        integration = self._integration_seconds()
+        samples_per_scan = max(1, int(round(scan_duration_sec / integration)))
+        offsets = np.arange(samples_per_scan) * integration
+        scan_starts = start_time_sec + np.arange(num_scans) * (
+            scan_duration_sec + scan_gap_sec
+        )
+        return (scan_starts[:, np.newaxis] + offsets[np.newaxis, :]).ravel()
+
+    def _noise_seeds(self, times: np.ndarray) -> List[np.random.SeedSequence]:
+        """Spawn one noise seed per integration from :attr:`seed`."""
+        return np.random.SeedSequence(self.seed).spawn(times.shape[0])
+
+    def _channel_frequencies(self, reference_frequency_hz: float) -> np.ndarray:
+        """Return channel centre frequencies in Hz starting at the reference."""
+        return reference_frequency_hz + np.arange(self.channels) * (
+            self.frequency_resolution_mhz * 1e6
+        )
+
+    def _create_stores(
+        self,
+        output_paths: List[str],
+        antennas: AntennaConfig,
+        baselines: BaselineIndex,
+        ref_ra_rad: float,
+        ref_dec_rad: float,
+        ref_freq_hz: float,
+    ) -> List[Union[VisibilityStore, AveragingWriter]]:
+        """
+        Create one empty visibility store per output path.
+
+        The header records what :meth:`VisibilityStore.export_ms` needs to
+        rebuild the observation in CASA. With :attr:`averaging` set, each
+        output is an :class:`AveragingWriter` of per-group stores instead.
+
+        Args:
+            output_paths: Store directories.
+            antennas: Simulated (sub-)array.
+            baselines: Simulated baselines of ``antennas``, in row order.
+            ref_ra_rad: Phase centre right ascension in radians.
+            ref_dec_rad: Phase centre declination in radians.
+            ref_freq_hz: Reference frequency of the sky model in Hz.
+
+        Returns:
+            Stores or averaging writers in the order of ``output_paths``;
+            both take full-rate chunks through ``append``.
+        """
+        _, mount_type, config_path = self._parse_telescope_config()
+        metadata = {
+            "config_file": config_path,
+            "stations": antennas.names,
+            "mount": mount_type,
+            "ref_ra_rad": ref_ra_rad,
+            "ref_dec_rad": ref_dec_rad,
+            "ref_freq_hz": ref_freq_hz,
+            "integration_seconds": self._integration_seconds(),
+            "channel_width_hz": self.frequency_resolution_mhz * 1e6,
+            "spectral_index": self.spectral_index,
+        }
+        if self.averaging is not None:
+            return [
+                AveragingWriter(
+                    path, baselines, self._channel_frequencies(ref_freq_hz),
+                    DEFAULT_STOKES.split(), self._integration_seconds(), self.averaging,
+                    metadata,
+                )
+                for path in output_paths
+            ]
+        return [
+            VisibilityStore.create(
+                path, self._channel_frequencies(ref_freq_hz), baselines.antenna1,
+                baselines.antenna2, DEFAULT_STOKES.split(), metadata,
+                baseline_lengths_m=baselines.lengths_m, antenna_names=antennas.names,
+            )
+            for path in output_paths
+        ]
+
+    @staticmethod
+    def _close_outputs(outputs: List[Union[VisibilityStore, AveragingWriter]]) -> None:
+        """Write the last, partial averaging windows of averaged outputs."""
+        for output in outputs:
+            if isinstance(output, AveragingWriter):
+                output.close()
+
+    def _read_antennas(self) -> AntennaConfig:
+        """Antenna table of the simulated array, or sub-array with ``stations``."""
+        antennas = read_antenna_config(self.config_file)
+        if self.stations is None:
+            return antennas
+        return antennas.subset(self.stations)
+
+    def _baseline_index(self, antennas: AntennaConfig) -> BaselineIndex:
+        """
+        Index the simulated baselines of an array.
+
+        All cross-correlations of the array are indexed by length and antenna
+        and the :attr:`baselines` selection applied to that index.
+
+        Returns:
+            BaselineIndex of the selected baselines, in row order.
+
+        Raises:
+            ValueError: If the selection matches no baseline.
+        """
+        antenna1, antenna2 = baseline_pairs(antennas.n_antennas)
+        index = BaselineIndex.from_antennas(
+            antennas.xyz, antenna1, antenna2, antennas.names
+        )
+        if self.baselines is None:
+            return index
+        rows = index.select(self.baselines)
+        if rows.shape[0] == 0:
+            raise ValueError(
+                f"Baseline selection {self.baselines} matches no baselines"
+            )
+        logger.debug(f"Selected {rows.shape[0]} of {index.n_baselines} baselines")
+        lengths_m = None if index.lengths_m is None else index.lengths_m[rows]
+        return BaselineIndex(antenna1[rows], antenna2[rows], lengths_m, antennas.names)
+
     def _parse_telescope_config(self) -> Tuple[str, str, str]:
         """
         Parse telescope configuration file to extract name and mount type.
@@ -127,38 +1273,171 @@ class VisibilitySimulator:
         logger.debug(f"Parsed telescope: {telescope_name}, mount: {mount_type}")
         return telescope_name, mount_type, str(path.absolute())
 
+    def spectral_cube(
+        self,
+        image_path: str,
+        cache_planes: int = DEFAULT_CUBE_CACHE_PLANES,
+    ) -> SpectralCube:
+        """
+        Open a model image as a lazy cube over this simulator's channels.
+
+        Channel planes are scaled by (nu / nu0)^alpha on access rather than
+        written out per channel, so memory stays at about one image plane.
+
+        Args:
+            image_path: Path to model image (its frequency is nu0).
+            cache_planes: Number of recently used planes kept in memory.
+
+        Returns:
+            SpectralCube over the channel frequencies.
+
+        Raises:
+            FileNotFoundError: If model image not found.
+        """
+        validate_file_exists(image_path)
+        image = load_model_image(image_path)
+        return SpectralCube(
+            image, self._channel_frequencies(image.ref_freq_hz),
+            self.spectral_index, cache_planes,
+        )
+
     def scale_image_for_frequency(
         self,
         image_path: str,
         reference_frequency_ghz: float,
         target_frequency_ghz: float,
+        output_path: Optional[str] = None,
     ) -> str:
         """
         Scale image flux density to target frequency using spectral index.
 
+        Writes S(nu2) = S(nu1) (nu2 / nu1)^alpha as a new model image at the
+        target frequency; :meth:`spectral_cube` gives every channel without
+        writing files.
+
         Args:
             image_path: Path to input image.
             reference_frequency_ghz: Reference frequency in GHz.
             target_frequency_ghz: Target frequency in GHz.
+            output_path: Path of the scaled image; defaults to the input name
+                with ``_<target>GHz`` appended.
 
         Returns:
             Path to scaled image.
 
         Raises:
-            ImportError: If CASA toolkit not available.
+            FileNotFoundError: If model image not found.
+            ValueError: If a frequency is not positive.
         """
         validate_file_exists(image_path)
+        if reference_frequency_ghz <= 0 or target_frequency_ghz <= 0:
+            raise ValueError(
+                f"Frequencies must be positive, got {reference_frequency_ghz}GHz "
+                f"and {target_frequency_ghz}GHz"
+            )
 
         logger.debug(
-            f"Scaling image from {reference_frequency_ghz}GHz to {target_frequency_ghz}GHz"
+            f"Scaling image from {reference_frequency_ghz}GHz "
+            f"to {target_frequency_ghz}GHz"
+        )
+
+        image = load_model_image(image_path)
+        reference = ModelImage(
+            image.data, image.cell_rad, image.ref_ra_rad, image.ref_dec_rad,
+            reference_frequency_ghz * 1e9, image.ref_pixel,
+        )
+        cube = SpectralCube(
+            reference, np.array([target_frequency_ghz * 1e9]), self.spectral_index,
+            cache_planes=0,
         )
 
-        try:
-            from casac import casatools  # type: ignore
-        except ImportError:
-            raise ImportError("CASA toolkit not available")
+        if output_path is None:
+            path = Path(image_path)
+            output_path = str(
+                path.with_name(f"{path.stem}_{target_frequency_ghz:g}GHz{path.suffix}")
+            )
+        return cube[0].save(output_path)
+
+
+class _ChunkTask(NamedTuple):
+    """A block of integration times predicted by one pool worker."""
+
+    simulator: VisibilitySimulator
+    factory: ModelFactory
+    sky_spec: Dict[str, ArraySpec]
+    antenna_spec: Dict[str, ArraySpec]
+    observatory: str
+    coordsys: str
+    reference_xyz: np.ndarray
+    ref_dec_rad: float
+    ref_freq_hz: float
+    times: np.ndarray
+    row_start: int
+    output_paths: List[str]
+    noise_jy: float
+    noise_seeds: List[np.random.SeedSequence]
+    chunk_seconds: float
 
-        # TODO: Implement actual image scaling using power law
-        # S(ν₂) = S(ν₁) × (ν₂/ν₁)^α
 
-        return image_path
+# Shared inputs attached by this worker process, keyed by block names
+_worker_inputs: Dict[
+    Tuple[str, ...],
+    Tuple[AntennaConfig, PredictFunction, List[shared_memory.SharedMemory]],
+] = {}
+
+
+def _release_worker_inputs() -> None:
+    """
+    Drop the inputs attached by this worker and close their shared blocks.
+
+    The views into the blocks (antenna table, predict closure) are released
+    first, since a block cannot be closed while arrays still export it.
+    """
+    blocks = [block for entry in _worker_inputs.values() for block in entry[2]]
+    _worker_inputs.clear()
+    for block in blocks:
+        block.close()
+
+
+def _simulate_task(task: _ChunkTask) -> None:
+    """
+    Predict one block of times in a pool worker and write it in place.
+
+    The shared inputs are attached, and the predict built, once per worker
+    process and reused by its later tasks.
+    """
+    key = tuple(spec[0] for spec in {**task.sky_spec, **task.antenna_spec}.values())
+    if key not in _worker_inputs:
+        _release_worker_inputs()
+        sky_arrays, sky_blocks = attach_shared_arrays(task.sky_spec)
+        antenna_arrays, antenna_blocks = attach_shared_arrays(task.antenna_spec)
+        antennas = AntennaConfig.from_records(
+            antenna_arrays["antennas"], task.observatory, task.coordsys,
+            task.reference_xyz,
+        )
+        _worker_inputs[key] = (
+            antennas, task.factory(sky_arrays), sky_blocks + antenna_blocks
+        )
+    antennas, predict, _ = _worker_inputs[key]
+
+    outputs = [VisibilityStore(path).columns("r+") for path in task.output_paths]
+    chunks = task.simulator._iter_chunks(
+        predict, task.ref_dec_rad, task.ref_freq_hz, task.times,
+        task.noise_jy, task.chunk_seconds, antennas=antennas,
+        noise_seeds=task.noise_seeds,
+    )
+    r0 = task.row_start
+    for chunk in chunks:
+        rows = slice(r0, r0 + chunk.time.shape[0])
+        r0 = rows.stop
+        for columns, model_vis in zip(outputs, chunk.vis):
+            columns["time"][rows] = chunk.time
+            columns["antenna1"][rows] = chunk.antenna1
+            columns["antenna2"][rows] = chunk.antenna2
+            columns["uvw"][rows] = chunk.uvw
+            columns["data"][rows] = model_vis
+            columns["flag"][rows] = chunk.flags
+    for columns in outputs:
+        for column in columns.values():
+            if isinstance(column, np.memmap):
+                column.flush()
@@ -6,6 +6,9 @@ a single, tested module. Previously these were duplicated across multiple files.
 """
 
 from typing import Tuple
+
+import numpy as np
+
 from sos.constants import (
     RA_ARCSEC_PER_SECOND,
     ARCSEC_PER_RADIAN,
@@ -183,3 +186,36 @@ def get_ra_dec_tuple(ra_string: str, dec_string: str) -> Tuple[float, float]:
     ra_hours = parse_ra_hms(ra_string)
     dec_degrees = parse_dec_dms(dec_string)
     return (ra_hours, dec_degrees)
+
+
+def radec_to_lm(
+    ra_rad: np.ndarray,
+    dec_rad: np.ndarray,
+    ref_ra_rad: float,
+    ref_dec_rad: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Project sky positions onto direction cosines about a reference direction.
+
+    Uses the orthographic (SIN) projection of CASA images and interferometric
+    phase centres.
+
+    Args:
+        ra_rad: Right Ascension in radians (scalar or array).
+        dec_rad: Declination in radians (scalar or array).
+        ref_ra_rad: Reference (phase centre) Right Ascension in radians.
+        ref_dec_rad: Reference (phase centre) Declination in radians.
+
+    Returns:
+        Tuple of (l, m) direction cosines; l increases towards East.
+    """
+    ra_rad = np.asarray(ra_rad, dtype=np.float64)
+    dec_rad = np.asarray(dec_rad, dtype=np.float64)
+    delta_ra = ra_rad - ref_ra_rad
+
+    l_rad = np.cos(dec_rad) * np.sin(delta_ra)
+    m_rad = (
+        np.sin(dec_rad) * np.cos(ref_dec_rad) -
+        np.cos(dec_rad) * np.sin(ref_dec_rad) * np.cos(delta_ra)
+    )
+    return l_rad, m_rad
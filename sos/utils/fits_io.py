@@ -0,0 +1,185 @@
+"""
+Minimal FITS image I/O for SOS (SKA Observation Simulator).
+
+Writes and reads single-HDU FITS images through ``numpy.memmap`` so that
+large model images can be filled tile by tile and read back without
+copying. Only the subset of the FITS standard needed for model images is
+supported (primary HDU, floating point data).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Literal, Tuple, Union
+
+import numpy as np
+
+from sos.constants import FITS_BLOCK_SIZE
+
+_CARD_LENGTH = 80
+
+_BITPIX_DTYPES: Dict[int, np.dtype] = {
+    -32: np.dtype(">f4"),
+    -64: np.dtype(">f8"),
+}
+
+
+def _format_value(value: Any) -> str:
+    """Format a header value in FITS fixed format."""
+    if isinstance(value, bool):
+        return f"{'T' if value else 'F':>20}"
+    if isinstance(value, (int, np.integer)):
+        return f"{int(value):>20d}"
+    if isinstance(value, (float, np.floating)):
+        return f"{float(value):>20.13G}"
+    text = str(value).replace("'", "''")
+    return f"'{text:<8}'"
+
+
+def _parse_value(text: str) -> Any:
+    """Parse the value field of a header card."""
+    text = text.strip()
+    if text.startswith("'"):
+        end = text.find("'", 1)
+        while end != -1 and text[end + 1:end + 2] == "'":
+            end = text.find("'", end + 2)
+        return text[1:end].replace("''", "'").rstrip()
+
+    text = text.split("/", 1)[0].strip()
+    if text in ("T", "F"):
+        return text == "T"
+    try:
+        return int(text)
+    except ValueError:
+        return float(text.replace("D", "E"))
+
+
+def _padded_size(n_bytes: int) -> int:
+    """Round a byte count up to a whole number of FITS blocks."""
+    return -(-n_bytes // FITS_BLOCK_SIZE) * FITS_BLOCK_SIZE
+
+
+def build_header(
+    shape: Tuple[int, ...], dtype: np.dtype, keywords: Dict[str, Any]
+) -> bytes:
+    """
+    Build a primary FITS header for an image.
+
+    Args:
+        shape: Array shape in NumPy (C) order.
+        dtype: Data type (float32 or float64).
+        keywords: Additional keywords in insertion order.
+
+    Returns:
+        Header bytes padded to a multiple of the FITS block size.
+
+    Raises:
+        ValueError: If the data type is not supported.
+    """
+    bitpix = {np.dtype(np.float32): -32, np.dtype(np.float64): -64}.get(
+        np.dtype(dtype).newbyteorder("=")
+    )
+    if bitpix is None:
+        raise ValueError(f"Unsupported FITS data type: {dtype}")
+
+    cards = [("SIMPLE", True), ("BITPIX", bitpix), ("NAXIS", len(shape))]
+    cards += [(f"NAXIS{i + 1}", n) for i, n in enumerate(reversed(shape))]
+    cards += list(keywords.items())
+
+    text = "".join(
+        f"{key.upper():<8}= {_format_value(value)}".ljust(_CARD_LENGTH)[:_CARD_LENGTH]
+        for key, value in cards
+    )
+    text += "END".ljust(_CARD_LENGTH)
+    return text.encode("ascii").ljust(_padded_size(len(text)), b" ")
+
+
+def read_header(path: Union[str, Path]) -> Tuple[Dict[str, Any], int]:
+    """
+    Read the primary header of a FITS file.
+
+    Args:
+        path: Path to FITS file.
+
+    Returns:
+        Tuple of (keyword dictionary, header size in bytes).
+
+    Raises:
+        ValueError: If the file is not a valid FITS file.
+    """
+    header: Dict[str, Any] = {}
+    offset = 0
+
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(FITS_BLOCK_SIZE)
+            if len(block) < FITS_BLOCK_SIZE:
+                raise ValueError(f"Truncated FITS header in {path}")
+            offset += FITS_BLOCK_SIZE
+
+            for i in range(0, FITS_BLOCK_SIZE, _CARD_LENGTH):
+                card = block[i:i + _CARD_LENGTH].decode("ascii")
+                key = card[:8].strip()
+                if key == "END":
+                    if header.get("SIMPLE") is not True:
+                        raise ValueError(f"Not a FITS file: {path}")
+                    return header, offset
+                if card[8:10] == "= ":
+                    header[key] = _parse_value(card[10:])
+
+
+def create_fits_memmap(
+    path: Union[str, Path],
+    shape: Tuple[int, ...],
+    keywords: Dict[str, Any],
+    dtype: type = np.float32,
+) -> np.memmap:
+    """
+    Create a zero-filled FITS image and map its data section for writing.
+
+    The file is sized up front (sparse on most filesystems), so memory use
+    while filling it is limited to the pages being written.
+
+    Args:
+        path: Output file path.
+        shape: Array shape in NumPy (C) order.
+        keywords: Additional header keywords.
+        dtype: Data type (float32 or float64).
+
+    Returns:
+        Writable big-endian memmap of the data section.
+    """
+    header = build_header(shape, np.dtype(dtype), keywords)
+    data_dtype = np.dtype(dtype).newbyteorder(">")
+    data_bytes = int(np.prod(shape)) * data_dtype.itemsize
+
+    with open(path, "wb") as f:
+        f.write(header)
+        f.truncate(len(header) + _padded_size(data_bytes))
+
+    return np.memmap(path, dtype=data_dtype, mode="r+", offset=len(header), shape=shape)
+
+
+def open_fits_memmap(
+    path: Union[str, Path],
+    mode: Literal["r", "r+", "c"] = "r",
+) -> Tuple[np.memmap, Dict[str, Any]]:
+    """
+    Map the data section of a FITS image without reading it into memory.
+
+    Args:
+        path: Path to FITS file.
+        mode: Memmap mode ("r" read-only, "r+" read-write, "c" copy-on-write).
+
+    Returns:
+        Tuple of (memmap data in NumPy order, header dictionary).
+
+    Raises:
+        ValueError: If the data type is not supported.
+    """
+    header, offset = read_header(path)
+    dtype = _BITPIX_DTYPES.get(header["BITPIX"])
+    if dtype is None:
+        raise ValueError(f"Unsupported BITPIX {header['BITPIX']} in {path}")
+
+    shape = tuple(header[f"NAXIS{i}"] for i in range(header["NAXIS"], 0, -1))
+    data = np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=shape)
+    return data, header
@@ -3,6 +3,23 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path_factory, monkeypatch):
+    """
+    Redirect the antenna and distance caches to a fresh temporary home.
+
+    ANTENNA_CACHE_DIR and DISTANCE_TABLE_CACHE_DIR live under ``~/.cache/sos``
+    and are expanded at call time, so each test starts with empty caches and
+    never writes into the real home directory.
+    """
+    home = tmp_path_factory.mktemp("home")
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("USERPROFILE", str(home))
+    return home / ".cache" / "sos"
@@ -0,0 +1,123 @@
+"""
+Unit tests for telescope antenna configuration parsing.
+"""
+
+import pytest
+from pathlib import Path
+
+import numpy as np
+
+from sos.core.antenna_config import read_antenna_config
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class TestReadAntennaConfig:
+    """Test .cfg antenna table parsing."""
+
+    def test_reads_ska_mid197(self):
+        """Test all antennas and header fields are read."""
+        config = read_antenna_config(PROJECT_ROOT / "ska_mid197_new.cfg")
+        assert config.n_antennas == 197
+        assert config.n_baselines == 197 * 196 // 2
+        assert config.observatory == "SKA_Mid"
+        assert config.names[0] == "SKA001"
+        assert config.xyz.shape == (197, 3)
+
+    def test_meerkat_dish_diameters(self):
+        """Test MeerKAT dishes keep their 13.5 m diameter."""
+        config = read_antenna_config(PROJECT_ROOT / "ska_mid197_new.cfg")
+        meerkat = np.array([name.startswith("M") for name in config.names])
+        assert np.all(config.diameters[meerkat] == 13.5)
+        assert np.all(config.diameters[~meerkat] == 15.0)
+
+    def test_array_location(self):
+        """Test array centroid is near the MeerKAT site (21.4E, -30.7)."""
+        config = read_antenna_config(PROJECT_ROOT / "ska_mid133.cfg")
+        assert np.degrees(config.longitude_rad) == pytest.approx(21.4, abs=0.2)
+        assert np.degrees(config.latitude_rad) == pytest.approx(-30.6, abs=0.3)
+
+    def test_malformed_row_raises_error(self, tmp_path):
+        """Test rows with too few columns raise ValueError."""
+        cfg = tmp_path / "bad.cfg"
+        cfg.write_text("# observatory=TEST\n1.0 2.0\n")
+        with pytest.raises(ValueError):
+            read_antenna_config(cfg)
+
+    def test_unsupported_coordsys_raises_error(self, tmp_path):
+        """Test non-XYZ coordinate systems are rejected."""
+        cfg = tmp_path / "local.cfg"
+        cfg.write_text("# coordsys=LOC\n0.0 0.0 0.0 15.0 A1\n")
+        with pytest.raises(ValueError):
+            read_antenna_config(cfg)
+
+
+class TestCompiledAntennaCache:
+    """Test the compiled .npy antenna table cache."""
+
+    def test_cached_table_matches_parse(self, tmp_path):
+        """Test a second load memory-maps the compiled records."""
+        cfg = PROJECT_ROOT / "ska_mid197_new.cfg"
+        parsed = read_antenna_config(cfg, cache_dir=None)
+        first = read_antenna_config(cfg, cache_dir=tmp_path)
+        cached = read_antenna_config(cfg, cache_dir=tmp_path)
+
+        assert len(list(tmp_path.glob("antennas_*.npy"))) == 1
+        assert not cached.xyz.flags.writeable
+        for config in (first, cached):
+            assert config.names == parsed.names
+            assert config.observatory == parsed.observatory
+            assert np.array_equal(config.xyz, parsed.xyz)
+            assert np.array_equal(config.diameters, parsed.diameters)
+
+    def test_edited_file_is_recompiled(self, tmp_path):
+        """Test the cache is keyed by content, not by path."""
+        cfg = tmp_path / "array.cfg"
+        cfg.write_text("# observatory=TEST\n0.0 0.0 0.0 15.0 A1\n1.0 0.0 0.0 15.0 A2\n")
+        assert read_antenna_config(cfg, cache_dir=tmp_path / "cache").n_antennas == 2
+
+        cfg.write_text("# observatory=TEST\n0.0 0.0 0.0 15.0 A1\n")
+        assert read_antenna_config(cfg, cache_dir=tmp_path / "cache").n_antennas == 1
+        assert len(list((tmp_path / "cache").glob("antennas_*.npy"))) == 2
+
+
+class TestSubArrays:
+    """Test sub-arrays derived from an antenna table."""
+
+    def test_subset_by_name_and_predicate(self):
+        """Test station names and record predicates select the same dishes."""
+        config = read_antenna_config(PROJECT_ROOT / "ska_mid197_new.cfg")
+        meerkat = config.subset(lambda a: a["diameter"] == 13.5)
+        by_name = config.subset([name for name in config.names if name.startswith("M")])
+
+        assert meerkat.n_antennas == 64
+        assert meerkat.names == by_name.names
+        assert np.all(meerkat.diameters == 13.5)
+        assert np.array_equal(
+            meerkat.xyz, config.xyz[config.station_indices(meerkat.names)]
+        )
+
+    def test_subset_keeps_parent_reference(self):
+        """Test a sub-array keeps the parent's longitude and latitude."""
+        config = read_antenna_config(PROJECT_ROOT / "ska_mid133.cfg")
+        core = config.subset(range(10))
+        assert core.longitude_rad == config.longitude_rad
+        assert core.latitude_rad == config.latitude_rad
+
+    def test_subset_by_boolean_mask(self):
+        """Test a boolean mask selects its True stations, not indices 0 and 1."""
+        config = read_antenna_config(PROJECT_ROOT / "ska_mid197_new.cfg")
+        mask = config.diameters == 13.5
+        assert np.array_equal(config.station_indices(mask), np.flatnonzero(mask))
+        with pytest.raises(ValueError, match="shape"):
+            config.station_indices(mask[:-1])
+        with pytest.raises(ValueError, match="NumPy array"):
+            config.station_indices(mask.tolist())
+
+    def test_invalid_subsets_raise(self):
+        """Test unknown stations and single-dish sub-arrays are rejected."""
+        config = read_antenna_config(PROJECT_ROOT / "ska_mid133.cfg")
+        with pytest.raises(ValueError, match="Unknown station"):
+            config.subset(["SKA001", "M999"])
+        with pytest.raises(ValueError, match="at least 2"):
+            config.subset(["SKA001"])
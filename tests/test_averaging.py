@@ -0,0 +1,198 @@
+"""
+Unit tests for baseline-dependent averaging.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sos.core.averaging import (
+    AveragingSpec,
+    BaselineAverager,
+    averaged_stores,
+    smearing_limits,
+)
+from sos.core.baselines import BaselineIndex
+from sos.core.sky_model import ComponentList, GaussianComponent
+from sos.core.vis_store import VisibilityStore
+from sos.core.visibility_sim import VisibilitySimulator
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _stream(n_times, n_baselines, n_channels, gap_after=None, seed=3):
+    """Random time-major rows with a few flags and an optional scan gap."""
+    rng = np.random.default_rng(seed)
+    times = np.arange(n_times, dtype=np.float64)
+    if gap_after is not None:
+        times[gap_after:] += 100.0
+    n_rows = n_times * n_baselines
+    vis = (rng.normal(size=(n_rows, n_channels, 2)) +
+           1j * rng.normal(size=(n_rows, n_channels, 2))).astype(np.complex64)
+    flags = rng.random((n_rows, n_channels, 2)) < 0.1
+    return (
+        np.repeat(times, n_baselines), rng.normal(size=(n_rows, 3)) * 100.0, vis, flags
+    )
+
+
+def _collect(averager, chunks):
+    """Concatenate the rows of each group over all chunks and the flush."""
+    rows = {}
+    for output in [averager.process(*chunk) for chunk in chunks] + [averager.flush()]:
+        for g, chunk in output:
+            rows.setdefault(g, []).append(chunk)
+    return {
+        g: {
+            field: np.concatenate([getattr(c, field) for c in chunks])
+            for field in chunks[0]._fields
+        }
+        for g, chunks in rows.items()
+    }
+
+
+@pytest.fixture
+def baselines():
+    """Four baselines from 10 m to 100 km."""
+    return BaselineIndex(
+        np.array([0, 0, 1, 2]), np.array([1, 2, 3, 3]),
+        np.array([10.0, 1.0e3, 1.0e4, 1.0e5]),
+    )
+
+
+class TestSmearingLimits:
+    """Test averaging limits from the smearing tolerance."""
+
+    def test_limits_scale_inversely_with_length(self):
+        """Test time and bandwidth limits halve when the baseline doubles."""
+        time, bandwidth = smearing_limits(
+            np.array([0.0, 500.0, 1000.0]), 1e9, 1e-3, 0.01
+        )
+        assert np.isinf(time[0]) and np.isinf(bandwidth[0])
+        assert time[1] == pytest.approx(2 * time[2])
+        assert bandwidth[1] == pytest.approx(2 * bandwidth[2])
+
+    def test_limit_meets_tolerance(self):
+        """Test a fringe averaged over the limit loses the tolerated amplitude."""
+        time, _ = smearing_limits(np.array([1000.0]), 1e9, 1e-3, 0.01)
+        # Fringe of a source at the field radius drifting at the largest rate
+        rate = 2 * np.pi * 1e-3 * 1000.0 * 1e9 / 299792458.0 * 7.2921150e-5
+        t = np.linspace(0.0, time[0], 2001)
+        loss = 1.0 - np.abs(np.exp(1j * rate * t).mean())
+        assert loss == pytest.approx(0.01, rel=0.05)
+
+
+class TestBaselineAverager:
+    """Test grouping and streaming averaging."""
+
+    def test_factors_are_capped_powers_of_two(self, baselines):
+        """Test shorter baselines average more, within the factor limits."""
+        averager = BaselineAverager(
+            baselines, 1e9 + np.arange(16) * 1e5, 1.0, 2,
+            AveragingSpec(
+                field_radius_arcmin=5.0, max_time_factor=64, max_channel_factor=8
+            ),
+        )
+        assert averager.time_factors[0] == 64
+        assert averager.channel_factors[0] == 8
+        assert np.all(np.diff(averager.time_factors) <= 0)
+        assert np.all(np.log2(averager.time_factors) % 1 == 0)
+        assert averager.compression > 1.0
+        grouped = np.concatenate([g.baselines for g in averager.groups])
+        assert sorted(grouped.tolist()) == [0, 1, 2, 3]
+
+    def test_chunking_does_not_change_result(self, baselines):
+        """Test chunk boundaries and scan gaps give the same windows."""
+        spec = AveragingSpec(
+            field_radius_arcmin=60.0, max_time_factor=8, max_channel_factor=2
+        )
+        frequencies = 1e9 + np.arange(4) * 1e6
+        time, uvw, vis, flags = _stream(37, 4, 4, gap_after=20)
+
+        whole = _collect(
+            BaselineAverager(baselines, frequencies, 1.0, 2, spec),
+            [(time, uvw, vis, flags)],
+        )
+        pieces = []
+        for t0, t1 in ((0, 3), (3, 19), (19, 30), (30, 37)):
+            rows = slice(t0 * 4, t1 * 4)
+            pieces.append((time[rows], uvw[rows], vis[rows], flags[rows]))
+        chunked = _collect(
+            BaselineAverager(baselines, frequencies, 1.0, 2, spec), pieces
+        )
+
+        assert whole.keys() == chunked.keys()
+        for g in whole:
+            for field in ("time", "baseline", "uvw", "vis", "weight", "exposure"):
+                assert np.allclose(whole[g][field], chunked[g][field])
+            # No window spans the gap between t=19 and t=120
+            assert not np.any((whole[g]["time"] > 19.0) & (whole[g]["time"] < 120.0))
+
+    def test_weighted_mean_of_unflagged_samples(self, baselines):
+        """Test averaged rows are the mean of unflagged samples with their count."""
+        spec = AveragingSpec(
+            field_radius_arcmin=60.0, max_time_factor=4, max_channel_factor=1
+        )
+        averager = BaselineAverager(baselines, [1e9], 1.0, 2, spec)
+        time, uvw, vis, flags = _stream(8, 4, 1)
+        rows = _collect(averager, [(time, uvw, vis, flags)])
+
+        g, group = next(
+            (g, group) for g, group in enumerate(averager.groups)
+            if group.time_factor == 4
+        )
+        b = group.baselines[0]
+        series, flagged = vis[b::4][:4], flags[b::4][:4]
+        weight = (~flagged).sum(axis=0)
+        expected = np.where(flagged, 0, series).sum(axis=0) / np.maximum(weight, 1)
+        first = rows[g]["baseline"] == b
+        assert np.allclose(rows[g]["vis"][first][0], expected, atol=1e-6)
+        assert np.array_equal(rows[g]["weight"][first][0], weight)
+        assert rows[g]["exposure"][first][0] == (~flagged).any(axis=(1, 2)).sum()
+        assert rows[g]["time"][first][0] == pytest.approx(1.5)
+
+
+class TestAveragedSimulation:
+    """Test averaging as a simulation output stage."""
+
+    def test_simulator_writes_group_stores(self, tmp_path):
+        """Test averaged outputs keep every baseline with fewer visibilities."""
+        config = str(PROJECT_ROOT / "ska_mid133.cfg")
+        sky = ComponentList(
+            [GaussianComponent(1.0, 0.0, 0.0, 0.0)], 1.047, -0.349, 9.2e9
+        )
+        run = dict(scan_duration_sec=20.0, chunk_seconds=7.0)
+        full = VisibilityStore(VisibilitySimulator(
+            config, channels=4, frequency_resolution_mhz=1.0
+        ).simulate_components(sky, str(tmp_path / "full"), **run))
+        out = VisibilitySimulator(
+            config, channels=4, frequency_resolution_mhz=1.0, averaging=AveragingSpec()
+        ).simulate_components(sky, str(tmp_path / "avg"), **run)
+
+        stores = averaged_stores(out)
+        assert sum(store.n_baselines for store in stores) == full.n_baselines
+        n_samples = sum(store.n_rows * store.n_channels for store in stores)
+        assert n_samples < full.n_rows * 4
+        for store in stores:
+            t, f = store.metadata["time_factor"], store.metadata["channel_factor"]
+            assert store.averaged
+            assert store.n_rows == -(-20 // t) * store.n_baselines
+
+            # Compare the first window with a mean over the full-rate rows
+            baselines = [
+                full.baseline_index(a1, a2)
+                for a1, a2 in zip(store.baselines.antenna1, store.baselines.antenna2)
+            ]
+            rows = full.read_baselines(baselines, ("data", "flag"))
+            data = np.where(rows["flag"], 0, rows["data"])[:t]
+            weight = (~rows["flag"][:t]).sum(axis=0)
+            data = data.sum(axis=0).reshape(len(baselines), -1, f, 2).sum(axis=2)
+            weight = weight.reshape(len(baselines), -1, f, 2).sum(axis=2)
+            first = slice(0, store.n_baselines)
+            assert np.array_equal(store.column("weight")[first], weight)
+            assert np.allclose(
+                store.column("data")[first], data / np.maximum(weight, 1), atol=1e-6
+            )
+
+        with pytest.raises(ValueError, match="workers"):
+            VisibilitySimulator(config, workers=2, averaging=AveragingSpec())
@@ -0,0 +1,66 @@
+"""
+Unit tests for the baseline index and selection.
+"""
+
+import numpy as np
+import pytest
+
+from sos.core.baselines import BaselineIndex, BaselineSelection
+from sos.core.uvw import baseline_pairs
+
+
+@pytest.fixture
+def index():
+    """Index of five antennas on a line at 0, 1, 3, 7 and 15 m."""
+    xyz = np.zeros((5, 3))
+    xyz[:, 0] = [0.0, 1.0, 3.0, 7.0, 15.0]
+    antenna1, antenna2 = baseline_pairs(5)
+    return BaselineIndex.from_antennas(
+        xyz, antenna1, antenna2, ["A0", "A1", "A2", "A3", "A4"]
+    )
+
+
+class TestBaselineIndex:
+    """Test length and antenna queries against brute-force scans."""
+
+    def test_by_length_matches_scan(self, index):
+        """Test a length range equals filtering all baseline lengths."""
+        rows = index.by_length(2.0, 7.0)
+        expected = np.flatnonzero((index.lengths_m >= 2.0) & (index.lengths_m <= 7.0))
+        assert sorted(rows.tolist()) == expected.tolist()
+        assert np.all(np.diff(index.lengths_m[rows]) >= 0)
+
+    def test_by_antenna_and_pair(self, index):
+        """Test baselines to an antenna by index and by station name."""
+        rows = index.by_antenna("A2")
+        expected = np.flatnonzero((index.antenna1 == 2) | (index.antenna2 == 2))
+        assert rows.tolist() == expected.tolist()
+        assert index.pair(3, 1) == index.pair("A1", "A3")
+        row = index.pair(3, 1)
+        assert (index.antenna1[row], index.antenna2[row]) == (1, 3)
+        with pytest.raises(KeyError):
+            index.by_antenna("SKA001")
+
+    def test_select_combines_criteria(self, index):
+        """Test a selection keeps short baselines to the given antennas."""
+        rows = index.select(BaselineSelection(max_length_m=6.0, antennas=["A0", 4]))
+        expected = np.flatnonzero(
+            (index.lengths_m <= 6.0) &
+            np.isin(index.antenna1, [0, 4]) |
+            (index.lengths_m <= 6.0) & np.isin(index.antenna2, [0, 4])
+        )
+        assert rows.tolist() == expected.tolist()
+        assert index.select(None).tolist() == list(range(10))
+
+    def test_array_round_trip(self, index):
+        """Test an index rebuilt from its arrays answers the same queries."""
+        rebuilt = BaselineIndex.from_arrays(index.to_arrays())
+        assert rebuilt.names == index.names
+        expected = index.by_length(1.5, 8.0).tolist()
+        assert rebuilt.by_length(1.5, 8.0).tolist() == expected
+        assert rebuilt.by_antenna(1).tolist() == index.by_antenna(1).tolist()
+
+    def test_length_query_needs_lengths(self):
+        """Test length queries on an index without lengths raise ValueError."""
+        with pytest.raises(ValueError):
+            BaselineIndex(*baseline_pairs(3)).by_length(max_length_m=1.0)
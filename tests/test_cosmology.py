@@ -2,6 +2,7 @@
 Unit tests for cosmology calculator.
 """
 
+import numpy as np
 import pytest
 from sos.core.image_maker import CosmologyCalculator
 
@@ -49,3 +50,39 @@ class TestCosmologyCalculator:
         flux_far = cosmology.calculate_flux_density(1.0, 0.05, 0.5)
         # Flux should decrease with increasing distance (higher redshift)
         assert flux_near > flux_far
+
+
+class TestVectorizedCosmology:
+    """Test array versions of the cosmology calculations."""
+
+    @pytest.fixture
+    def cosmology(self):
+        """Create CosmologyCalculator instance."""
+        return CosmologyCalculator()
+
+    def test_distance_array_matches_scalar(self, cosmology):
+        """Test array distances agree with the scalar method."""
+        z = np.linspace(0.0, 2.0, 101)
+        distances = cosmology.angular_diameter_distance_array(z)
+        assert distances.shape == z.shape
+        assert distances[0] == 0.0
+        assert distances[37] == pytest.approx(
+            cosmology.angular_diameter_distance(z[37])
+        )
+
+    def test_flux_density_broadcasts(self, cosmology):
+        """Test flux densities broadcast over redshift and spectral index."""
+        z = np.array([0.05, 0.1, 0.5])
+        alpha = np.array([[-1.0], [-1.6]])
+        flux = cosmology.flux_density_array(0.6, 0.05, z, alpha)
+        assert flux.shape == (2, 3)
+        assert flux[:, 0] == pytest.approx([0.6, 0.6])
+        assert flux[1, 2] == pytest.approx(
+            cosmology.calculate_flux_density(0.6, 0.05, 0.5, -1.6)
+        )
+
+    def test_angular_size_array_zero_redshift(self, cosmology):
+        """Test zero redshift entries give zero angular size."""
+        sizes = cosmology.angular_size_array([0.5, 1.0], [0.0, 0.1])
+        assert sizes[0] == 0.0
+        assert sizes[1] == pytest.approx(cosmology.calculate_angular_size(1.0, 0.1))
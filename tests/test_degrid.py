@@ -0,0 +1,132 @@
+"""
+Unit tests for the FFT degridding predict.
+"""
+
+import pytest
+
+import numpy as np
+
+from sos.core.degrid import (
+    FFTDegridder,
+    kaiser_bessel,
+    kaiser_bessel_beta,
+    kaiser_bessel_taper,
+    kernel_indices,
+    kernel_table,
+)
+from sos.core.predict import predict_dft
+from sos.core.rasterize import render_components
+from sos.core.sky_model import GaussianComponent, ModelImage
+
+
+@pytest.fixture
+def extended_image():
+    """Render a few Gaussians and a point source, offset from the centre."""
+    cell_rad = 2e-6
+    components = [
+        GaussianComponent(1.0, 0.0, 0.0, 1.2e-5, 1.2e-5, 0.0),
+        GaussianComponent(0.5, 4e-5, -2e-5, 1.6e-5, 0.8e-5, 0.6),
+        GaussianComponent(0.2, -3e-5, 5e-5, 0.0, 0.0, 0.0),
+    ]
+    data = render_components(components, (96, 128), cell_rad, dtype=np.float64)
+    return ModelImage(data, cell_rad, 0.0, -0.3, 1.0e9)
+
+
+def _uvw(n, scale, seed=0):
+    uvw = np.random.default_rng(seed).normal(size=(n, 3)) * scale
+    uvw[:, 2] = 0.0
+    return uvw
+
+
+class TestKaiserBessel:
+    """Test the degridding kernel and its grid correction."""
+
+    def test_kernel_support(self):
+        """Test the kernel peaks at the centre and vanishes outside its support."""
+        x = np.array([-4.5, -4.0, 0.0, 2.0, 4.5])
+        values = kaiser_bessel(x, 8, 10.0)
+        assert values[2] == pytest.approx(1.0)
+        assert values[0] == 0.0 and values[-1] == 0.0
+        assert 0.0 < values[3] < 1.0
+
+    def test_taper_is_symmetric_and_decreasing(self):
+        """Test the image-plane taper falls off from the grid centre."""
+        beta = kaiser_bessel_beta(8, 2.0)
+        taper = kaiser_bessel_taper(128, np.array([-20.0, 0.0, 20.0, 32.0]), 8, beta)
+        assert taper[0] == pytest.approx(taper[2])
+        assert taper[1] > taper[2] > taper[3] > 0.0
+
+    def test_tabulated_kernel_matches_evaluated(self):
+        """Test table-interpolated kernel weights match direct evaluation."""
+        beta = kaiser_bessel_beta(8, 2.0)
+        positions = np.random.default_rng(4).uniform(-50.0, 50.0, 500)
+        cells, weights = kernel_indices(positions, 128, 8, beta)
+        table_cells, table_weights = kernel_indices(
+            positions, 128, 8, beta, kernel_table(8, beta, 512)
+        )
+        assert np.array_equal(cells, table_cells)
+        assert np.allclose(weights, table_weights, atol=1e-5)
+
+
+class TestFFTDegridder:
+    """Test FFT degridding against the direct Fourier sum."""
+
+    def test_matches_dft(self, extended_image):
+        """Test degridded visibilities match the DFT over image pixels."""
+        uvw = _uvw(200, 2e4)
+        expected = predict_dft(uvw, *extended_image.nonzero_components())
+        vis = FFTDegridder(extended_image).predict(uvw)
+        assert np.allclose(vis, expected, atol=1e-5 * np.abs(expected).max())
+
+    def test_long_baselines_wrap_like_dft(self, extended_image):
+        """Test samples beyond the grid follow the periodic pixel spectrum."""
+        uvw = _uvw(50, 4e5, seed=1)
+        expected = predict_dft(uvw, *extended_image.nonzero_components())
+        vis = FFTDegridder(extended_image).predict(uvw)
+        assert np.allclose(vis, expected, atol=1e-4)
+
+    def test_fractional_reference_pixel(self):
+        """Test a non-integer reference pixel is applied as a phase shift."""
+        data = np.zeros((64, 64))
+        data[30, 35] = 2.0
+        image = ModelImage(data, 1e-6, 0.0, -0.3, 1.0e9, ref_pixel=(32.3, 31.6))
+        uvw = _uvw(40, 5e4, seed=2)
+        expected = predict_dft(uvw, *image.nonzero_components())
+        assert np.allclose(FFTDegridder(image).predict(uvw), expected, atol=1e-4)
+
+    def test_blocked_grid_matches_shifted_fft(self, extended_image):
+        """Test the in-place, blocked transform equals the shifted full FFT."""
+        degridder = FFTDegridder(extended_image, max_elements=1000)
+        ny, nx = extended_image.shape
+        grid_ny, grid_nx = degridder.grid_shape
+        offset_l = nx // 2 - np.arange(nx)
+        offset_m = np.arange(ny) - ny // 2
+        taper = np.outer(
+            kaiser_bessel_taper(grid_ny, offset_m, degridder.support, degridder.beta),
+            kaiser_bessel_taper(grid_nx, offset_l, degridder.support, degridder.beta),
+        )
+        padded = np.zeros(degridder.grid_shape, dtype=np.complex128)
+        padded[np.ix_(offset_m + grid_ny // 2, offset_l + grid_nx // 2)] = (
+            extended_image.data / taper
+        )
+        expected = np.fft.fftshift(np.fft.fft2(np.fft.ifftshift(padded)))
+
+        assert degridder.grid.dtype == np.complex64
+        assert np.allclose(degridder.grid, expected, atol=1e-5 * np.abs(expected).max())
+
+    def test_channel_scales(self, extended_image):
+        """Test the wideband call matches per-channel single-frequency calls."""
+        degridder = FFTDegridder(extended_image)
+        uvw_m = _uvw(30, 20.0, seed=3)
+        scales = np.array([800.0, 1000.0, 1200.0])
+        vis = degridder.predict(uvw_m, channel_scales=scales)
+        assert vis.shape == (30, 3)
+        for c, scale in enumerate(scales):
+            assert np.allclose(vis[:, c], degridder.predict(uvw_m * scale))
+
+    def test_invalid_parameters(self, extended_image):
+        """Test padding and support are validated."""
+        with pytest.raises(ValueError, match="Padding"):
+            FFTDegridder(extended_image, padding=0.5)
+        with pytest.raises(ValueError, match="support"):
+            FFTDegridder(extended_image, support=1)
@@ -0,0 +1,66 @@
+"""
+Unit tests for integrated cosmological distance tables.
+"""
+
+import pytest
+import numpy as np
+
+from sos.constants import SPEED_OF_LIGHT_KM_S
+from sos.core.distances import DistanceTable
+from sos.core.image_maker import CosmologyCalculator
+
+
+class TestDistanceTable:
+    """Test numerically integrated distances."""
+
+    def test_einstein_de_sitter_comoving_distance(self):
+        """Test against the analytic Ω_m = 1 comoving distance."""
+        table = DistanceTable(h0=70.0, omega_m=1.0, omega_lambda=0.0, cache_dir=None)
+        z = np.array([0.1, 0.5, 1.0, 3.0])
+        expected = 2.0 * SPEED_OF_LIGHT_KM_S / 70.0 * (1.0 - 1.0 / np.sqrt(1.0 + z))
+        assert np.allclose(table.comoving_distance(z), expected, rtol=1e-6)
+
+    def test_open_universe_matches_closed_form(self):
+        """Test Λ = 0 distances agree with the exact closed-form expression."""
+        table = DistanceTable(h0=67.8, omega_m=0.308, omega_lambda=0.0, cache_dir=None)
+        closed_form = CosmologyCalculator(h0=67.8, omega_m=0.308)
+        z = np.linspace(0.01, 5.0, 50)
+        assert np.allclose(
+            table.angular_diameter_distance(z),
+            closed_form.angular_diameter_distance_array(z),
+            rtol=1e-6,
+        )
+
+    def test_out_of_range_raises_error(self):
+        """Test redshifts beyond the table raise ValueError."""
+        table = DistanceTable(z_max=2.0, n_points=101, cache_dir=None)
+        with pytest.raises(ValueError):
+            table.comoving_distance([1.0, 2.5])
+
+    def test_cache_round_trip(self, tmp_path):
+        """Test tables are written once and reloaded from the cache."""
+        first = DistanceTable(w0=-0.9, wa=0.1, cache_dir=tmp_path)
+        assert first.cache_path.is_file()
+
+        second = DistanceTable(w0=-0.9, wa=0.1, cache_dir=tmp_path)
+        assert second.cache_path == first.cache_path
+        assert np.array_equal(second.comoving, first.comoving)
+
+        other = DistanceTable(w0=-1.0, cache_dir=tmp_path)
+        assert other.cache_path != first.cache_path
+
+
+class TestIntegratedCosmology:
+    """Test CosmologyCalculator with the integrated distance method."""
+
+    def test_flat_lcdm_distance(self, tmp_path):
+        """Test flat ΛCDM D_A at z = 1 is near the Planck 2015 value."""
+        cosmology = CosmologyCalculator(
+            distance_method="integrated", cache_dir=tmp_path
+        )
+        assert cosmology.angular_diameter_distance(1.0) == pytest.approx(1680, rel=0.02)
+
+    def test_dark_energy_requires_integrated_method(self):
+        """Test w0/wa cannot be combined with the closed-form method."""
+        with pytest.raises(ValueError):
+            CosmologyCalculator(w0=-0.9)
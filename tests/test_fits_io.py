@@ -0,0 +1,49 @@
+"""
+Unit tests for minimal FITS I/O.
+"""
+
+import pytest
+import numpy as np
+
+from sos.constants import FITS_BLOCK_SIZE
+from sos.utils.fits_io import create_fits_memmap, open_fits_memmap, read_header
+
+
+class TestFitsIo:
+    """Test FITS header and memmap handling."""
+
+    def test_header_round_trip(self, tmp_path):
+        """Test keywords of all types survive a write/read cycle."""
+        path = tmp_path / "h.fits"
+        data = create_fits_memmap(
+            path, (3, 4),
+            {"BUNIT": "Jy/pixel", "CRVAL1": -12.5, "CRPIX1": 2, "FLAG": False},
+        )
+        del data
+
+        header, offset = read_header(path)
+        assert offset % FITS_BLOCK_SIZE == 0
+        assert header["NAXIS1"] == 4 and header["NAXIS2"] == 3
+        assert header["BUNIT"] == "Jy/pixel"
+        assert header["CRVAL1"] == -12.5
+        assert header["CRPIX1"] == 2
+        assert header["FLAG"] is False
+
+    def test_data_round_trip(self, tmp_path):
+        """Test data written through the memmap is read back unchanged."""
+        path = tmp_path / "d.fits"
+        data = create_fits_memmap(path, (5, 7), {}, dtype=np.float64)
+        data[:] = np.arange(35.0).reshape(5, 7)
+        data.flush()
+
+        loaded, header = open_fits_memmap(path)
+        assert header["BITPIX"] == -64
+        assert np.array_equal(loaded, np.arange(35.0).reshape(5, 7))
+        assert path.stat().st_size % FITS_BLOCK_SIZE == 0
+
+    def test_not_fits_raises_error(self, tmp_path):
+        """Test a non-FITS file is rejected."""
+        path = tmp_path / "bad.fits"
+        path.write_bytes(b"NOTFITS".ljust(FITS_BLOCK_SIZE))
+        with pytest.raises(ValueError):
+            read_header(path)
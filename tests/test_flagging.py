@@ -0,0 +1,119 @@
+"""
+Unit tests for elevation and shadowing flags.
+"""
+
+import pytest
+from pathlib import Path
+
+import numpy as np
+
+from sos.core.flagging import sample_flags, shadowed_fraction, source_elevation
+from sos.core.sky_model import ComponentList, GaussianComponent
+from sos.core.uvw import baseline_pairs
+from sos.core.visibility_sim import VisibilitySimulator
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class TestSourceElevation:
+    """Test source elevation geometry."""
+
+    def test_transit_elevation(self):
+        """Test elevation at transit is 90 deg minus |latitude - declination|."""
+        latitude, dec = np.radians(-30.7), np.radians(-20.0)
+        elevation = source_elevation(np.array([0.0]), dec, latitude)
+        assert np.degrees(elevation[0]) == pytest.approx(90.0 - 10.7)
+
+    def test_elevation_decreases_away_from_transit(self):
+        """Test the source sets symmetrically about transit."""
+        elevation = source_elevation(np.array([-1.0, 0.0, 1.0]), -0.35, -0.54)
+        assert elevation[0] == pytest.approx(elevation[2])
+        assert elevation[1] > elevation[0]
+
+
+class TestShadowing:
+    """Test geometric dish shadowing."""
+
+    def test_dish_behind_is_shadowed(self):
+        """Test only the dish farther from the source is blocked."""
+        antenna_uvw = np.array([[[0.0, 0.0, 0.0], [5.0, 0.0, 20.0]]])
+        fraction = shadowed_fraction(antenna_uvw, np.array([15.0, 15.0]))
+        assert 0.0 < fraction[0, 0] < 1.0
+        assert fraction[0, 1] == 0.0
+
+    def test_coincident_projection_is_fully_blocked(self):
+        """Test a dish directly behind another is fully shadowed."""
+        antenna_uvw = np.array([[[0.0, 0.0, 0.0], [0.0, 0.0, 30.0]]])
+        fraction = shadowed_fraction(antenna_uvw, np.array([15.0, 15.0]))
+        assert fraction[0, 0] == pytest.approx(1.0)
+
+    def test_separated_dishes_are_clear(self):
+        """Test dishes farther apart than a diameter never shadow."""
+        antenna_uvw = np.array([[[0.0, 0.0, 0.0], [16.0, 0.0, 30.0]]])
+        assert not shadowed_fraction(antenna_uvw, np.array([15.0, 15.0])).any()
+
+    def test_sample_flags_per_baseline(self):
+        """Test a low source towards +x shadows the dish behind its neighbour."""
+        # Polar site: the horizon is the x-y plane and elevation equals declination
+        xyz = np.array([[0.0, 0.0, 6.4e6], [20.0, 0.0, 6.4e6], [0.0, 500.0, 6.4e6]])
+        antenna1, antenna2 = baseline_pairs(3)
+        flags = sample_flags(
+            xyz, np.full(3, 15.0), antenna1, antenna2,
+            hour_angle=np.array([0.0, np.pi / 2]), declination_rad=np.radians(5.0),
+            longitude_rad=0.0, latitude_rad=np.pi / 2,
+            elevation_limit_rad=np.radians(1.0), shadow_limit=0.001,
+        )
+        assert flags.tolist() == [[True, True, False], [False, False, False]]
+
+    def test_low_source_flags_everything(self):
+        """Test every baseline is flagged below the elevation limit."""
+        xyz = np.array([[0.0, 0.0, 6.4e6], [1000.0, 0.0, 6.4e6]])
+        antenna1, antenna2 = baseline_pairs(2)
+        flags = sample_flags(
+            xyz, np.full(2, 15.0), antenna1, antenna2, np.zeros(3), np.radians(10.0),
+            0.0, np.pi / 2, np.radians(17.0), 0.001,
+        )
+        assert flags.all()
+
+
+class TestSimulationCulling:
+    """Test flagged samples are culled in simulations."""
+
+    def test_set_source_is_fully_flagged(self, tmp_path):
+        """Test samples with the source below the limit are zero and flagged."""
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+        sky = ComponentList(
+            [GaussianComponent(1.0, 0.0, 0.0, 0.0)], 1.047, -0.349, 9.2e9
+        )
+        out = simulator.simulate_components(
+            sky, str(tmp_path / "vis"), start_time_sec=7 * 3600.0, scan_duration_sec=2.0
+        )
+        assert np.load(Path(out) / "flag.npy").all()
+        assert np.all(np.load(Path(out) / "data.npy") == 0)
+
+    def test_flagged_integrations_skip_the_catalog_dft(self):
+        """Test fully flagged integrations leave the unflagged rows unchanged."""
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+        sky = ComponentList(
+            [GaussianComponent(1.0, 2e-5, -1e-5, 0.0)], 1.047, -0.349, 9.2e9
+        )
+        chunk = next(simulator.iter_visibilities(
+            sky, num_scans=2, scan_duration_sec=2.0, scan_gap_sec=7 * 3600.0,
+            chunk_seconds=10.0,
+        ))
+        transit = next(simulator.iter_visibilities(sky, scan_duration_sec=2.0))
+
+        n_rows = transit.time.shape[0]
+        assert chunk.time.shape[0] == 2 * n_rows
+        assert chunk.flags[n_rows:].all() and not chunk.flags[:n_rows].any()
+        assert np.all(chunk.vis[n_rows:] == 0)
+        assert np.array_equal(chunk.vis[:n_rows], transit.vis)
+
+    def test_transit_is_unflagged(self, tmp_path):
+        """Test a high-elevation scan keeps every sample."""
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+        sky = ComponentList(
+            [GaussianComponent(1.0, 0.0, 0.0, 0.0)], 1.047, -0.349, 9.2e9
+        )
+        chunk = next(simulator.iter_visibilities(sky, scan_duration_sec=2.0))
+        assert not chunk.flags.any()
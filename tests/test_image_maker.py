@@ -0,0 +1,268 @@
+"""
+Unit tests for model sky rasterization and ImageMaker.
+"""
+
+import pytest
+import numpy as np
+
+from sos.constants import SOURCE_TYPE_MIXED
+from sos.core.image_maker import ImageMaker, _parse_quantity
+from sos.core.rasterize import render_components
+from sos.core.sky_model import GaussianComponent, load_model_image
+
+CELL_RAD = 1e-6
+
+
+class TestRenderComponents:
+    """Test NumPy rasterizer."""
+
+    def test_flux_is_conserved(self):
+        """Test pixel sum equals component flux for a well-sampled Gaussian."""
+        component = GaussianComponent(2.0, 0.0, 0.0, 10 * CELL_RAD)
+        image = render_components([component], (128, 128), CELL_RAD)
+        assert image.dtype == np.float32
+        assert image.sum() == pytest.approx(2.0, rel=1e-4)
+        assert np.unravel_index(np.argmax(image), image.shape) == (64, 64)
+
+    def test_position_angle_orientation(self):
+        """Test PA = 0 elongates along DEC (rows), PA = 90 deg along RA (columns)."""
+        north = GaussianComponent(1.0, 0.0, 0.0, 20 * CELL_RAD, 5 * CELL_RAD, 0.0)
+        east = GaussianComponent(1.0, 0.0, 0.0, 20 * CELL_RAD, 5 * CELL_RAD, np.pi / 2)
+        image_north = render_components([north], (96, 96), CELL_RAD)
+        image_east = render_components([east], (96, 96), CELL_RAD)
+        assert image_north[60, 48] > image_north[48, 60]
+        assert image_east[48, 60] > image_east[60, 48]
+
+    def test_offset_component_position(self):
+        """Test positive l (East) renders at lower column index."""
+        component = GaussianComponent(1.0, 10 * CELL_RAD, -5 * CELL_RAD, 3 * CELL_RAD)
+        image = render_components([component], (64, 64), CELL_RAD)
+        assert np.unravel_index(np.argmax(image), image.shape) == (27, 22)
+
+    def test_in_place_accumulation(self):
+        """Test rendering into an existing array adds to it."""
+        component = GaussianComponent(1.0, 0.0, 0.0, 8 * CELL_RAD)
+        out = np.ones((64, 64), dtype=np.float32)
+        result = render_components([component], (64, 64), CELL_RAD, out=out)
+        assert result is out
+        assert out.sum() == pytest.approx(64 * 64 + 1.0, rel=1e-4)
+
+    def test_point_components_fill_one_pixel(self):
+        """Test zero-size components are deposited into their nearest pixel."""
+        points = [
+            GaussianComponent(0.5, 10.2 * CELL_RAD, -5 * CELL_RAD, 0.0),
+            GaussianComponent(0.25, 10 * CELL_RAD, -4.9 * CELL_RAD, 0.0),
+            GaussianComponent(9.0, 1.0, 1.0, 0.0),
+        ]
+        image = render_components(points, (64, 64), CELL_RAD)
+        assert np.count_nonzero(image) == 1
+        assert image[27, 22] == pytest.approx(0.75)
+
+
+class TestImageMaker:
+    """Test model sky creation without CASA."""
+
+    @pytest.fixture
+    def image_maker(self):
+        """Create a small ImageMaker."""
+        return ImageMaker(cell_size="2.0arcsec", image_size=256)
+
+    def test_create_model_sky_writes_images(self, image_maker, tmp_path):
+        """Test one model image per redshift with the expected halo flux."""
+        paths = image_maker.create_model_sky([0.5, 1.0], output_dir=str(tmp_path))
+        assert len(paths) == 2
+
+        image = load_model_image(paths[0])
+        assert image.shape == (256, 256)
+        assert image.ref_freq_hz == pytest.approx(9.2e9)
+        assert image.ref_dec_rad == pytest.approx(np.radians(-20.0))
+        assert image.data.sum() == pytest.approx(0.6, rel=1e-3)
+
+    def test_parallel_matches_serial(self, image_maker, tmp_path):
+        """Test pool rendering returns the serial images in redshift order."""
+        redshifts = [0.3, 0.1, 0.2]
+        serial = image_maker.create_model_sky(
+            redshifts, output_dir=str(tmp_path / "serial"),
+            source_type=SOURCE_TYPE_MIXED, seed=3,
+        )
+        parallel = image_maker.create_model_sky(
+            redshifts, output_dir=str(tmp_path / "parallel"),
+            source_type=SOURCE_TYPE_MIXED, seed=3, workers=2,
+        )
+        names = [p.split("/")[-1] for p in serial]
+        assert [p.split("/")[-1] for p in parallel] == names
+        for one, other in zip(serial, parallel):
+            assert np.array_equal(
+                load_model_image(one).data, load_model_image(other).data
+            )
+
+    def test_failed_jobs_are_reported(self, image_maker, tmp_path):
+        """Test one failing redshift is reported without stopping the others."""
+        (tmp_path / "modelsky_0.2.fits").mkdir()
+        jobs = image_maker.create_model_sky_jobs(
+            [0.1, 0.2, 0.3], output_dir=str(tmp_path), workers=2
+        )
+        assert [job.redshift for job in jobs] == [0.1, 0.2, 0.3]
+        assert jobs[0].error is None and jobs[2].error is None
+        assert jobs[1].path is None and "Error" in jobs[1].error
+
+        with pytest.raises(RuntimeError, match="z=0.2"):
+            image_maker.create_model_sky([0.1, 0.2], output_dir=str(tmp_path))
+
+    def test_units_are_parsed_exactly(self):
+        """Test quantities parse by unit instead of a fixed suffix length."""
+        assert _parse_quantity("0.01arcsec", "arcsec") == pytest.approx(0.01)
+        assert _parse_quantity("9.2GHz", "GHz") == pytest.approx(9.2)
+        for value, unit in [("9.2MHz", "GHz"), ("2.0arcmin", "arcsec"), ("GHz", "GHz")]:
+            with pytest.raises(ValueError, match=unit):
+                _parse_quantity(value, unit)
+
+    def test_mixed_sources(self, image_maker):
+        """Test mixed models contain three halos and five point sources."""
+        components = image_maker.model_components(
+            0.1, 1.0, SOURCE_TYPE_MIXED, [(15.0, 30.0)] * 5
+        )
+        assert len(components) == 8
+        assert [c.flux_jy for c in components[:3]] == pytest.approx([0.1, 0.2, 0.3])
+        assert components[3].l_rad > 0 and components[3].m_rad > 0
+
+
+class TestTiledFitsOutput:
+    """Test tiled rendering into memory-mapped FITS images."""
+
+    def test_tiled_render_matches_in_memory(self, tmp_path):
+        """Test tile-by-tile FITS output equals the in-memory render."""
+        image_maker = ImageMaker(cell_size="1.0arcsec", image_size=100, tile_size=32)
+        components = image_maker.model_components(0.6, 0.5)
+
+        in_memory = image_maker.render_model(components)
+        on_disk = image_maker.render_model_to_file(components, str(tmp_path / "m.fits"))
+        assert isinstance(on_disk.data, np.memmap)
+
+        loaded = load_model_image(tmp_path / "m.fits")
+        assert loaded.shape == (100, 100)
+        assert np.allclose(loaded.data, in_memory.data, atol=1e-9)
+        assert loaded.ref_pixel == (50, 50)
+        assert loaded.cell_rad == pytest.approx(image_maker.cell_rad)
+        assert loaded.ref_ra_rad == pytest.approx(image_maker.ref_ra_rad)
+        assert loaded.ref_freq_hz == pytest.approx(9.2e9)
+
+    @pytest.mark.parametrize("threads", [2, 5])
+    def test_threaded_render_is_bit_identical(self, tmp_path, threads):
+        """Test thread-parallel tiles and row blocks equal the serial render exactly."""
+        components = ImageMaker(cell_size="1.0arcsec", image_size=96).model_components(
+            0.6, 0.5, SOURCE_TYPE_MIXED, [(10.0, 20.0), (-30.0, 5.0)]
+        )
+        renders = {}
+        for n in (1, threads):
+            maker = ImageMaker(
+                cell_size="1.0arcsec", image_size=96, tile_size=(24, 40), threads=n
+            )
+            on_disk = maker.render_model_to_file(
+                components, str(tmp_path / f"m{n}.fits")
+            )
+            renders[n] = (np.array(on_disk.data), maker.render_model(components).data)
+
+        assert np.array_equal(renders[1][0], renders[threads][0])
+        assert np.array_equal(renders[1][1], renders[threads][1])
+
+    def test_loaded_fits_is_read_only_memmap(self, tmp_path):
+        """Test FITS model images are mapped zero-copy and read-only."""
+        image_maker = ImageMaker(cell_size="1.0arcsec", image_size=64)
+        paths = image_maker.create_model_sky([0.5], output_dir=str(tmp_path))
+        assert paths[0].endswith(".fits")
+
+        image = load_model_image(paths[0])
+        assert isinstance(image.data, np.memmap)
+        with pytest.raises(ValueError):
+            image.data[0, 0] = 1.0
+
+    def test_npz_save_to_fits_round_trip(self, tmp_path):
+        """Test ModelImage.save writes FITS when given a .fits path."""
+        image = ImageMaker(cell_size="1.0arcsec", image_size=32).render_model([])
+        image.data[3, 5] = 2.5
+        loaded = load_model_image(image.save(tmp_path / "x.fits"))
+        assert loaded.data[3, 5] == 2.5
+        assert loaded.data.sum() == 2.5
+
+
+class TestFootprintStamping:
+    """Test footprint-limited and batched rendering of compact components."""
+
+    @pytest.fixture
+    def compact_components(self):
+        """Many equally shaped sources, some straddling the image edge."""
+        rng = np.random.default_rng(3)
+        positions = rng.uniform(-70, 70, size=(200, 2)) * CELL_RAD
+        return [
+            GaussianComponent(f, l, m, 2.5 * CELL_RAD, 1.5 * CELL_RAD, 0.7)
+            for (l, m), f in zip(positions, rng.uniform(0.1, 1.0, 200))
+        ]
+
+    def test_batched_stamps_match_full_evaluation(self, compact_components):
+        """Test stamping agrees with evaluating every source over the image."""
+        full = render_components(compact_components, (128, 128), CELL_RAD, nsigma=None)
+        stamped = render_components(compact_components, (128, 128), CELL_RAD)
+        assert np.allclose(stamped, full, atol=1e-6 * full.max())
+
+    def test_tiled_stamps_match_row_blocks(self, compact_components, tmp_path):
+        """Test stamping gives the same image in tiles and in row blocks."""
+        from sos.core.rasterize import render_tiled
+
+        rows = render_components(
+            compact_components, (128, 128), CELL_RAD, block_rows=16
+        )
+        tiles = render_tiled(
+            compact_components, np.zeros((128, 128), np.float32), CELL_RAD,
+            tile_shape=(40, 24),
+        )
+        assert np.allclose(tiles, rows, atol=1e-6 * rows.max())
+
+    def test_far_components_are_culled(self):
+        """Test sources far outside the image contribute nothing."""
+        far = GaussianComponent(1.0, 1e3 * CELL_RAD, 0.0, 2 * CELL_RAD)
+        image = render_components([far, far], (32, 32), CELL_RAD)
+        assert not image.any()
+
+
+class TestSeparableRendering:
+    """Test outer-product rendering of separable Gaussians."""
+
+    def test_separable_detection(self):
+        """Test circular and axis-aligned shapes are separable, rotated ones not."""
+        from sos.core.rasterize import separable_sigmas
+
+        circular = GaussianComponent(
+            1.0, 0.0, 0.0, 4 * CELL_RAD, position_angle_rad=0.8
+        )
+        north = GaussianComponent(1.0, 0.0, 0.0, 4 * CELL_RAD, 2 * CELL_RAD, np.pi)
+        east = GaussianComponent(1.0, 0.0, 0.0, 4 * CELL_RAD, 2 * CELL_RAD, np.pi / 2)
+        rotated = GaussianComponent(1.0, 0.0, 0.0, 4 * CELL_RAD, 2 * CELL_RAD, 0.3)
+
+        assert separable_sigmas(circular) is not None
+        sigma_l, sigma_m = separable_sigmas(north)
+        assert sigma_m > sigma_l
+        sigma_l, sigma_m = separable_sigmas(east)
+        assert sigma_l > sigma_m
+        assert separable_sigmas(rotated) is None
+
+    @pytest.mark.parametrize("pa", [0.0, np.pi / 2, np.pi, 0.785])
+    def test_outer_product_matches_2d(self, pa):
+        """Test separable rendering equals the general 2-D evaluation."""
+        from sos.core.rasterize import render_gaussian, pixel_axes
+
+        minor = 4 * CELL_RAD if pa == 0.785 else 2.5 * CELL_RAD
+        component = GaussianComponent(
+            1.0, 3 * CELL_RAD, -2 * CELL_RAD, 4 * CELL_RAD, minor, pa
+        )
+        l_axis, m_axis = pixel_axes((48, 40), CELL_RAD)
+
+        fast = np.zeros((48, 40), np.float64)
+        render_gaussian(component, l_axis, m_axis, fast, CELL_RAD)
+
+        # Nudge the position angle off-axis to force the 2-D path
+        general = GaussianComponent(1.0, 3 * CELL_RAD, -2 * CELL_RAD, 4 * CELL_RAD,
+                                    minor * (1 + 1e-12), pa + 1e-9)
+        slow = np.zeros((48, 40), np.float64)
+        render_gaussian(general, l_axis, m_axis, slow, CELL_RAD)
+        assert np.allclose(fast, slow, rtol=1e-6, atol=1e-12)
@@ -0,0 +1,187 @@
+"""
+Unit tests for the dirty imager.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sos.constants import DIRTY_IMAGE_UNIT, SPEED_OF_LIGHT_M_S
+from sos.core.averaging import AveragingSpec, averaged_stores
+from sos.core.imager import DirtyImager, image_stores
+from sos.core.sky_model import ComponentList, GaussianComponent, load_model_image
+from sos.core.visibility_sim import VisibilitySimulator
+from sos.utils.fits_io import read_header
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+CELL_RAD = np.radians(2.0 / 3600.0)
+FREQUENCIES = np.array([1.0e9, 1.1e9])
+
+
+@pytest.fixture
+def point_source():
+    """Visibilities of a 2 Jy source 5 pixels East and 3 pixels North of centre."""
+    rng = np.random.default_rng(1)
+    uvw = rng.normal(size=(1500, 3)) * 300.0
+    l, m = -5 * CELL_RAD, 3 * CELL_RAD
+    u = np.outer(uvw[:, 0], FREQUENCIES / SPEED_OF_LIGHT_M_S)
+    v = np.outer(uvw[:, 1], FREQUENCIES / SPEED_OF_LIGHT_M_S)
+    vis = np.repeat(
+        (2.0 * np.exp(-2j * np.pi * (u * l + v * m)))[:, :, np.newaxis], 2, axis=2
+    )
+    flags = rng.random(vis.shape) < 0.05
+    return uvw, vis.astype(np.complex64), flags
+
+
+def _image(uvw, vis, flags, weighting="natural", robust=0.0, shape=(64, 64)):
+    """Dirty image and PSF of one chunk."""
+    imager = DirtyImager(shape, CELL_RAD, weighting, robust)
+    if imager.needs_density:
+        imager.add_density(uvw, FREQUENCIES, flags)
+    imager.grid(uvw, vis, FREQUENCIES, flags)
+    return imager.dirty_image(), imager.psf()
+
+
+def _direct_image(uvw, vis, flags, weights, shape=(64, 64)):
+    """Dirty image by a direct Fourier sum over the samples."""
+    ny, nx = shape
+    iy, ix = np.mgrid[0:ny, 0:nx]
+    l, m = -(ix - nx // 2) * CELL_RAD, (iy - ny // 2) * CELL_RAD
+    u = np.outer(uvw[:, 0], FREQUENCIES / SPEED_OF_LIGHT_M_S).ravel()
+    v = np.outer(uvw[:, 1], FREQUENCIES / SPEED_OF_LIGHT_M_S).ravel()
+    data = np.where(flags, 0, vis).sum(axis=2) / np.maximum((~flags).sum(axis=2), 1)
+    weights = weights.ravel()
+    image = np.zeros(shape)
+    for uk, vk, dk, wk in zip(u, v, data.ravel(), weights):
+        if wk:
+            image += wk * np.real(dk * np.exp(2j * np.pi * (uk * l + vk * m)))
+    return image / weights.sum()
+
+
+class TestDirtyImager:
+    """Test gridding, weighting and the FFT."""
+
+    @pytest.mark.parametrize("weighting", ["natural", "uniform", "briggs"])
+    def test_point_source(self, point_source, weighting):
+        """Test the source peaks at its pixel with its flux, the PSF at the centre."""
+        dirty, psf = _image(*point_source, weighting)
+        assert np.unravel_index(dirty.argmax(), dirty.shape) == (35, 37)
+        assert dirty.max() == pytest.approx(2.0, rel=1e-4)
+        assert np.unravel_index(psf.argmax(), psf.shape) == (32, 32)
+        assert psf.max() == pytest.approx(1.0, rel=1e-4)
+
+    def test_natural_matches_direct_sum(self, point_source):
+        """Test the natural-weighted image matches the direct Fourier sum."""
+        uvw, vis, flags = point_source
+        dirty, _ = _image(uvw, vis, flags)
+        expected = _direct_image(uvw, vis, flags, (~flags).sum(axis=2))
+        assert np.allclose(dirty, expected, atol=1e-5)
+
+    def test_uniform_matches_direct_sum(self, point_source):
+        """Test uniform weights divide by the sample count of each uv cell."""
+        uvw, vis, flags = point_source
+        dirty, _ = _image(uvw, vis, flags, "uniform")
+
+        weights = (~flags).sum(axis=2).astype(np.float64)
+        scales = FREQUENCIES / SPEED_OF_LIGHT_M_S
+        iu = np.round(np.outer(uvw[:, 0], scales) * 64 * CELL_RAD).astype(int)
+        iv = np.round(np.outer(uvw[:, 1], scales) * 64 * CELL_RAD).astype(int)
+        density = np.zeros((129, 129))
+        np.add.at(density, (iv + 64, iu + 64), weights)
+        np.add.at(density, (-iv + 64, -iu + 64), weights)
+        uniform = np.where(weights > 0, weights / density[iv + 64, iu + 64], 0.0)
+        expected = _direct_image(uvw, vis, flags, uniform)
+        assert np.allclose(dirty, expected, atol=1e-5)
+
+    def test_briggs_spans_uniform_to_natural(self, point_source):
+        """Test robust -5 approaches uniform and +5 natural weighting."""
+        _, natural = _image(*point_source, "natural")
+        _, uniform = _image(*point_source, "uniform")
+        _, robust_low = _image(*point_source, "briggs", -5.0)
+        _, robust_high = _image(*point_source, "briggs", 5.0)
+        assert np.allclose(robust_low, uniform, atol=1e-3)
+        assert np.allclose(robust_high, natural, atol=1e-3)
+        assert not np.allclose(uniform, natural, atol=1e-2)
+
+    def test_chunks_add_up(self, point_source):
+        """Test gridding chunk by chunk equals gridding everything at once."""
+        uvw, vis, flags = point_source
+        dirty, psf = _image(uvw, vis, flags, "briggs")
+
+        imager = DirtyImager((64, 64), CELL_RAD, "briggs")
+        chunks = [slice(0, 400), slice(400, 1100), slice(1100, None)]
+        for rows in chunks:
+            imager.add_density(uvw[rows], FREQUENCIES, flags[rows])
+        for rows in chunks:
+            imager.grid(uvw[rows], vis[rows], FREQUENCIES, flags[rows])
+        assert np.allclose(imager.dirty_image(), dirty, atol=1e-6)
+        assert np.allclose(imager.psf(), psf, atol=1e-6)
+
+    def test_long_baselines_dropped(self, point_source):
+        """Test samples beyond the uv grid are counted and left out."""
+        uvw, vis, flags = point_source
+        imager = DirtyImager((16, 16), 30 * CELL_RAD)
+        imager.grid(uvw, vis, FREQUENCIES, flags)
+        assert imager.n_dropped > 0
+        n_samples = np.count_nonzero((~flags).any(axis=2))
+        assert imager.n_gridded + imager.n_dropped == n_samples
+
+    def test_invalid_use(self, point_source):
+        """Test weighting names and the density pass are validated."""
+        uvw, vis, flags = point_source
+        with pytest.raises(ValueError, match="weighting"):
+            DirtyImager((64, 64), CELL_RAD, "robust")
+        imager = DirtyImager((64, 64), CELL_RAD, "uniform")
+        with pytest.raises(ValueError, match="add_density"):
+            imager.grid(uvw, vis, FREQUENCIES, flags)
+        imager.add_density(uvw, FREQUENCIES, flags)
+        imager.grid(uvw, vis, FREQUENCIES, flags)
+        with pytest.raises(RuntimeError, match="density pass"):
+            imager.add_density(uvw, FREQUENCIES, flags)
+        with pytest.raises(ValueError, match="No visibilities"):
+            DirtyImager((64, 64), CELL_RAD).dirty_image()
+
+
+class TestImageStores:
+    """Test imaging of simulated visibility stores."""
+
+    def test_simulated_source_to_fits(self, tmp_path):
+        """Test a simulated offset source appears at its pixel in the FITS image."""
+        cell = np.radians(0.05 / 3600.0)
+        sky = ComponentList(
+            [GaussianComponent(1.0, -6 * cell, 4 * cell, 0.0)], 1.047, -0.349, 9.2e9
+        )
+        simulator = VisibilitySimulator(
+            str(PROJECT_ROOT / "ska_mid133.cfg"), channels=2,
+            frequency_resolution_mhz=1.0,
+        )
+        run = dict(scan_duration_sec=20.0, chunk_seconds=7.0)
+        full = simulator.simulate_components(sky, str(tmp_path / "full"), **run)
+
+        dirty, psf = image_stores(
+            full, (128, 128), cell, "briggs",
+            dirty_path=str(tmp_path / "dirty.fits"),
+            psf_path=str(tmp_path / "psf.fits"),
+        )
+        assert np.unravel_index(np.argmax(dirty), dirty.shape) == (68, 70)
+        assert np.max(dirty) == pytest.approx(1.0, rel=0.01)
+        assert np.max(psf) == pytest.approx(1.0, rel=1e-4)
+
+        header, _ = read_header(tmp_path / "dirty.fits")
+        assert header["BUNIT"] == DIRTY_IMAGE_UNIT
+        header, _ = read_header(tmp_path / "psf.fits")
+        assert "BUNIT" not in header
+        image = load_model_image(tmp_path / "dirty.fits")
+        assert image.ref_ra_rad == pytest.approx(1.047)
+        assert np.array_equal(image.data, dirty)
+
+        # Averaged group stores image to the same source
+        averaged = VisibilitySimulator(
+            str(PROJECT_ROOT / "ska_mid133.cfg"), channels=2,
+            frequency_resolution_mhz=1.0, averaging=AveragingSpec(),
+        ).simulate_components(sky, str(tmp_path / "avg"), **run)
+        averaged_dirty, _ = image_stores(averaged_stores(averaged), (128, 128), cell)
+        natural_dirty, _ = image_stores(full, (128, 128), cell)
+        assert np.allclose(averaged_dirty, natural_dirty, atol=0.02)
@@ -0,0 +1,68 @@
+"""
+Unit tests for the shared-memory helpers.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sos.core.parallel import SharedArrays, attach_shared_arrays
+from sos.core.visibility_sim import _release_worker_inputs, _worker_inputs
+
+
+def _total(spec):
+    """Sum a shared array in a worker process."""
+    arrays, _ = attach_shared_arrays(spec)
+    return float(arrays["values"].sum()), arrays["records"]["station"][1]
+
+
+def _constant_predict(values):
+    """Predict function returning a fixed array, like a cached worker predict."""
+    return lambda geometry, scales: values
+
+
+class TestSharedArrays:
+    """Test arrays shared between processes."""
+
+    def test_round_trip(self):
+        """Test attached views equal the originals and are read-only."""
+        records = np.zeros(2, dtype=[("station", "U4"), ("xyz", "<f8", (3,))])
+        records["station"] = ["C1", "C2"]
+        arrays = {
+            "values": np.arange(6.0).reshape(2, 3),
+            "records": records,
+            "empty": np.zeros(0),
+        }
+
+        with SharedArrays(arrays) as shared:
+            attached, blocks = attach_shared_arrays(shared.spec)
+            assert np.array_equal(attached["values"], arrays["values"])
+            assert list(attached["records"]["station"]) == ["C1", "C2"]
+            assert attached["empty"].shape == (0,)
+            assert not attached["values"].flags.writeable
+            del attached
+            for block in blocks:
+                block.close()
+
+    def test_worker_process_reads_shared_arrays(self):
+        """Test a pool worker sees the arrays through the pickled spec only."""
+        records = np.zeros(2, dtype=[("station", "U4")])
+        records["station"] = ["C1", "C2"]
+        with SharedArrays({"values": np.ones(1000), "records": records}) as shared:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                total, station = executor.submit(_total, shared.spec).result()
+        assert total == 1000.0
+        assert station == "C2"
+
+    def test_released_worker_inputs_close_blocks(self):
+        """Test switching worker inputs closes the previously attached blocks."""
+        with SharedArrays({"values": np.arange(4.0)}) as shared:
+            attached, blocks = attach_shared_arrays(shared.spec)
+            # The cached predict holds the only view into the block
+            predict = _constant_predict(attached.pop("values"))
+            _worker_inputs[("old",)] = (None, predict, blocks)
+            del predict
+
+            _release_worker_inputs()
+            assert not _worker_inputs
+            assert all(block.buf is None for block in blocks)
@@ -0,0 +1,276 @@
+"""
+Unit tests for the native visibility store.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sos.core.baselines import BaselineSelection
+from sos.core.sky_model import ComponentList, GaussianComponent
+from sos.core.uvw import baseline_pairs
+from sos.core.visibility_sim import VisibilitySimulator
+from sos.core.vis_store import VisibilityStore, _column_header, _resize_column
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _chunk(times, antenna1, antenna2, n_channels=2, n_pol=2):
+    """Columns of one time chunk with data encoding (time, baseline)."""
+    n_baselines = antenna1.shape[0]
+    n_rows = times.shape[0] * n_baselines
+    baseline = np.tile(np.arange(n_baselines), times.shape[0])
+    time = np.repeat(times, n_baselines)
+    data = (time + 1j * baseline)[:, np.newaxis, np.newaxis]
+    return {
+        "time": time,
+        "antenna1": np.tile(antenna1, times.shape[0]),
+        "antenna2": np.tile(antenna2, times.shape[0]),
+        "uvw": np.stack([time, baseline, np.zeros(n_rows)], axis=1),
+        "data": np.broadcast_to(data, (n_rows, n_channels, n_pol)),
+        "flag": np.zeros((n_rows, n_channels, n_pol), dtype=bool),
+    }
+
+
+class _FakeSimulator:
+    """Records the ``sm`` calls that shape the MS skeleton."""
+
+    def __init__(self, ms):
+        self.ms = ms
+
+    def setconfig(self, antname, **kwargs):
+        self.ms.n_antennas = len(antname)
+
+    def setspwindow(self, nchannels, stokes, **kwargs):
+        self.ms.n_channels, self.ms.n_pol = nchannels, len(stokes.split())
+
+    def settimes(self, integrationtime, **kwargs):
+        self.ms.integration = float(integrationtime.rstrip("s"))
+
+    def observe(self, source, spw, starttime, stoptime):
+        start, stop = (float(value.rstrip("s")) for value in (starttime, stoptime))
+        self.ms.scans.append((start, stop))
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _FakeTable:
+    """MS main table with one row per baseline and integration of every scan."""
+
+    def __init__(self, ms):
+        self.ms = ms
+
+    def open(self, path, nomodify=True):
+        ms = self.ms
+        antenna1, antenna2 = baseline_pairs(ms.n_antennas)
+        times = np.concatenate([
+            np.arange(start + ms.integration / 2, stop, ms.integration)
+            for start, stop in ms.scans
+        ])
+        n_rows = times.shape[0] * antenna1.shape[0]
+        ms.columns = {
+            # Absolute times, as CASA writes them
+            "TIME": 4.9e9 + np.repeat(times, antenna1.shape[0]),
+            "ANTENNA1": np.tile(antenna1, times.shape[0]),
+            "ANTENNA2": np.tile(antenna2, times.shape[0]),
+            "UVW": np.zeros((3, n_rows)),
+            "DATA": np.zeros((ms.n_pol, ms.n_channels, n_rows), dtype=np.complex64),
+            "FLAG": np.zeros((ms.n_pol, ms.n_channels, n_rows), dtype=bool),
+        }
+
+    def getcol(self, name):
+        return self.ms.columns[name].copy()
+
+    def putcol(self, name, value, startrow=0, nrow=-1):
+        self.ms.columns[name][..., startrow:startrow + nrow] = value
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_casa(monkeypatch):
+    """Install a stand-in ``casac.casatools`` holding one in-memory MS."""
+    ms = types.SimpleNamespace(scans=[], columns={})
+    casatools = types.SimpleNamespace(
+        simulator=lambda: _FakeSimulator(ms), table=lambda: _FakeTable(ms)
+    )
+    casac = types.SimpleNamespace(casatools=casatools)
+    monkeypatch.setitem(sys.modules, "casac", casac)
+    return ms
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Empty store of four antennas, two channels and two correlations."""
+    antenna1, antenna2 = baseline_pairs(4)
+    return VisibilityStore.create(
+        str(tmp_path / "vis"), [1.0e9, 1.1e9], antenna1, antenna2, ["RR", "LL"],
+        metadata={"integration_seconds": 1.0},
+    )
+
+
+class TestVisibilityStore:
+    """Test appending, committing and reading visibility stores."""
+
+    def test_append_round_trip(self, store):
+        """Test appended chunks read back through a reopened store."""
+        antenna1, antenna2 = baseline_pairs(4)
+        first = _chunk(np.array([0.0, 1.0]), antenna1, antenna2)
+        second = _chunk(np.array([2.0]), antenna1, antenna2)
+        store.append(**first)
+        store.append(**second)
+
+        reopened = VisibilityStore(str(store.path))
+        assert reopened.n_rows == 18
+        assert reopened.chunks == [(0, 12), (12, 18)]
+        assert np.allclose(reopened.frequencies, [1.0e9, 1.1e9])
+        assert reopened.metadata["integration_seconds"] == 1.0
+        data = reopened.column("data")
+        assert np.array_equal(data[:12], first["data"])
+        assert np.array_equal(data[12:], second["data"])
+
+        chunks = list(reopened.iter_chunks())
+        assert [chunk["time"].shape[0] for chunk in chunks] == [12, 6]
+        assert np.array_equal(chunks[1]["uvw"], second["uvw"])
+
+    def test_read_baseline_is_strided_selection(self, store):
+        """Test one baseline matches filtering the full columns."""
+        antenna1, antenna2 = baseline_pairs(4)
+        store.append(**_chunk(np.arange(5.0), antenna1, antenna2))
+
+        series = store.read_baseline(3, 1)
+        rows = (store.column("antenna1") == 1) & (store.column("antenna2") == 3)
+        assert np.array_equal(series["time"], store.column("time")[rows])
+        assert np.array_equal(series["data"], store.column("data")[rows])
+        with pytest.raises(KeyError):
+            store.read_baseline(0, 9)
+
+    def test_select_reads_indexed_baselines(self, tmp_path):
+        """Test a length and antenna selection equals filtering every row."""
+        antenna1, antenna2 = baseline_pairs(4)
+        lengths = np.array([100.0, 2500.0, 800.0, 3000.0, 1500.0, 50.0])
+        store = VisibilityStore.create(
+            str(tmp_path / "vis"), [1.0e9], antenna1, antenna2, ["RR"],
+            baseline_lengths_m=lengths,
+            antenna_names=["SKA001", "SKA002", "M000", "M001"],
+        )
+        store.append(
+            **_chunk(np.arange(3.0), antenna1, antenna2, n_channels=1, n_pol=1)
+        )
+
+        reopened = VisibilityStore(str(store.path))
+        short = reopened.select(
+            BaselineSelection(max_length_m=2000.0), columns=("data",)
+        )
+        assert short["data"].shape == (3, 4, 1, 1)
+        assert sorted(short["data"][0, :, 0, 0].imag.tolist()) == [0.0, 2.0, 4.0, 5.0]
+
+        to_station = reopened.select(BaselineSelection(antennas=["SKA001"]))
+        rows = reopened.column("antenna1") == 0
+        assert np.array_equal(
+            to_station["data"].reshape(-1, 1, 1), reopened.column("data")[rows]
+        )
+        pair = reopened.baseline_index("M001", "SKA002")
+        assert pair == reopened.baseline_index(1, 3)
+
+    def test_reserved_rows_hidden_until_committed(self, store):
+        """Test rows written through a writable map appear only on commit."""
+        antenna1, antenna2 = baseline_pairs(4)
+        rows = store.reserve(12)
+        columns = store.columns("r+")
+        for name, values in _chunk(np.array([0.0, 1.0]), antenna1, antenna2).items():
+            columns[name][rows] = values
+        del columns
+
+        assert VisibilityStore(str(store.path)).n_rows == 0
+        store.commit(slice(0, 6))
+        store.commit(slice(6, 12))
+        times = VisibilityStore(str(store.path)).column("time")
+        assert times.tolist() == [0.0] * 6 + [1.0] * 6
+
+    def test_column_headers_leave_room_to_grow(self, store):
+        """Test a column header keeps its size for any row count."""
+        path = store.path / "data.npy"
+        empty_size = path.stat().st_size
+        assert empty_size % 64 == 0
+        _resize_column(path, np.dtype(np.complex64), (2, 2), 10 ** 6)
+        assert path.stat().st_size == empty_size + 10 ** 6 * 32
+        assert np.load(path, mmap_mode="r").shape == (10 ** 6, 2, 2)
+        header = _column_header(np.dtype(np.complex64), (2, 2), 10 ** 20)
+        assert len(header) == empty_size
+
+    def test_invalid_writes_raise(self, store):
+        """Test partial integrations, gaps and missing columns are rejected."""
+        antenna1, antenna2 = baseline_pairs(4)
+        with pytest.raises(ValueError, match="whole integrations"):
+            store.reserve(5)
+        store.reserve(12)
+        with pytest.raises(ValueError, match="commit"):
+            store.commit(slice(6, 12))
+        columns = _chunk(np.array([0.0]), antenna1, antenna2)
+        del columns["flag"]
+        with pytest.raises(ValueError, match="columns"):
+            store.append(**columns)
+
+    def test_export_ms_requires_casa(self, store):
+        """Test MS export raises ImportError without the CASA toolkit."""
+        try:
+            import casac  # noqa: F401
+            pytest.skip("CASA toolkit available")
+        except ImportError:
+            pass
+        with pytest.raises(ImportError):
+            store.export_ms(str(store.path.parent / "vis.ms"))
+
+    def test_export_ms_matches_rows_per_scan(self, fake_casa, tmp_path):
+        """Test each scan is observed and rows are matched by integration and pair."""
+        simulator = VisibilitySimulator(
+            str(PROJECT_ROOT / "ska_mid133.cfg"), channels=2,
+            baselines=BaselineSelection(max_length_m=2000.0),
+        )
+        sky = ComponentList(
+            [GaussianComponent(1.0, 2e-6, -1e-6, 1e-6)], 1.047, -0.349, 9.2e9
+        )
+        store = VisibilityStore(simulator.simulate_components(
+            sky, str(tmp_path / "vis"), num_scans=2, scan_duration_sec=2.0,
+            scan_gap_sec=3.0,
+        ))
+        store.export_ms(str(tmp_path / "vis.ms"))
+
+        assert fake_casa.scans == [(0.5, 2.5), (5.5, 7.5)]
+        columns = fake_casa.columns
+        n_integrations = 4
+        assert columns["TIME"].shape[0] == n_integrations * 133 * 132 // 2
+
+        pairs = set(zip(store.baselines.antenna1, store.baselines.antenna2))
+        selected = np.array([
+            pair in pairs for pair in zip(columns["ANTENNA1"], columns["ANTENNA2"])
+        ])
+        assert selected.sum() == store.n_rows
+        data = columns["DATA"].transpose(2, 1, 0)
+        assert np.array_equal(data[selected], store.column("data"))
+        assert np.array_equal(columns["UVW"].T[selected], store.column("uvw"))
+        assert np.array_equal(
+            columns["FLAG"].transpose(2, 1, 0)[selected], store.column("flag")
+        )
+        assert columns["FLAG"][..., ~selected].all()
+        assert not data[~selected].any()
+
+    def test_export_ms_rejects_averaged_store(self, tmp_path):
+        """Test averaged stores, which have no integration grid, are rejected."""
+        antenna1, antenna2 = baseline_pairs(3)
+        store = VisibilityStore.create(
+            str(tmp_path / "avg"), [1.0e9], antenna1, antenna2, ["RR"], averaged=True
+        )
+        with pytest.raises(ValueError, match="averaged"):
+            store.export_ms(str(tmp_path / "avg.ms"))
+
+    def test_open_missing_store_raises(self, tmp_path):
+        """Test opening a directory without a header raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            VisibilityStore(str(tmp_path))
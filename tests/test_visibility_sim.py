@@ -0,0 +1,664 @@
+"""
+Unit tests for the NumPy visibility simulation engine.
+"""
+
+import pytest
+from pathlib import Path
+
+import numpy as np
+
+from sos.constants import SOURCE_TYPE_MIXED
+from sos.core.baselines import BaselineSelection
+from sos.core.image_maker import ImageMaker
+from sos.core.predict import (
+    predict_centred_gaussians,
+    predict_components,
+    predict_dft,
+    predict_dft_antennas,
+)
+from sos.core.rasterize import render_components
+from sos.core.sky_model import (
+    ComponentList,
+    GaussianComponent,
+    ModelImage,
+    SpectralCube,
+    load_model_image,
+    split_common_components,
+)
+from sos.core.uvw import (
+    baseline_pairs,
+    baseline_vectors,
+    compute_uvw,
+    hour_angles,
+    rotate_baselines,
+    uvw_rotation_matrices,
+)
+from sos.core.visibility_sim import VisibilitySimulator
+from sos.core.vis_store import VisibilityStore
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def point_image(tmp_path):
+    """Save a 1 Jy point source at the phase centre as a model image."""
+    data = np.zeros((64, 64), dtype=np.float32)
+    data[32, 32] = 1.0
+    image = ModelImage(
+        data, cell_rad=1e-6, ref_ra_rad=1.047, ref_dec_rad=-0.349, ref_freq_hz=9.2e9
+    )
+    return image.save(tmp_path / "point")
+
+
+class TestUvw:
+    """Test baseline geometry."""
+
+    def test_baseline_pairs(self):
+        """Test baseline ordering and count."""
+        antenna1, antenna2 = baseline_pairs(4)
+        assert list(zip(antenna1, antenna2)) == [
+            (0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)
+        ]
+
+    def test_uvw_preserves_baseline_length(self):
+        """Test uvw is a rotation of the baseline vector."""
+        xyz = np.array([[0.0, 0.0, 0.0], [100.0, -50.0, 30.0]])
+        antenna1, antenna2 = baseline_pairs(2)
+        uvw = compute_uvw(xyz, antenna1, antenna2, hour_angles(np.arange(10.0)), -0.3)
+        lengths = np.linalg.norm(uvw, axis=-1)
+        assert np.allclose(lengths, np.linalg.norm(xyz[1]))
+
+    def test_polar_baseline_is_pure_w(self):
+        """Test an Earth-axis baseline observed at the pole has only w."""
+        xyz = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 10.0]])
+        antenna1, antenna2 = baseline_pairs(2)
+        uvw = compute_uvw(xyz, antenna1, antenna2, np.array([0.0, 1.0]), np.pi / 2)
+        assert np.allclose(uvw[..., :2], 0.0)
+        assert np.allclose(uvw[..., 2], 10.0)
+
+    def test_rotation_matrices_are_orthonormal(self):
+        """Test each per-sample rotation preserves lengths and angles."""
+        rotation = uvw_rotation_matrices(
+            hour_angles(np.arange(0.0, 3600.0, 600.0)), -0.5, 0.37
+        )
+        identity = np.broadcast_to(np.eye(3), rotation.shape)
+        assert np.allclose(rotation @ rotation.transpose(0, 2, 1), identity)
+
+    def test_batched_rotation_matches_tms_formula(self):
+        """Test the batched product reproduces TMS eq. 4.1 sample by sample."""
+        rng = np.random.default_rng(7)
+        xyz = rng.normal(size=(5, 3)) * 1e3
+        antenna1, antenna2 = baseline_pairs(5)
+        baselines = baseline_vectors(xyz, antenna1, antenna2)
+        hour_angle, dec = np.array([-0.4, 0.1, 0.9]), -0.6
+
+        uvw = compute_uvw(xyz, antenna1, antenna2, hour_angle, dec)
+        for t, h in enumerate(hour_angle):
+            bx, by, bz = baselines.T
+            expected = np.stack([
+                np.sin(h) * bx + np.cos(h) * by,
+                -np.sin(dec) * np.cos(h) * bx + np.sin(dec) * np.sin(h) * by +
+                np.cos(dec) * bz,
+                np.cos(dec) * np.cos(h) * bx - np.cos(dec) * np.sin(h) * by +
+                np.sin(dec) * bz,
+            ], axis=-1)
+            assert np.allclose(uvw[t], expected)
+
+
+class TestPredictDft:
+    """Test direct Fourier predict."""
+
+    def test_point_at_phase_centre_is_flat(self):
+        """Test a centred point source gives constant real visibilities."""
+        uvw = np.random.default_rng(1).normal(size=(50, 3)) * 1e4
+        vis = predict_dft(uvw, np.array([0.0]), np.array([0.0]), np.array([2.5]))
+        assert np.allclose(vis, 2.5)
+
+    def test_blocking_does_not_change_result(self):
+        """Test small blocks give the same answer as one block."""
+        rng = np.random.default_rng(2)
+        uvw = rng.normal(size=(40, 3)) * 1e3
+        l, m = rng.normal(size=(2, 30)) * 1e-4
+        flux = rng.random(30)
+        full = predict_dft(uvw, l, m, flux)
+        blocked = predict_dft(uvw, l, m, flux, max_elements=7)
+        assert np.allclose(full, blocked)
+
+
+class TestWidebandPredict:
+    """Test channel-batched predict."""
+
+    @pytest.mark.parametrize("scales", [
+        np.array([30.0, 30.5, 31.0, 31.5, 32.0]),
+        np.array([30.0, 30.2, 31.7]),
+    ])
+    def test_channels_match_per_channel_calls(self, scales):
+        """Test one batched call equals a predict per channel, evenly spaced or not."""
+        rng = np.random.default_rng(8)
+        uvw_m = rng.normal(size=(40, 3)) * 300.0
+        sky = ComponentList(
+            [GaussianComponent(1.0, 2e-5, -1e-5, 2e-5, 1e-5, 0.4),
+             GaussianComponent(0.3, -3e-5, 0.0, 0.0)],
+            0.0, -0.3, 9.2e9,
+        )
+        columns = sky.as_arrays()
+
+        batched = predict_components(uvw_m, **columns, channel_scales=scales)
+        dft = predict_dft(uvw_m, columns["l_rad"], columns["m_rad"], columns["flux"],
+                          channel_scales=scales)
+        assert batched.shape == (40, scales.shape[0])
+        for c, scale in enumerate(scales):
+            assert np.allclose(
+                batched[:, c], predict_components(uvw_m * scale, **columns)
+            )
+            assert np.allclose(dft[:, c], predict_dft(
+                uvw_m * scale, columns["l_rad"], columns["m_rad"], columns["flux"]
+            ))
+
+
+class TestCatalogDft:
+    """Test the antenna-factorized catalog DFT."""
+
+    @pytest.fixture
+    def array(self):
+        """Random 12-antenna array over ten time samples."""
+        xyz = np.random.default_rng(5).normal(size=(12, 3)) * 500.0
+        antenna1, antenna2 = baseline_pairs(12)
+        return xyz, antenna1, antenna2, hour_angles(np.arange(0.0, 600.0, 60.0))
+
+    @pytest.fixture
+    def catalog(self):
+        """Fifty random point sources."""
+        rng = np.random.default_rng(6)
+        l, m = rng.normal(size=(2, 50)) * 1e-3
+        return l, m, rng.random(50)
+
+    def test_matches_baseline_dft(self, array, catalog):
+        """Test per-antenna phasors reproduce the per-baseline direct sum."""
+        xyz, antenna1, antenna2, hour_angle = array
+        scales = np.array([3.0, 3.1, 3.2])
+
+        vis = predict_dft_antennas(
+            rotate_baselines(xyz, hour_angle, -0.4), antenna1, antenna2,
+            *catalog, channel_scales=scales,
+        )
+        uvw = compute_uvw(xyz, antenna1, antenna2, hour_angle, -0.4).reshape(-1, 3)
+        expected = predict_dft(uvw, *catalog, channel_scales=scales)
+
+        assert vis.dtype == np.complex64
+        assert vis.shape == (10, antenna1.shape[0], 3)
+        assert np.allclose(vis.reshape(-1, 3), expected, atol=1e-4)
+
+    def test_memory_ceiling_does_not_change_result(self, array, catalog):
+        """Test tiny phasor blocks give the same answer as one block."""
+        xyz, antenna1, antenna2, hour_angle = array
+        antenna_uvw = rotate_baselines(xyz, hour_angle, -0.4) / 0.1
+        full = predict_dft_antennas(antenna_uvw, antenna1, antenna2, *catalog)
+        blocked = predict_dft_antennas(
+            antenna_uvw, antenna1, antenna2, *catalog, max_bytes=1000
+        )
+        assert full.shape == (10, antenna1.shape[0])
+        assert np.allclose(full, blocked, atol=1e-4)
+
+
+class TestPredictComponents:
+    """Test analytic uv-domain predict."""
+
+    def test_point_component_matches_dft(self):
+        """Test a zero-size component reduces to the direct Fourier sum."""
+        rng = np.random.default_rng(3)
+        uvw = rng.normal(size=(60, 3)) * 1e4
+        sky = ComponentList(
+            [GaussianComponent(1.5, 2e-5, -1e-5, 0.0)], 0.0, -0.3, 9.2e9
+        )
+        vis = predict_components(uvw, **sky.as_arrays())
+        expected = predict_dft(
+            uvw, np.array([2e-5]), np.array([-1e-5]), np.array([1.5])
+        )
+        assert np.allclose(vis, expected)
+
+    def test_gaussian_matches_rendered_image(self):
+        """Test the analytic transform agrees with a DFT of the rasterized ellipse."""
+        component = GaussianComponent(
+            1.0, 5e-6, -3e-6, 2e-5, 1e-5, position_angle_rad=0.5
+        )
+        cell_rad = 5e-7
+        image = ModelImage(
+            render_components([component], (256, 256), cell_rad, dtype=np.float64),
+            cell_rad, 0.0, -0.3, 9.2e9,
+        )
+        uvw = np.random.default_rng(4).normal(size=(40, 3)) * 3e4
+        uvw[:, 2] = 0.0
+
+        expected = predict_dft(uvw, *image.nonzero_components())
+        vis = predict_components(
+            uvw, **ComponentList([component], 0.0, -0.3, 9.2e9).as_arrays()
+        )
+        assert np.allclose(vis, expected, atol=1e-4)
+
+    def test_blocking_does_not_change_result(self):
+        """Test small blocks give the same answer as one block."""
+        rng = np.random.default_rng(5)
+        uvw = rng.normal(size=(30, 3)) * 1e4
+        sky = ComponentList(
+            [
+                GaussianComponent(
+                    rng.random(), *rng.normal(size=2) * 1e-5, 1e-5, 5e-6, 0.3
+                )
+                for _ in range(12)
+            ],
+            0.0, -0.3, 9.2e9,
+        )
+        full = predict_components(uvw, **sky.as_arrays())
+        blocked = predict_components(uvw, **sky.as_arrays(), max_elements=5)
+        assert np.allclose(full, blocked)
+
+
+class TestVisibilitySimulator:
+    """Test end-to-end NumPy simulation."""
+
+    def test_simulate_point_source(self, point_image, tmp_path):
+        """Test output columns for a centred point source."""
+        simulator = VisibilitySimulator(
+            str(PROJECT_ROOT / "ska_mid133.cfg"), channels=2
+        )
+        out = simulator.simulate_visibility(
+            point_image, str(tmp_path / "vis"), scan_duration_sec=3.0, chunk_seconds=2.0
+        )
+
+        n_baselines = 133 * 132 // 2
+        data = np.load(Path(out) / "data.npy")
+        time = np.load(Path(out) / "time.npy")
+        store = VisibilityStore(out)
+        frequency = store.frequencies
+
+        assert data.shape == (3 * n_baselines, 2, 2)
+        assert np.allclose(np.unique(time), [1.0, 2.0, 3.0])
+        assert np.allclose(data[:, 0, :], 1.0, atol=1e-5)
+        expected = (frequency[1] / frequency[0]) ** -1.6
+        assert np.allclose(data[:, 1, :], expected, atol=1e-5)
+        assert store.chunks == [
+            (0, 2 * n_baselines), (2 * n_baselines, 3 * n_baselines)
+        ]
+        assert store.metadata["integration_seconds"] == 1.0
+
+    def test_parallel_image_matches_serial(self, point_image, tmp_path):
+        """Test pool workers rebuild the FFT predict from shared memory."""
+        config = str(PROJECT_ROOT / "ska_mid133.cfg")
+        outputs = [
+            VisibilitySimulator(config, workers=workers).simulate_visibility(
+                point_image, str(tmp_path / f"w{workers}"), scan_duration_sec=3.0,
+                chunk_seconds=1.0,
+            )
+            for workers in (1, 3)
+        ]
+        serial, parallel = (np.load(Path(out) / "data.npy") for out in outputs)
+        assert np.array_equal(serial, parallel)
+        assert VisibilityStore(outputs[1]).n_rows == serial.shape[0]
+
+        with pytest.raises(ValueError, match="workers"):
+            VisibilitySimulator(config, workers=0)
+
+    def test_unknown_backend_raises_error(self, point_image, tmp_path):
+        """Test invalid backend name raises ValueError."""
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+        with pytest.raises(ValueError):
+            simulator.simulate_visibility(
+                point_image, str(tmp_path / "vis"), backend="miriad"
+            )
+
+    def test_casa_backend_not_implemented(self, point_image, tmp_path):
+        """Test the CASA backend raises instead of reporting an unwritten MS."""
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+        with pytest.raises(NotImplementedError, match="export_ms"):
+            simulator.simulate_visibility(
+                point_image, str(tmp_path / "vis.ms"), backend="casa"
+            )
+        assert not (tmp_path / "vis.ms").exists()
+
+    def test_noise_is_independent_per_polarization(self):
+        """Test each correlation gets its own noise of noise_jy per part."""
+        simulator = VisibilitySimulator(
+            str(PROJECT_ROOT / "ska_mid133.cfg"), channels=2
+        )
+        sky = ComponentList(
+            [GaussianComponent(0.0, 0.0, 0.0, 0.0)], 1.047, -0.349, 9.2e9
+        )
+
+        chunk = next(iter(simulator.iter_visibilities(
+            sky, scan_duration_sec=2.0, noise_level="0.5Jy"
+        )))
+        rr, ll = chunk.vis[..., 0].ravel(), chunk.vis[..., 1].ravel()
+        for part in (np.real, np.imag):
+            assert np.std(part(rr)) == pytest.approx(0.5, rel=0.03)
+            assert np.std(part(ll)) == pytest.approx(0.5, rel=0.03)
+            assert abs(np.corrcoef(part(rr), part(ll))[0, 1]) < 0.03
+        assert np.std((rr - ll).real) == pytest.approx(0.5 * np.sqrt(2), rel=0.03)
+
+    def test_seeded_noise_ignores_workers_and_chunking(self, tmp_path):
+        """Test a seed fixes the noise whatever the workers and chunk length."""
+        config = str(PROJECT_ROOT / "ska_mid133.cfg")
+        sky = ComponentList(
+            [GaussianComponent(1.0, 0.0, 0.0, 0.0)], 1.047, -0.349, 9.2e9
+        )
+
+        def simulate(name, seed, workers=1, chunk_seconds=1.0):
+            simulator = VisibilitySimulator(config, workers=workers, seed=seed)
+            path = simulator.simulate_components(
+                sky, str(tmp_path / name), scan_duration_sec=3.0,
+                noise_level="0.5Jy", chunk_seconds=chunk_seconds,
+            )
+            return np.load(Path(path) / "data.npy")
+
+        serial = simulate("serial", seed=7)
+        assert np.array_equal(serial, simulate("pool", seed=7, workers=3))
+        assert np.array_equal(serial, simulate("long", seed=7, chunk_seconds=2.0))
+        assert not np.array_equal(serial, simulate("other", seed=8))
+
+    def test_image_predict_methods_agree(self, tmp_path):
+        """Test FFT degridding and the pixel DFT give the same visibilities."""
+        data = np.zeros((64, 64), dtype=np.float32)
+        data[30, 35] = 1.0
+        data[40, 20] = 0.5
+        image_path = ModelImage(data, 2e-7, 1.047, -0.349, 9.2e9).save(tmp_path / "two")
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+
+        outputs = [
+            simulator.simulate_visibility(
+                image_path, str(tmp_path / method), scan_duration_sec=2.0,
+                image_predict=method,
+            )
+            for method in ("fft", "dft")
+        ]
+        fft, dft = (np.load(Path(out) / "data.npy") for out in outputs)
+        assert np.allclose(fft, dft, atol=1e-4)
+
+        with pytest.raises(ValueError, match="image predict"):
+            simulator.simulate_visibility(
+                image_path, str(tmp_path / "bad"), image_predict="nufft"
+            )
+
+    def test_model_image_round_trip(self, point_image):
+        """Test saved model images reload with their coordinates."""
+        image = load_model_image(point_image)
+        assert image.shape == (64, 64)
+        assert image.ref_freq_hz == 9.2e9
+        assert image.ref_pixel == (32, 32)
+
+    def test_simulate_components_matches_image(self, point_image, tmp_path):
+        """Test component-list simulation matches the image path for a point source."""
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+        sky = ComponentList(
+            [GaussianComponent(1.0, 0.0, 0.0, 0.0)], 1.047, -0.349, 9.2e9
+        )
+
+        from_image = simulator.simulate_visibility(
+            point_image, str(tmp_path / "image"), scan_duration_sec=2.0
+        )
+        from_components = simulator.simulate_components(
+            sky, str(tmp_path / "components"), scan_duration_sec=2.0
+        )
+
+        for column in ("uvw", "data"):
+            assert np.allclose(
+                np.load(Path(from_image) / f"{column}.npy"),
+                np.load(Path(from_components) / f"{column}.npy"),
+                atol=1e-6,
+            )
+
+    def test_baseline_selection_skips_unselected(self, tmp_path):
+        """Test a selected run writes exactly the matching rows of a full run."""
+        config = str(PROJECT_ROOT / "ska_mid133.cfg")
+        sky = ComponentList(
+            [GaussianComponent(1.0, 2e-6, -1e-6, 1e-6, 5e-7, 0.3)], 1.047, -0.349, 9.2e9
+        )
+        selection = BaselineSelection(max_length_m=2000.0, antennas=[0, "SKA064"])
+
+        full = VisibilityStore(VisibilitySimulator(config).simulate_components(
+            sky, str(tmp_path / "full"), scan_duration_sec=2.0
+        ))
+        simulator = VisibilitySimulator(config, baselines=selection)
+        selected = VisibilityStore(simulator.simulate_components(
+            sky, str(tmp_path / "selected"), scan_duration_sec=2.0
+        ))
+
+        expected = full.select(selection)
+        assert 0 < selected.n_baselines < full.n_baselines
+        assert selected.n_rows == 2 * selected.n_baselines
+        for column in ("antenna1", "antenna2", "uvw", "data"):
+            assert np.allclose(
+                selected.column(column),
+                expected[column].reshape(selected.column(column).shape),
+            )
+        assert np.all(selected.baselines.lengths_m <= 2000.0)
+
+        simulator = VisibilitySimulator(
+            config, baselines=BaselineSelection(max_length_m=1.0)
+        )
+        with pytest.raises(ValueError, match="no baselines"):
+            simulator.simulate_components(
+                sky, str(tmp_path / "none"), scan_duration_sec=2.0
+            )
+
+    def test_subarrays_match_separate_runs(self, tmp_path):
+        """Test one sub-array pass equals one run per sub-array."""
+        config = str(PROJECT_ROOT / "ska_mid197_new.cfg")
+        sky = ComponentList(
+            [GaussianComponent(1.0, 2e-6, -1e-6, 1e-6, 5e-7, 0.3)], 1.047, -0.349, 9.2e9
+        )
+        subarrays = [
+            ["SKA001", "SKA002", "SKA003", "M001", "M002"],
+            lambda a: a["diameter"] == 13.5,
+        ]
+        simulator = VisibilitySimulator(config)
+        outputs = simulator.simulate_subarrays(
+            sky, subarrays, [str(tmp_path / "core"), str(tmp_path / "meerkat")],
+            scan_duration_sec=3.0, chunk_seconds=2.0,
+        )
+
+        for stations, out in zip(subarrays, outputs):
+            single = VisibilitySimulator(config, stations=stations).simulate_components(
+                sky, str(tmp_path / "single"), scan_duration_sec=3.0, chunk_seconds=2.0
+            )
+            joint, separate = VisibilityStore(out), VisibilityStore(single)
+            assert joint.metadata["stations"] == separate.metadata["stations"]
+            assert joint.chunks == separate.chunks
+            for column in ("time", "antenna1", "antenna2", "uvw", "flag"):
+                assert np.array_equal(joint.column(column), separate.column(column))
+            assert np.allclose(joint.column("data"), separate.column("data"), atol=1e-5)
+
+        assert VisibilityStore(outputs[1]).n_baselines == 64 * 63 // 2
+        with pytest.raises(ValueError, match="output path"):
+            simulator.simulate_subarrays(sky, subarrays, [str(tmp_path / "one")])
+
+
+class TestIterVisibilities:
+    """Test the streaming visibility generator."""
+
+    def test_chunks_cover_observation(self, tmp_path):
+        """Test chunks are bounded and concatenate to the written output."""
+        simulator = VisibilitySimulator(
+            str(PROJECT_ROOT / "ska_mid133.cfg"), channels=2
+        )
+        sky = ComponentList(
+            [GaussianComponent(1.0, 2e-5, 0.0, 1e-5)], 1.047, -0.349, 9.2e9
+        )
+
+        chunks = list(simulator.iter_visibilities(
+            sky, scan_duration_sec=5.0, chunk_seconds=2.0
+        ))
+        n_baselines = 133 * 132 // 2
+        assert [chunk.time.shape[0] for chunk in chunks] == [
+            2 * n_baselines, 2 * n_baselines, n_baselines
+        ]
+        assert chunks[0].vis.shape == (2 * n_baselines, 2, 2)
+        assert chunks[0].vis.dtype == np.complex64
+        assert not any(chunk.flags.any() for chunk in chunks)
+        assert np.array_equal(chunks[-1].baseline, np.arange(n_baselines))
+
+        written = simulator.simulate_components(
+            sky, str(tmp_path / "vis"), scan_duration_sec=5.0
+        )
+        assert np.allclose(
+            np.concatenate([chunk.vis for chunk in chunks]),
+            np.load(Path(written) / "data.npy"),
+        )
+
+    def test_invalid_chunk_raises_immediately(self, point_image):
+        """Test parameters are validated before the first chunk is requested."""
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+        with pytest.raises(ValueError):
+            simulator.iter_visibilities(point_image, chunk_seconds=0.0)
+
+
+class TestRedshiftSweep:
+    """Test shared-geometry simulation of a redshift sweep."""
+
+    def test_split_common_components(self):
+        """Test components present in every model are separated once."""
+        point = GaussianComponent(0.1, 1e-5, 0.0, 0.0)
+        halo_a = GaussianComponent(1.0, 0.0, 0.0, 1e-4)
+        halo_b = GaussianComponent(0.5, 0.0, 0.0, 5e-5)
+        common, varying = split_common_components([[halo_a, point], [point, halo_b]])
+        assert common == [point]
+        assert varying == [[halo_a], [halo_b]]
+
+    def test_centred_gaussians_match_components(self):
+        """Test the |u|^2 broadcast equals the general component predict."""
+        uvw = np.random.default_rng(6).normal(size=(50, 3)) * 1e4
+        halos = [
+            GaussianComponent(2.0, 0.0, 0.0, 3e-5),
+            GaussianComponent(0.7, 0.0, 0.0, 1e-5),
+        ]
+        vis = predict_centred_gaussians(
+            uvw[:, 0] ** 2 + uvw[:, 1] ** 2,
+            np.array([[h.flux_jy] for h in halos]),
+            np.array([[h.sigma_major] for h in halos]),
+        )
+        for i, halo in enumerate(halos):
+            expected = predict_components(
+                uvw, **ComponentList([halo], 0, 0, 1).as_arrays()
+            )
+            assert np.allclose(vis[i], expected)
+
+    def test_sweep_matches_individual_runs(self, tmp_path):
+        """Test one sweep reproduces separate component-list simulations."""
+        maker = ImageMaker(cell_size="2.0arcsec", image_size=256)
+        sky_models = maker.sweep_components(
+            [0.1, 0.3, 0.5], source_type=SOURCE_TYPE_MIXED, seed=1
+        )
+        simulator = VisibilitySimulator(
+            str(PROJECT_ROOT / "ska_mid133.cfg"), channels=2
+        )
+
+        outputs = simulator.simulate_sweep(
+            sky_models, [str(tmp_path / f"sweep_{i}") for i in range(3)],
+            scan_duration_sec=2.0,
+        )
+        for i, sky in enumerate(sky_models):
+            single = simulator.simulate_components(
+                sky, str(tmp_path / f"single_{i}"), scan_duration_sec=2.0
+            )
+            assert np.allclose(
+                np.load(Path(outputs[i]) / "data.npy"),
+                np.load(Path(single) / "data.npy"),
+                atol=1e-5,
+            )
+
+    def test_parallel_sweep_matches_serial(self, tmp_path):
+        """Test a process-pool sweep writes the same columns as a serial one."""
+        maker = ImageMaker(cell_size="2.0arcsec", image_size=256)
+        sky_models = maker.sweep_components(
+            [0.1, 0.3], source_type=SOURCE_TYPE_MIXED, seed=2
+        )
+        config = str(PROJECT_ROOT / "ska_mid133.cfg")
+
+        serial = VisibilitySimulator(config).simulate_sweep(
+            sky_models, [str(tmp_path / f"serial_{i}") for i in range(2)],
+            scan_duration_sec=5.0, chunk_seconds=2.0,
+        )
+        parallel = VisibilitySimulator(config, workers=2).simulate_sweep(
+            sky_models, [str(tmp_path / f"parallel_{i}") for i in range(2)],
+            scan_duration_sec=5.0, chunk_seconds=2.0,
+        )
+        for one, other in zip(serial, parallel):
+            for column in ("time", "antenna1", "uvw", "data", "flag"):
+                assert np.array_equal(
+                    np.load(Path(one) / f"{column}.npy"), np.load(
+                        Path(other) / f"{column}.npy"
+                    )
+                )
+
+    def test_sweep_requires_matching_outputs(self, tmp_path):
+        """Test a model/output count mismatch raises ValueError."""
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+        sky = ComponentList([GaussianComponent(1.0, 0.0, 0.0, 0.0)], 0.0, -0.3, 9.2e9)
+        with pytest.raises(ValueError):
+            simulator.simulate_sweep([sky, sky], [str(tmp_path / "only_one")])
+
+    def test_sweep_requires_same_phase_centre(self, tmp_path):
+        """Test models at a different right ascension raise ValueError."""
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+        components = [GaussianComponent(1.0, 0.0, 0.0, 0.0)]
+        sky_models = [
+            ComponentList(components, 0.0, -0.3, 9.2e9),
+            ComponentList(components, 0.1, -0.3, 9.2e9),
+        ]
+        with pytest.raises(ValueError, match="phase centre"):
+            simulator.simulate_sweep(
+                sky_models, [str(tmp_path / "a"), str(tmp_path / "b")]
+            )
+
+
+class TestSpectralCube:
+    """Test the lazy spectral cube."""
+
+    @pytest.fixture
+    def image(self):
+        """Reference plane at 1 GHz."""
+        data = np.arange(12, dtype=np.float32).reshape(3, 4)
+        return ModelImage(data, 1e-6, 0.0, -0.3, 1.0e9)
+
+    def test_planes_follow_power_law(self, image):
+        """Test channel planes are the reference scaled by (nu/nu0)^alpha."""
+        cube = SpectralCube(image, [1.0e9, 2.0e9, 4.0e9], spectral_index=-1.0)
+        assert cube.shape == (3, 3, 4)
+        assert np.shares_memory(cube.plane(0), image.data)
+        assert not cube.plane(0).flags.writeable and image.data.flags.writeable
+        assert np.allclose(cube.plane(2), image.data / 4.0)
+        assert cube[1].ref_freq_hz == 2.0e9
+        assert not cube.plane(1).flags.writeable
+
+    def test_lru_keeps_recent_planes(self, image):
+        """Test only the most recently used planes stay cached."""
+        cube = SpectralCube(image, [2e9, 3e9, 4e9], spectral_index=-0.7, cache_planes=2)
+        first = cube.plane(0)
+        cube.plane(1)
+        assert cube.plane(0) is first
+        cube.plane(2)  # evicts channel 1, the least recently used
+        assert cube.plane(0) is first
+        assert list(cube._cache) == [2, 0]
+
+    def test_simulator_cube_uses_channels(self, point_image):
+        """Test the simulator opens images as cubes over its channels."""
+        simulator = VisibilitySimulator(
+            str(PROJECT_ROOT / "ska_mid133.cfg"), channels=3,
+            frequency_resolution_mhz=100.0,
+        )
+        cube = simulator.spectral_cube(point_image)
+        assert len(cube) == 3
+        assert cube.plane(2)[32, 32] == pytest.approx((9.4 / 9.2) ** -1.6, rel=1e-6)
+
+    def test_scale_image_writes_scaled_plane(self, point_image, tmp_path):
+        """Test the scaled image holds the power-law flux at the target frequency."""
+        simulator = VisibilitySimulator(str(PROJECT_ROOT / "ska_mid133.cfg"))
+        scaled_path = simulator.scale_image_for_frequency(point_image, 9.2, 18.4)
+
+        scaled = load_model_image(scaled_path)
+        assert scaled_path != point_image
+        assert scaled.ref_freq_hz == pytest.approx(18.4e9)
+        assert scaled.data[32, 32] == pytest.approx(2.0 ** -1.6, rel=1e-6)
+        assert load_model_image(point_image).data[32, 32] == 1.0
+
+        with pytest.raises(ValueError):
+            simulator.scale_image_for_frequency(point_image, 9.2, 0.0)